@@ -1,12 +1,19 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import requests
-import joblib
-import pulp
-import matplotlib.pyplot as plt
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent / "fpl-app" / "backend"))
+from lazy import lazy_import
+from storage import read_predictions
+from tree_model import load_model as load_tree_model
+
+# only needed by one tab or behind a button: imported on first use
+joblib = lazy_import("joblib")
+pulp   = lazy_import("pulp")
+plt    = lazy_import("matplotlib.pyplot")
+
 st.set_page_config(page_title="FPL AI Decision Engine", layout="wide")
 st.title("⚽ FPL AI Decision Engine")
 st.markdown("LightGBM-powered player predictions and optimal team selection via Integer Linear Programming")
@@ -51,7 +58,8 @@ def load_model():
     if not MODEL_PATH.exists():
         st.error(_missing_file_msg(MODEL_PATH))
         st.stop()
-    return joblib.load(MODEL_PATH)
+    # the exported trees load without lightgbm; fall back to the pickle if stale
+    return load_tree_model(MODELS_DIR / "fpl_model.npz", MODEL_PATH) or joblib.load(MODEL_PATH)
 
 
 @st.cache_data(ttl=3600)
@@ -60,9 +68,11 @@ def load_data():
         st.error(_missing_file_msg(PREDICTIONS_PATH))
         st.stop()
 
-    df = pd.read_csv(PREDICTIONS_PATH)
+    # memory-mapped Arrow copy when it is current, else the CSV
+    df = read_predictions(DATA_DIR)
+    df = df.astype({c: 'int64' for c in ('player_id', 'team', 'element_type', 'now_cost')})
 
-    r       = requests.get('https://fantasy.premierleague.com/api/bootstrap-static/').json()
+    r       = requests.get('https://fantasy.premierleague.com/api/bootstrap-static/', timeout=10).json()
     teams   = pd.DataFrame(r['teams'])
     players = pd.DataFrame(r['elements'])[['id', 'status']]
 
@@ -79,8 +89,7 @@ def load_data():
     return df
 
 
-model = load_model()
-df    = load_data()
+df = load_data()
 
 # ── SIDEBAR ───────────────────────────────────────────────────────────────────
 st.sidebar.header("⚙️ Filters")
@@ -133,6 +142,7 @@ with tab2:
     st.divider()
 
     st.markdown("#### Feature Importance")
+    model       = load_model()      # only this tab needs the model
     importances = pd.Series(model.feature_importances_, index=FEATURES).sort_values(ascending=True)
 
     fig, ax = plt.subplots(figsize=(8, 4))
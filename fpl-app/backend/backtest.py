@@ -0,0 +1,257 @@
+"""
+Time-aware backtest of the points model, and the artifact behind
+/api/model/insights.
+
+The notebook split shuffled gameweek rows with train_test_split. The
+model was then scored on rows from rounds it had partly trained on,
+including rounds after the ones it was predicting. The insights page showed
+MAEs typed in by hand. Here:
+
+  - time_split() holds out the last rounds instead of random rows
+  - run_backtest() walks forward over the last FOLDS rounds. The model for
+    round r is trained on every round before r (an expanding window), so it
+    never sees a later match. Folds run in parallel processes, and each
+    scores its whole held-out block with one predict per model
+  - errors are aggregated with one groupby into a per-gameweek,
+    per-position MAE table for every model (mean baseline, linear
+    regression, random forest, LightGBM)
+  - write_backtest() stores that as MODELS_DIR/backtest.json, and
+    insights() turns it into the /api/model/insights numbers
+
+Rolling features are lagged (features.py), so a row only describes matches
+before its own. Loading and summarising the artifact needs no third-party
+imports; running the backtest needs scikit-learn and lightgbm.
+
+    python backtest.py            # history + live fixtures -> backtest.json
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Optional
+
+from lazy import lazy_import
+from tree_model import MODELS_DIR
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+BACKTEST_PATH = Path(os.environ.get("FPL_BACKTEST_PATH", str(MODELS_DIR / "backtest.json")))
+FOLDS         = int(os.environ.get("FPL_BACKTEST_FOLDS", "5"))
+WORKERS       = int(os.environ.get("FPL_BACKTEST_WORKERS", str(os.cpu_count() or 1)))
+TARGET        = "total_points"
+POSITIONS     = {1: "GK", 2: "DEF", 3: "MID", 4: "FWD"}
+BASELINE      = "Baseline (mean)"
+SELECTED      = "LightGBM"
+MODELS        = (BASELINE, "Linear Regression", "Random Forest", SELECTED)   # selected last
+SEED          = 42
+
+
+# ── Frames and splits ──────────────────────────────────────────────────────────
+def model_frame(df: pd.DataFrame, fixtures: list, elements: list) -> pd.DataFrame:
+    """
+    The notebook's df_model: history with rolling features (features.py)
+    plus team, position and the fixture features (fixture_features.py) of
+    each row's own gameweek. team is the side the player played for in that
+    fixture, so a transfer mid-season does not rewrite earlier rows.
+    """
+    from fixture_features import FixtureMatrix, frame_features
+
+    matrix  = FixtureMatrix(fixtures)
+    players = pd.DataFrame(elements).set_index("id")
+    current = df["player_id"].map(players["team"]).fillna(-1).to_numpy(dtype=np.int64)
+    df      = df.copy()
+    df["team"]     = matrix.team_of(df["fixture"].to_numpy(), df["was_home"].to_numpy(), fallback=current)
+    df["position"] = df["player_id"].map(players["element_type"]).map(POSITIONS)
+    return frame_features(matrix, df)
+
+
+def time_split(df: pd.DataFrame, holdout_rounds: int = FOLDS) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(rows before the last `holdout_rounds` rounds, rows in them)."""
+    rounds = np.sort(df["round"].unique())
+    cut    = rounds[-holdout_rounds] if 0 < holdout_rounds < len(rounds) else rounds[-1]
+    return df[df["round"] < cut], df[df["round"] >= cut]
+
+
+# ── Folds ──────────────────────────────────────────────────────────────────────
+def _estimator(name: str, params: dict, threads: int):
+    if name == "Linear Regression":
+        from sklearn.linear_model import LinearRegression
+        return LinearRegression()
+    if name == "Random Forest":
+        from sklearn.ensemble import RandomForestRegressor
+        return RandomForestRegressor(n_estimators=100, random_state=SEED, n_jobs=threads)
+    import lightgbm as lgb
+    return lgb.LGBMRegressor(**{**params, "n_jobs": threads})
+
+
+def run_fold(X_train, y_train, X_test, params: dict, threads: int = 1) -> dict:
+    """Worker entry point: fit every model on one fold and score its test block in one call each."""
+    preds = {BASELINE: np.full(len(X_test), float(np.mean(y_train)))}
+    for name in MODELS[1:]:
+        preds[name] = _estimator(name, params, threads).fit(X_train, y_train).predict(X_test)
+    return preds
+
+
+def run_backtest(df: pd.DataFrame, features: list, params: dict, folds: int = FOLDS,
+                 workers: int = WORKERS) -> dict:
+    """
+    Walk forward over the last `folds` rounds of `df` (a model frame with
+    `round`, optionally `position`, the features and TARGET). params are
+    the LightGBM model's (LGBMRegressor(**params)). Returns the artifact.
+    """
+    t0     = time.perf_counter()
+    df     = df.dropna(subset=[*features, TARGET])
+    rounds = np.sort(df["round"].unique())
+    tests  = rounds[-folds:] if len(rounds) > folds else rounds[1:]
+    X      = df[features].to_numpy(dtype=np.float64)
+    y      = df[TARGET].to_numpy(dtype=np.float64)
+    rnd    = df["round"].to_numpy()
+    splits = [(rnd < r, rnd == r) for r in tests]
+
+    workers = max(1, min(workers, len(splits)))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    args    = [(X[tr], y[tr], X[te], params, threads) for tr, te in splits]
+    if workers == 1:
+        results = [run_fold(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            results = list(pool.map(run_fold, *zip(*args)))
+
+    # every held-out row once, then one groupby for the whole table
+    test_rows = np.concatenate([te.nonzero()[0] for _, te in splits])
+    scored    = pd.DataFrame({
+        "round": rnd[test_rows],
+        **{name: np.abs(np.concatenate([r[name] for r in results]) - y[test_rows]) for name in MODELS},
+    })
+    by_gw  = scored.groupby("round", sort=True)
+    parts  = [by_gw[list(MODELS)].mean().assign(rows=by_gw.size(), position="ALL").reset_index()]
+    if "position" in df:
+        scored["position"] = df["position"].fillna("UNK").to_numpy()[test_rows]
+        by_pos = scored.groupby(["round", "position"], sort=True)
+        parts.append(by_pos[list(MODELS)].mean().assign(rows=by_pos.size()).reset_index())
+    table  = pd.concat(parts).sort_values(["round", "position"])
+
+    artifact = {
+        "created":       time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "features":      list(features),
+        "target":        TARGET,
+        "selected":      SELECTED,
+        "params":        {k: v for k, v in params.items() if isinstance(v, (int, float, str, bool))},
+        "training_rows": int(len(df)),
+        "folds":         [{"round": int(r), "train_rows": int(tr.sum()), "test_rows": int(te.sum())}
+                          for r, (tr, te) in zip(tests, splits)],
+        "models":        [{"model": name, "mae": round(float(scored[name].mean()), 4)} for name in MODELS],
+        "table":         [{"round": int(row["round"]), "position": row["position"], "rows": int(row["rows"]),
+                           "mae": {name: round(float(row[name]), 4) for name in MODELS}}
+                          for row in table.to_dict(orient="records")],
+        "elapsed_s":     round(time.perf_counter() - t0, 2),
+    }
+    artifact["version"] = hashlib.sha1(json.dumps(artifact["table"]).encode()).hexdigest()[:12]
+    return artifact
+
+
+# ── Artifact ───────────────────────────────────────────────────────────────────
+def write_backtest(artifact: dict, path: Path = BACKTEST_PATH) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w") as fh:
+        json.dump(artifact, fh, indent=1)
+    os.replace(tmp, path)
+    return path
+
+
+_loaded: dict = {}
+
+
+def load_backtest(path: Path = BACKTEST_PATH) -> Optional[dict]:
+    """The stored artifact, re-read only when the file changes; None if there is none."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    key = (str(path), st.st_mtime_ns, st.st_size)
+    if _loaded.get("key") != key:
+        with open(path) as fh:
+            _loaded.update(key=key, artifact=json.load(fh))
+    return _loaded["artifact"]
+
+
+def insights(artifact: Optional[dict]) -> dict:
+    """The MAE part of /api/model/insights, from a backtest artifact."""
+    if artifact is None:
+        return {
+            "mae": None, "baseline_mae": None, "improvement_pct": None, "training_rows": 0,
+            "model_comparison": [],
+            "_note": "No backtest found. Run `python backtest.py` (or the notebook) to measure the model.",
+        }
+    maes = {m["model"]: m["mae"] for m in artifact["models"]}
+    base = maes[BASELINE]
+    best = maes[artifact["selected"]]
+    gain = lambda mae: (base - mae) / base * 100
+    by_position: dict[str, dict] = {}
+    for row in artifact["table"]:
+        if row["position"] != "ALL":
+            agg = by_position.setdefault(row["position"], {"rows": 0, "err": 0.0})
+            agg["rows"] += row["rows"]
+            agg["err"]  += row["rows"] * row["mae"][artifact["selected"]]
+    return {
+        "mae":              round(best, 3),
+        "baseline_mae":     round(base, 3),
+        "improvement_pct":  round(gain(best), 1),
+        "training_rows":    artifact["training_rows"],
+        "model_comparison": [
+            {"model": m["model"], "mae": round(m["mae"], 3),
+             "improvement": "—" if m["model"] == BASELINE else f"{gain(m['mae']):.1f}%"}
+            for m in artifact["models"]
+        ],
+        "backtest": {
+            "version":     artifact["version"],
+            "created":     artifact["created"],
+            "folds":       artifact["folds"],
+            "by_gameweek": [{"round": r["round"], "rows": r["rows"], "mae": r["mae"][artifact["selected"]]}
+                            for r in artifact["table"] if r["position"] == "ALL"],
+            "by_position": {p: round(a["err"] / a["rows"], 3) for p, a in sorted(by_position.items()) if a["rows"]},
+        },
+    }
+
+
+# ── CLI ────────────────────────────────────────────────────────────────────────
+def _lgbm_params() -> dict:
+    """The saved model's params, else the notebook's defaults."""
+    pkl = MODELS_DIR / "fpl_model.pkl"
+    if pkl.exists():
+        import joblib
+        return joblib.load(pkl).get_params()
+    return {"n_estimators": 500, "learning_rate": 0.03, "num_leaves": 63, "random_state": SEED, "verbose": -1}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import requests
+
+    from features import add_rolling_features
+    from fpl_client import FPL_API_BASE
+    from inference import FEATURES
+    from storage import read_history
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--folds", type=int, default=FOLDS)
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--out", type=Path, default=BACKTEST_PATH)
+    args = ap.parse_args()
+
+    fixtures  = requests.get(f"{FPL_API_BASE}/fixtures/", timeout=30).json()
+    bootstrap = requests.get(f"{FPL_API_BASE}/bootstrap-static/", timeout=30).json()
+    frame     = model_frame(add_rolling_features(read_history()), fixtures, bootstrap["elements"])
+    artifact  = run_backtest(frame, FEATURES, _lgbm_params(), args.folds, args.workers)
+    write_backtest(artifact, args.out)
+    for m in artifact["models"]:
+        print(f"{m['model']:20s} MAE {m['mae']:.4f}")
+    print(f"{len(artifact['folds'])} folds in {artifact['elapsed_s']:.1f}s -> {args.out}")
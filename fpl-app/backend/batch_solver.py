@@ -0,0 +1,98 @@
+"""
+Process-pool fan-out for /api/squad/optimize/batch.
+
+Each scenario (budget, excluded players, club cap) is an independent squad
+solve, so a batch is spread over a process pool sized to the machine's cores
+and results are yielded as they finish. The candidate pool is pruned once
+per batch — with the tightest club cap, and without letting any player some
+scenario excludes act as a dominator — so the same arrays are valid for
+every scenario and each worker only masks out its own exclusions.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import AsyncIterator, NamedTuple, Optional
+
+from lazy import lazy_import
+from squad_solver import InfeasibleSquad, SearchLimit, solve_squad
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+BATCH_WORKERS = int(os.environ.get("FPL_BATCH_WORKERS", str(os.cpu_count() or 1)))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+class Scenario(NamedTuple):
+    budget_raw:   int
+    excluded:     np.ndarray    # bool mask over the shared pool
+    max_per_club: int
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: the server process runs threads (event loop, threadpool),
+            # which fork() would copy mid-state.
+            _executor = ProcessPoolExecutor(max_workers=BATCH_WORKERS, mp_context=get_context("spawn"))
+        return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def solve_scenario(pool: dict, sc: Scenario) -> dict:
+    """Worker entry point. Returns {"mask": bool array | None, "error", "solver", "solve_ms"}."""
+    t0      = time.perf_counter()
+    allowed = ~sc.excluded
+    idx     = np.flatnonzero(allowed)
+    mask    = np.zeros(len(allowed), dtype=bool)
+    solver  = "native"
+    try:
+        try:
+            sel, _ = solve_squad(
+                pool["pts"][idx], pool["cost"][idx], pool["position"][idx], pool["team"][idx],
+                sc.budget_raw, max_per_club=sc.max_per_club, prune=False,
+            )
+        except SearchLimit:
+            from squad_model import SquadModel
+            solver = "cbc"
+            sub    = pd.DataFrame({k: pool[k][idx] for k in ("player_id", "position", "team")})
+            sub["now_cost"] = pool["cost"][idx]
+            sel, _ = SquadModel(sub, sc.max_per_club).solve(pool["pts"][idx], sc.budget_raw)
+        mask[idx[sel]] = True
+        error = None
+    except (InfeasibleSquad, ValueError) as e:
+        mask, error = None, str(e)
+    return {"mask": mask, "error": error, "solver": solver, "solve_ms": (time.perf_counter() - t0) * 1000}
+
+
+async def solve_batch(pool: dict, scenarios: list[Scenario]) -> AsyncIterator[tuple[int, dict]]:
+    """Yield (scenario index, solve_scenario result) in completion order."""
+    loop    = asyncio.get_running_loop()
+    ex      = get_executor()
+    pending = {
+        asyncio.wrap_future(ex.submit(solve_scenario, pool, sc), loop=loop): i
+        for i, sc in enumerate(scenarios)
+    }
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for fut in done:
+                yield pending.pop(fut), fut.result()
+    finally:
+        for fut in pending:
+            fut.cancel()
@@ -0,0 +1,145 @@
+"""
+Walk-forward backtest (backtest.py) on the stored gameweek history, with
+fixture difficulty from mock_fpl's fixture list. Checks:
+
+  - every fold trains only on rounds before the one it predicts
+  - folds run in parallel give the same predictions as run one by one
+  - each gameweek's MAE matches the notebook's old validation loop (filter
+    df_model per round, predict, MAE), and the per-position rows add up to
+    the gameweek row
+  - /api/model/insights serves the stored artifact's numbers
+
+It prints the folds serial vs parallel, the old per-round validation loop
+vs one batched predict, and the held-out MAE of the old shuffled split next
+to the time-aware ones. The shuffled split trains on rounds after the rows
+it scores; only the time-aware numbers say how the model does on a
+gameweek it has not seen.
+
+    python bench/bench_backtest.py
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["FPL_BACKTEST_PATH"] = str(Path(tempfile.mkdtemp(prefix="fpl-backtest-")) / "backtest.json")
+
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import train_test_split
+
+import backtest
+import mock_fpl
+from features import add_rolling_features
+from inference import FEATURES
+from storage import DATA_DIR, read_history
+
+WORKERS = int(os.environ.get("FPL_BACKTEST_WORKERS", str(max(2, os.cpu_count() or 1))))
+
+
+def timed(fn, *args, **kwargs):
+    t0  = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    payloads = mock_fpl.build_payloads(DATA_DIR)
+    frame    = backtest.model_frame(add_rolling_features(read_history(DATA_DIR)),
+                                    payloads["fixtures"], payloads["bootstrap"]["elements"])
+    frame    = frame.dropna(subset=FEATURES + [backtest.TARGET])
+    params   = backtest._lgbm_params()
+    fails    = []
+
+    serial, t_serial     = timed(backtest.run_backtest, frame, FEATURES, params, workers=1)
+    parallel, t_parallel = timed(backtest.run_backtest, frame, FEATURES, params, workers=WORKERS)
+    if serial["table"] != parallel["table"] or serial["models"] != parallel["models"]:
+        fails.append("parallel folds differ from serial ones")
+
+    # no fold sees its own round or a later one
+    for fold in parallel["folds"]:
+        before = int((frame["round"] < fold["round"]).sum())
+        if fold["train_rows"] != before or fold["test_rows"] != int((frame["round"] == fold["round"]).sum()):
+            fails.append(f"fold {fold['round']} trained on {fold['train_rows']} rows, expected {before}")
+
+    # per-GW MAE == the notebook's validation loop, run fold by fold
+    rows = {(t["round"], t["position"]): t for t in parallel["table"]}
+    for fold in parallel["folds"]:
+        r      = fold["round"]
+        train  = frame[frame["round"] < r]
+        model  = backtest._estimator(backtest.SELECTED, params, 1).fit(train[FEATURES].to_numpy(float),
+                                                                    train[backtest.TARGET].to_numpy(float))
+        test   = frame[frame["round"] == r]
+        mae    = mean_absolute_error(test[backtest.TARGET], model.predict(test[FEATURES].to_numpy(float)))
+        stored = rows[(r, "ALL")]["mae"][backtest.SELECTED]
+        if abs(mae - stored) > 1e-4:
+            fails.append(f"GW {r}: loop MAE {mae:.4f} != backtest {stored:.4f}")
+        parts = [t for (rr, p), t in rows.items() if rr == r and p != "ALL"]
+        mixed = sum(t["rows"] * t["mae"][backtest.SELECTED] for t in parts) / sum(t["rows"] for t in parts)
+        if abs(mixed - stored) > 1e-3:
+            fails.append(f"GW {r}: positions average {mixed:.4f}, gameweek row {stored:.4f}")
+
+    # the old validation cell vs one batched predict, same final model
+    train_df, test_df = backtest.time_split(frame)
+    lgbm  = backtest._estimator(backtest.SELECTED, params, 0).fit(train_df[FEATURES], train_df[backtest.TARGET])
+    gws   = sorted(test_df["round"].unique())
+    def loop():
+        out = {}
+        for gw in gws:
+            clean   = frame[frame["round"] == gw][FEATURES + ["total_points", "player_id"]].dropna()
+            out[gw] = mean_absolute_error(clean["total_points"], lgbm.predict(clean[FEATURES]))
+        return out
+    def batched():
+        val = frame[frame["round"].isin(gws)]
+        err = (val["total_points"] - lgbm.predict(val[FEATURES])).abs()
+        return err.groupby(val["round"]).mean().to_dict()
+    old, t_loop   = timed(loop)
+    new, t_batch  = timed(batched)
+    if any(abs(old[g] - new[g]) > 1e-9 for g in gws):
+        fails.append("batched validation differs from the per-round loop")
+
+    # shuffled vs time-aware held-out MAE
+    X_tr, X_te, y_tr, y_te = train_test_split(frame[FEATURES], frame[backtest.TARGET],
+                                              test_size=0.2, random_state=42)
+    shuffled = backtest._estimator(backtest.SELECTED, params, 0).fit(X_tr, y_tr)
+    shuffled = mean_absolute_error(y_te, shuffled.predict(X_te))
+    timewise = mean_absolute_error(test_df[backtest.TARGET], lgbm.predict(test_df[FEATURES]))
+
+    # the route serves the artifact
+    backtest.write_backtest(parallel)
+    server, base = mock_fpl.serve_in_thread()
+    os.environ.update(FPL_API_BASE=base, FPL_WARMUP="0")
+    import main
+    from fastapi.testclient import TestClient
+    with TestClient(main.app) as client:
+        body = client.get("/api/model/insights").json()
+    best = next(m["mae"] for m in parallel["models"] if m["model"] == backtest.SELECTED)
+    if body.get("mae") != round(best, 3) or body.get("training_rows") != parallel["training_rows"]:
+        fails.append(f"insights served mae={body.get('mae')}, expected {best:.3f}")
+    server.shutdown()
+    backtest.BACKTEST_PATH.unlink()
+
+    print(f"{len(parallel['folds'])} folds x {len(backtest.MODELS)} models, {len(frame)} rows")
+    print(f"  serial             : {t_serial:7.2f} s")
+    print(f"  {WORKERS} workers          : {t_parallel:7.2f} s")
+    print(f"validation over GW {gws[0]}–{gws[-1]}")
+    print(f"  per-round loop     : {t_loop * 1000:7.1f} ms")
+    print(f"  one batched predict: {t_batch * 1000:7.1f} ms")
+    print(f"held-out MAE (LightGBM)")
+    print(f"  shuffled 80/20     : {shuffled:.4f}")
+    print(f"  last {len(gws)} GWs held out: {timewise:.4f}")
+    print(f"  walk-forward       : {best:.4f}")
+    print()
+    table = pd.DataFrame([{"GW": t["round"], "pos": t["position"], "mae": t["mae"][backtest.SELECTED]}
+                          for t in parallel["table"]])
+    print(table.pivot(index="GW", columns="pos", values="mae").round(3).to_string())
+    print()
+    for m in parallel["models"]:
+        print(f"  {m['model']:20s} {m['mae']:.4f}")
+
+    for f in fails:
+        print(f"FAIL: {f}")
+    sys.exit(1 if fails else 0)
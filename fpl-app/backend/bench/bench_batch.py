@@ -0,0 +1,51 @@
+"""
+Budget curve (80.0–100.0m in 0.5m steps) via one /api/squad/optimize/batch
+call versus one two-phase /api/squad/optimize call ("solver": "native") per
+budget, on the bundled data.
+Checks every budget gets the same predicted points, captain, vice and
+objective both ways.
+
+    python bench/bench_batch.py
+"""
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import mock_fpl
+
+
+if __name__ == "__main__":
+    _, base = mock_fpl.serve_in_thread()
+    os.environ["FPL_API_BASE"] = base
+
+    import main
+    from fastapi.testclient import TestClient
+
+    budgets = [round(80 + 0.5 * k, 1) for k in range(41)]
+    key     = lambda res: (res["predicted_points"], res["captain"], res["vice_captain"], res["objective"])
+    with TestClient(main.app) as client:
+        client.post("/api/squad/optimize/batch", json={"budgets": [100.0]})   # start the workers
+
+        t0     = time.perf_counter()
+        serial = {b: key(client.post("/api/squad/optimize", json={"budget": b, "solver": "native"}).json()) for b in budgets}
+        t_serial = time.perf_counter() - t0
+
+        t0      = time.perf_counter()
+        batched = {}
+        with client.stream("POST", "/api/squad/optimize/batch", json={"budgets": budgets}) as r:
+            for line in r.iter_lines():
+                row = json.loads(line)
+                if "index" in row:
+                    batched[row["budget"]] = key(row)
+        t_batch = time.perf_counter() - t0
+
+    bad = sum(serial[b] != batched[b] for b in budgets)
+    print(f"workers          : {main.batch_solver.BATCH_WORKERS}")
+    print(f"serial  x{len(budgets)}      : {t_serial * 1000:7.0f} ms")
+    print(f"batch   x{len(budgets)}      : {t_batch * 1000:7.0f} ms")
+    print(f"mismatched budgets: {bad}")
+    sys.exit(1 if bad else 0)
@@ -0,0 +1,72 @@
+"""
+Feature pipeline: notebook groupby/transform lambdas vs features.py.
+
+Tiles fpl_gameweek_history.csv --scale times (player ids offset per copy),
+checks add_rolling_features() and the incremental FeatureState agree with
+the pandas version, and times a full rebuild plus appending one gameweek.
+
+    python bench/bench_features.py --scale 10
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from features import ROLLING, FeatureState, add_rolling_features
+
+DATA_DIR = Path(__file__).resolve().parent.parent.parent.parent / "Data" / "data"
+
+
+def notebook_features(df: pd.DataFrame) -> pd.DataFrame:
+    """The feature cell as it was in FPL_Pipeline_Fixed.ipynb."""
+    df = df.sort_values(["player_id", "round"]).reset_index(drop=True)
+    for col, new_col, w in ROLLING:
+        df[new_col] = df.groupby("player_id")[col].transform(
+            lambda x, w=w: x.shift(1).rolling(w, min_periods=1).mean()
+        )
+    df["is_home"]    = df["was_home"].astype(int)
+    df["form_trend"] = df["avg_pts_last3"] - df["avg_pts_last5"]
+    return df
+
+
+def timed(fn, *args):
+    t0  = time.perf_counter()
+    out = fn(*args)
+    return out, (time.perf_counter() - t0) * 1000
+
+
+def same(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    cols = [f for _, f, _ in ROLLING] + ["form_trend", "is_home"]
+    return all(np.allclose(a[c].to_numpy(float), b[c].to_numpy(float), equal_nan=True, atol=1e-9) for c in cols)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scale", type=int, default=10)
+    args = ap.parse_args()
+
+    base  = pd.read_csv(DATA_DIR / "fpl_gameweek_history.csv")
+    span  = int(base["player_id"].max()) + 1
+    hist  = pd.concat([base.assign(player_id=base["player_id"] + k * span) for k in range(args.scale)],
+                      ignore_index=True)
+    last  = int(hist["round"].max())
+    prior = hist[hist["round"] < last]
+    newgw = hist[hist["round"] == last]
+    print(f"history: {len(hist):,} rows, {hist['player_id'].nunique():,} players, {last} rounds")
+
+    ref,  t_ref  = timed(notebook_features, hist)
+    fast, t_fast = timed(add_rolling_features, hist)
+    print(f"groupby lambdas      : {t_ref:8.1f} ms")
+    print(f"vectorised           : {t_fast:8.1f} ms  ({t_ref / t_fast:.1f}x)  match={same(ref, fast)}")
+
+    state, t_init = timed(FeatureState.from_history, prior)
+    inc,   t_inc  = timed(state.append, newgw)
+    ref_last      = ref[ref["round"] == last].reset_index(drop=True)
+    _,     t_full = timed(add_rolling_features, hist)
+    print(f"state from history   : {t_init:8.1f} ms")
+    print(f"append GW{last} (incr.)  : {t_inc:8.1f} ms  vs full rebuild {t_full:.1f} ms  match={same(ref_last, inc)}")
@@ -0,0 +1,160 @@
+"""
+Fixture features (fixture_features.py) against the notebook's cell, on the
+stored history and mock_fpl's fixtures. One GW28 fixture is moved in from
+GW30, so two teams play twice, and one is postponed, so two teams blank.
+
+  - the notebook's iterrows loop + team merge vs FixtureMatrix and one
+    row_features() call over the whole history, timed
+  - each row's features equal a plain loop over the fixture list for its
+    own team and window [round, round + FIXTURE_HORIZON). So a training row
+    never sees a fixture before its own gameweek or beyond the horizon
+  - team_of() gives the side a player actually played for
+  - /api/predict: a double-gameweek player scores the sum of one predict
+    per fixture, and a blank player scores 0
+
+    python bench/bench_fixture_features.py
+"""
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import mock_fpl
+from fixture_features import COLUMNS, FIXTURE_HORIZON, NEUTRAL_FDR, FixtureMatrix, frame_features
+from storage import DATA_DIR, read_history
+
+GW = 28
+
+
+def median_ms(fn, n: int) -> float:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def notebook(df: pd.DataFrame, fixtures_json: list, players: pd.DataFrame) -> pd.DataFrame:
+    """The notebook's fixture difficulty cell, as it was."""
+    fixtures   = pd.DataFrame(fixtures_json)
+    current_gw = fixtures[fixtures["finished"] == True]["event"].max()
+    upcoming   = fixtures[(fixtures["finished"] == False) & (fixtures["event"] <= current_gw + 3)].copy()
+    team_difficulty = []
+    for _, row in upcoming.iterrows():
+        team_difficulty.append({"team": row["team_h"], "difficulty": row["team_h_difficulty"]})
+        team_difficulty.append({"team": row["team_a"], "difficulty": row["team_a_difficulty"]})
+    avg = pd.DataFrame(team_difficulty).groupby("team")["difficulty"].mean().reset_index()
+    avg.columns = ["team", "avg_fixture_difficulty"]
+    df = df.copy()
+    df["team"] = df["player_id"].map(players.set_index("id")["team"].to_dict())
+    out = df.merge(avg, on="team", how="left")
+    out["avg_fixture_difficulty"] = out["avg_fixture_difficulty"].fillna(3.0)
+    return out
+
+
+def expected(fixtures: list, team: int, gw: int) -> dict:
+    """One row's features by looping over every fixture."""
+    window = [(f, f["team_h"] == team) for f in fixtures
+              if f.get("event") and team in (f["team_h"], f["team_a"]) and gw <= f["event"] < gw + FIXTURE_HORIZON]
+    diffs  = [f["team_h_difficulty"] if home else f["team_a_difficulty"] for f, home in window]
+    now    = [home for f, home in window if f["event"] == gw]
+    return {
+        "avg_fixture_difficulty": sum(diffs) / len(diffs) if diffs else NEUTRAL_FDR,
+        "fixtures_next":          len(diffs),
+        "fixture_count":          len(now),
+        "home_fixtures":          sum(now),
+        "is_blank":               int(not now),
+        "is_double":              int(len(now) > 1),
+    }
+
+
+if __name__ == "__main__":
+    payloads = mock_fpl.build_payloads(DATA_DIR)
+    fixtures = payloads["fixtures"]
+    moved    = next(f for f in fixtures if f["event"] == GW + 2)
+    dropped  = next(f for f in fixtures if f["event"] == GW and {f["team_h"], f["team_a"]}.isdisjoint(
+                    {moved["team_h"], moved["team_a"]}))
+    moved["event"], dropped["event"] = GW, None
+    doubles  = {moved["team_h"], moved["team_a"]}
+    blanks   = {dropped["team_h"], dropped["team_a"]}
+    players  = pd.DataFrame(payloads["bootstrap"]["elements"])
+    history  = read_history(DATA_DIR)
+    fails    = []
+
+    # ── speed: old cell vs matrix + one lookup ─────────────────────────────
+    t_old = median_ms(lambda: notebook(history, fixtures, players), 5)
+    def vectorised():
+        m = FixtureMatrix(fixtures)
+        return frame_features(m, history.assign(team=m.team_of(history["fixture"], history["was_home"])))
+    t_new = median_ms(vectorised, 20)
+    t_one = median_ms(lambda: FixtureMatrix(fixtures), 20)
+
+    # ── every history row == the loop over fixtures ────────────────────────
+    matrix = FixtureMatrix(fixtures)
+    if matrix.next_gameweek != GW:
+        fails.append(f"next gameweek {matrix.next_gameweek}, expected {GW}")
+    team   = matrix.team_of(history["fixture"].to_numpy(), history["was_home"].to_numpy())
+    by_id  = {f["id"]: f for f in fixtures}
+    truth  = np.array([-1 if fid not in by_id else by_id[fid]["team_h"] if home else by_id[fid]["team_a"]
+                       for fid, home in zip(history["fixture"], history["was_home"])])
+    if (team != truth).any():
+        fails.append(f"team_of wrong on {(team != truth).sum()} rows")
+    frame  = frame_features(matrix, history.assign(team=team)[team > 0])
+    pairs  = frame[["team", "round"]].drop_duplicates()
+    pairs  = pd.concat([pairs, pd.DataFrame([(t, GW) for t in range(1, 21)], columns=["team", "round"])])
+    got    = frame_features(matrix, pairs)
+    for row in got.itertuples(index=False):
+        want = expected(fixtures, row.team, row.round)
+        for col in COLUMNS:
+            if abs(getattr(row, col) - want[col]) > 1e-9:
+                fails.append(f"team {row.team} GW {row.round} {col}: {getattr(row, col)} != {want[col]}")
+    live = got[got["round"] == GW].set_index("team")
+    if set(live.index[live["is_double"] == 1]) != doubles or set(live.index[live["is_blank"] == 1]) != blanks:
+        fails.append("double / blank flags do not match the edited fixture list")
+
+    # ── /api/predict sums doubles, zeroes blanks ───────────────────────────
+    server, base = mock_fpl.serve_in_thread()
+    server.RequestHandlerClass.payloads["fixtures"] = fixtures
+    server.RequestHandlerClass._encoded.clear()
+    os.environ.update(FPL_API_BASE=base, FPL_WARMUP="0")
+    import main
+    from fastapi.testclient import TestClient
+    from inference import FEATURES
+    with TestClient(main.app) as client:
+        body  = client.post("/api/predict", json={}).json()
+        model = main.get_model()
+        res   = main.scorer.score(model, main._model_version, main.bootstrap._entry.data["elements"],
+                                  main.fixtures_cache._entry.data, "bench")
+    server.shutdown()
+    rows   = {int(p): i for i, p in enumerate(res["ids"])}
+    teams  = players.set_index("id")["team"]
+    for p in body["players"]:
+        t = teams[p["player_id"]]
+        if t in blanks and (p["predicted_pts"] != 0 or p["fixtures"] != 0):
+            fails.append(f"blank player {p['web_name']} scored {p['predicted_pts']}")
+        if t in doubles:
+            x     = np.repeat(res["features"][[rows[p["player_id"]]]], 2, axis=0)
+            homes = [f["team_h"] == t for f in sorted((f for f in fixtures if f["event"] == GW and
+                                                       t in (f["team_h"], f["team_a"])),
+                                                      key=lambda f: (f["kickoff_time"], f["id"]))]
+            x[:, FEATURES.index("is_home")] = homes
+            want = float(model.predict(x).sum())
+            if p["fixtures"] != 2 or abs(p["predicted_pts"] - want) > 0.005:
+                fails.append(f"double player {p['web_name']}: {p['predicted_pts']} != {want:.2f}")
+    n_double = sum(teams[p["player_id"]] in doubles for p in body["players"])
+    n_blank  = sum(teams[p["player_id"]] in blanks for p in body["players"])
+
+    print(f"{len(history)} history rows, {len(fixtures)} fixtures")
+    print(f"  notebook cell (iterrows + merge) : {t_old:7.2f} ms  (one value per team)")
+    print(f"  FixtureMatrix + per-row features : {t_new:7.2f} ms  (matrix alone {t_one:.2f} ms)")
+    print(f"GW {GW}: doubles {sorted(doubles)} ({n_double} players), blanks {sorted(blanks)} ({n_blank} players)")
+    for f in fails[:20]:
+        print(f"FAIL: {f}")
+    sys.exit(1 if fails else 0)
@@ -0,0 +1,91 @@
+"""
+Upstream throughput: blocking requests.get in a threadpool vs FplClient.
+
+"before" mirrors the old sync handlers: each call opens a new connection
+with requests.get and occupies one of anyio's 40 threadpool workers while it
+waits. "after" issues the same calls through the shared async FplClient.
+Both run against mock_fpl with an artificial upstream latency.
+
+    python bench/bench_fpl_client.py --requests 800 --latency-ms 50
+"""
+import argparse
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests
+
+from fpl_client import FplClient
+
+BACKEND_DIR     = Path(__file__).resolve().parent.parent
+THREADPOOL_SIZE = 40   # anyio's default worker count behind sync FastAPI routes
+
+
+def start_mock(latency_ms: float) -> tuple[subprocess.Popen, str]:
+    """Run mock_fpl in its own process so it doesn't compete for our GIL."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    proc = subprocess.Popen(
+        [sys.executable, str(BACKEND_DIR / "mock_fpl.py"), "--port", str(port), "--latency-ms", str(latency_ms)],
+        stdout=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(200):
+        try:
+            requests.get(f"{base}/entry/0/", timeout=1)
+            return proc, base
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("mock FPL server did not start")
+
+
+def bench_before(base: str, n: int) -> float:
+    def call(i):
+        return requests.get(f"{base}/entry/{i}/", timeout=10).json()
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(THREADPOOL_SIZE) as pool:
+        list(pool.map(call, range(n)))
+    return n / (time.perf_counter() - t0)
+
+
+def bench_after(base: str, n: int, concurrency: int) -> float:
+    async def run():
+        client = FplClient(base, concurrency=concurrency, max_connections=concurrency,
+                           per_host=concurrency)
+        await client.entry(0)   # open the pool before timing
+        t0 = time.perf_counter()
+        await asyncio.gather(*(client.entry(i) for i in range(n)))
+        elapsed = time.perf_counter() - t0
+        await client.aclose()
+        return n / elapsed
+
+    return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests",    type=int,   default=800)
+    ap.add_argument("--latency-ms",  type=float, default=50.0)
+    ap.add_argument("--concurrency", type=int,   default=100)
+    args = ap.parse_args()
+
+    proc, base = start_mock(args.latency_ms)
+    try:
+        before = bench_before(base, args.requests)
+        after  = bench_after(base, args.requests, args.concurrency)
+    finally:
+        proc.terminate()
+
+    print(f"upstream latency : {args.latency_ms:.0f} ms, {args.requests} calls")
+    print(f"before (requests + {THREADPOOL_SIZE} threads) : {before:8.1f} req/s")
+    print(f"after  (FplClient, {args.concurrency} in flight)  : {after:8.1f} req/s")
+    print(f"speedup          : {after / before:.1f}x")
@@ -0,0 +1,107 @@
+"""
+History ingester against mock_fpl: speed, interruption/resume and refetch.
+
+  1. starts a fresh ingest and cancels it part-way (simulated crash)
+  2. resumes — only the players missing from the checkpoint are fetched
+  3. runs again — nothing is fetched
+  4. revises one player's history on the stub — only that player is fetched
+  5. checks the rebuilt CSV has the same rows as the bundled history
+  6. finishes a gameweek in which one player gets a 0-minute row (no
+     bootstrap total moves) — every player is re-fetched and the row lands
+
+and compares the wall time with the old sequential loop (one request at a
+time plus a 0.2 s sleep), estimated from the measured per-request latency.
+
+    python bench/bench_ingest.py --latency-ms 30 --rate 200
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+
+import mock_fpl
+from fpl_client import FplClient
+from ingest import CHECKPOINT_NAME, HISTORY_NAME, ingest_history
+
+
+async def main(args) -> int:
+    server, base = mock_fpl.serve_in_thread(latency=args.latency_ms / 1000)
+    client       = FplClient(base_url=base, concurrency=args.concurrency, retries=1)
+    out          = Path(tempfile.mkdtemp(prefix="fpl_ingest_"))
+    kw           = dict(client=client, concurrency=args.concurrency, rate=args.rate, burst=args.concurrency)
+    ok           = True
+
+    # 1. interrupted run
+    task = asyncio.create_task(ingest_history(out, **kw))
+    await asyncio.sleep(args.interrupt_after)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    saved = sum(1 for _ in open(out / CHECKPOINT_NAME))
+    print(f"interrupted after {args.interrupt_after:.1f} s : {saved} players checkpointed")
+
+    # 2. resume
+    t0  = time.perf_counter()
+    res = await ingest_history(out, **kw)
+    t_resume = time.perf_counter() - t0
+    print(f"resume                  : fetched {res['fetched']}, skipped {res['skipped']} in {t_resume:.2f} s")
+    ok &= res["fetched"] + saved == res["players"] and not res["failed"]
+
+    # 3. no-op
+    res = await ingest_history(out, **kw)
+    print(f"re-run                  : fetched {res['fetched']}, skipped {res['skipped']} in {res['seconds']:.2f} s")
+    ok &= res["fetched"] == 0
+
+    # 4. one revised player
+    pid = int(pd.read_csv(mock_fpl.DATA_DIR / "transfer_squad.csv")["player_id"].iloc[0])
+    mock_fpl.revise_history(server, pid)
+    res = await ingest_history(out, **kw)
+    print(f"after revising {pid:<8} : fetched {res['fetched']}, revised rows {res['revised_rows']}")
+    ok &= res["fetched"] == 1 and res["revised_rows"] == 1
+
+    # 5. full run from scratch, and the rebuilt CSV
+    fresh = Path(tempfile.mkdtemp(prefix="fpl_ingest_"))
+    t0    = time.perf_counter()
+    res   = await ingest_history(fresh, **kw)
+    t_new = time.perf_counter() - t0
+    rebuilt  = pd.read_csv(fresh / HISTORY_NAME)
+    original = pd.read_csv(mock_fpl.DATA_DIR / HISTORY_NAME)
+    same     = len(rebuilt) == len(original) and list(rebuilt.columns) == list(original.columns)
+    print(f"rebuilt CSV             : {len(rebuilt):,} rows (bundled: {len(original):,}) columns match={same}")
+    ok &= same
+
+    # 6. a new gameweek, 0 minutes
+    gw  = mock_fpl.add_round(server, pid)
+    res = await ingest_history(out, **kw)
+    hist = pd.read_csv(out / HISTORY_NAME)
+    got  = ((hist["player_id"] == pid) & (hist["round"] == gw)).sum()
+    print(f"{f'GW{gw} 0-minute row':<24}: fetched {res['fetched']}, new rows {res['new_rows']}, in CSV {got}")
+    ok &= res["fetched"] == res["players"] and res["new_rows"] == 1 and got == 1
+
+    t0 = time.perf_counter()
+    for p in range(1, 11):
+        await client.element_summary(p)
+    per_req = (time.perf_counter() - t0) / 10
+    print(f"full ingest             : {t_new:.2f} s for {res['players']} players "
+          f"(sequential loop + 0.2 s sleep ≈ {res['players'] * (per_req + 0.2):.0f} s)")
+
+    await client.aclose()
+    server.shutdown()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency-ms",      type=float, default=30)
+    ap.add_argument("--rate",            type=float, default=200)
+    ap.add_argument("--concurrency",     type=int,   default=16)
+    ap.add_argument("--interrupt-after", type=float, default=1.0)
+    sys.exit(asyncio.run(main(ap.parse_args())))
@@ -0,0 +1,185 @@
+"""
+Squad, XI and armband in one ILP (squad_model lineup=True) against the
+two-phase answer: squad on the sum of all 15, then pick_lineup().
+
+On the pruned bundled pool and on random pools, for several budgets:
+
+  - two-phase native (solve_squad) and two-phase CBC (SquadModel.solve),
+    timed and scored with lineup_value()
+  - the single solve, cold, warm-started from the native answer, and again
+    on the cached model, timed
+
+Checks that the single solve never scores below the two-phase answer, that
+its lineup is valid (quotas, clubs, budget, formation, armband on two
+different starters), and that /api/squad/optimize and
+/api/transfers/optimize (served from mock_fpl) never hand the armband to a
+bench player. Exits non-zero on any failure.
+
+    python bench/bench_lineup.py --pools 10
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+import pulp
+
+import mock_fpl
+from bench_squad_solver import random_pool
+from pruning import prune_pool
+from squad_model import (
+    MAX_PER_CLUB, SQUAD_QUOTAS, XI_MINIMUMS, SquadModel, lineup_value, pick_lineup,
+)
+from squad_solver import SearchLimit, solve_squad
+from transfer_model import build_transfer_model, solve_transfers
+
+DATA_DIR = Path(__file__).resolve().parent.parent.parent.parent / "Data" / "data"
+BUDGETS  = (800, 900, 1000, 1050)
+ITB_RAW  = 5
+
+
+def timed(fn):
+    t0  = time.perf_counter()
+    out = fn()
+    return out, (time.perf_counter() - t0) * 1000
+
+
+def problems(df: pd.DataFrame, lineup, budget: int) -> list:
+    pos, team = df["position"].to_numpy(), df["team"].to_numpy()
+    sel, st   = lineup.selected, lineup.starter
+    out       = []
+    if any((pos[sel] == p).sum() != q for p, q in SQUAD_QUOTAS.items()):
+        out.append("squad quotas")
+    if np.bincount(team[sel]).max() > MAX_PER_CLUB:
+        out.append("club cap")
+    if df["now_cost"].to_numpy()[sel].sum() > budget:
+        out.append("budget")
+    if st.sum() != 11 or (st & ~sel).any() or (pos[st] == "GK").sum() != 1 or \
+            any((pos[st] == p).sum() < n for p, n in XI_MINIMUMS.items()):
+        out.append("formation")
+    if lineup.captain == lineup.vice or not (st[lineup.captain] and st[lineup.vice]):
+        out.append("armband not on two starters")
+    return out
+
+
+def compare(df: pd.DataFrame, budget: int, fails: list, label: str) -> dict:
+    pts, pos = df["predicted_pts"].to_numpy(dtype=float), df["position"].to_numpy()
+    try:
+        (mask, _), t_native = timed(lambda: solve_squad(pts, df["now_cost"].to_numpy(), pos,
+                                                        df["team"].to_numpy(), budget, prune=False))
+        native = pick_lineup(pos, pts, mask)
+    except SearchLimit:
+        native, t_native = None, float("nan")
+    (chosen, _), t_two = timed(lambda: SquadModel(df).solve(pts, budget))
+    two_phase          = pick_lineup(pos, pts, chosen)
+
+    model              = SquadModel(df, lineup=True)
+    (cold, _), t_cold  = timed(lambda: model.solve_lineup(pts, budget, start=None))
+    model              = SquadModel(df, lineup=True)
+    (warm, _), t_warm  = timed(lambda: model.solve_lineup(pts, budget, start=native))
+    _, t_cached        = timed(lambda: model.solve_lineup(pts, budget))
+
+    base  = lineup_value(pts, two_phase)
+    one   = lineup_value(pts, warm)
+    if abs(lineup_value(pts, cold) - one) > 1e-6:
+        fails.append(f"{label}: cold and warm single solves differ")
+    if one < base - 1e-6:
+        fails.append(f"{label}: single solve {one:.3f} below two-phase {base:.3f}")
+    fails.extend(f"{label}: {p}" for p in problems(df, warm, budget))
+    return {"base": base, "one": one, "native": t_native, "two": t_two,
+            "cold": t_cold, "warm": t_warm, "cached": t_cached}
+
+
+def transfer_compare(opt_df: pd.DataFrame, budget: int, ft: int, hit: float, fails: list) -> tuple:
+    pts, pos = opt_df["predicted_pts"].to_numpy(dtype=float), opt_df["position"].to_numpy()
+    owned    = opt_df["in_current"].to_numpy() == 1
+
+    def value(lineup) -> float:
+        return lineup_value(pts, lineup) - hit * max(0, int((lineup.selected & ~owned).sum()) - ft)
+
+    prob, x, _, _ = build_transfer_model(opt_df, budget, ft, hit, lineup=False)
+    prob.solve(pulp.PULP_CBC_CMD(msg=0))
+    chosen  = np.array([(v.value() or 0) > 0.5 for v in x])
+    two     = pick_lineup(pos, pts, chosen)
+    top15   = np.flatnonzero(chosen)[np.argsort(-pts[chosen], kind="stable")][0]
+    one, _  = solve_transfers(opt_df, budget, ft, hit)
+    if value(one) < value(two) - 1e-6:
+        fails.append(f"transfers FT={ft} hit={hit}: {value(one):.3f} below two-phase {value(two):.3f}")
+    fails.extend(f"transfers FT={ft} hit={hit}: {p}" for p in problems(opt_df, one, budget))
+    return value(two), value(one), not two.starter[top15]
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pools", type=int, default=10)
+    ap.add_argument("--seed",  type=int, default=0)
+    args = ap.parse_args()
+
+    fails = []
+    preds = pd.read_csv(DATA_DIR / "player_predictions.csv")
+    preds["position"] = preds["element_type"].map({1: "GK", 2: "DEF", 3: "MID", 4: "FWD"})
+    pool, _ = prune_pool(preds)
+    bundled = {b: compare(pool, b, fails, f"bundled {b}") for b in BUDGETS}
+
+    rng    = np.random.default_rng(args.seed)
+    gains  = []
+    for k in range(args.pools):
+        df, _ = prune_pool(random_pool(rng, 400))
+        b     = int(rng.choice([800, 900, 1000, 1100]))
+        r     = compare(df, b, fails, f"random pool {k} ({b})")
+        gains.append(r["one"] - r["base"])
+
+    opt_df               = preds.reset_index(drop=True)
+    squad_ids            = pd.read_csv(DATA_DIR / "transfer_squad.csv")["player_id"].tolist()
+    opt_df["in_current"] = opt_df["player_id"].isin(squad_ids).astype(int)
+    budget_raw           = int(opt_df.loc[opt_df["in_current"] == 1, "now_cost"].sum()) + ITB_RAW
+    opt_df, _            = prune_pool(opt_df, keep=opt_df["in_current"].to_numpy() == 1)
+    transfers            = {(ft, hit): transfer_compare(opt_df, budget_raw, ft, hit, fails)
+                            for ft in (1, 2) for hit in (4, 0)}
+
+    # ── the routes never bench their captain ───────────────────────────────
+    server, base = mock_fpl.serve_in_thread()
+    os.environ.update(FPL_API_BASE=base, FPL_WARMUP="0")
+    import main
+    from fastapi.testclient import TestClient
+    routes = {}
+    with TestClient(main.app) as client:
+        for solver in ("lineup", "native", "cbc"):
+            times = []
+            for _ in range(5):
+                res, ms = timed(lambda: client.post("/api/squad/optimize",
+                                                    json={"budget": 100.0, "solver": solver}).json())
+                times.append(ms)
+            xi = {p["web_name"] for p in res["starters"]}
+            if res["captain"] not in xi or res["vice_captain"] not in xi or res["captain"] == res["vice_captain"]:
+                fails.append(f"/api/squad/optimize ({solver}): armband {res['captain']}/{res['vice_captain']} "
+                             f"not on two starters")
+            routes[solver] = (res["objective"], statistics.median(times))
+        for ft in (1, 3):
+            res = client.post("/api/transfers/optimize", json={"team_id": 1, "free_transfers": ft}).json()
+            xi  = {p["web_name"] for p in res["new_squad"] if p["is_starter"]}
+            if len(xi) != 11 or res["captain"] not in xi or res["vice_captain"] not in xi:
+                fails.append(f"/api/transfers/optimize FT={ft}: armband not on two starters")
+    server.shutdown()
+
+    print(f"bundled pool, {len(pool)} candidates after pruning (ms; objective = lineup_value)")
+    print(f"{'budget':>7s} {'native 2-ph':>11s} {'cbc 2-ph':>9s} {'one cold':>9s} {'one warm':>9s} "
+          f"{'cached':>7s} {'2-phase':>8s} {'single':>8s}")
+    for b, r in bundled.items():
+        print(f"{b / 10:6.1f}m {r['native']:11.1f} {r['two']:9.1f} {r['cold']:9.1f} {r['warm']:9.1f} "
+              f"{r['cached']:7.1f} {r['base']:8.3f} {r['one']:8.3f}")
+    print(f"random pools: {args.pools}, single solve gains mean {np.mean(gains):.3f}, max {np.max(gains):.3f}")
+    for (ft, hit), (two, one, benched) in transfers.items():
+        print(f"transfers FT={ft} hit={hit}: two-phase {two:.3f}, single {one:.3f}"
+              f"{'  (sorting all 15 would captain a bench player)' if benched else ''}")
+    for solver, (obj, ms) in routes.items():
+        print(f"/api/squad/optimize {solver:6s}: objective {obj:.3f}, median {ms:6.1f} ms")
+    for f in fails:
+        print(f"FAIL: {f}")
+    sys.exit(1 if fails else 0)
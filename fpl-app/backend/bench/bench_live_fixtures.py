@@ -0,0 +1,248 @@
+"""
+Load test of the live fixture stream (/api/fpl/fixtures/stream).
+
+Runs the app under uvicorn in a subprocess against mock_fpl and opens
+SUBSCRIBERS concurrent SSE connections (default 5,000) with aiohttp. A
+fixture is then put in play on the stub. The bench reports how long the
+update takes to reach the first and the last subscriber, the server-side
+render + encode cost of that event, and how many upstream /fixtures/ calls
+the single poller made. It runs once with a few subscribers and once with
+all of them, so fan-out and upstream load can be compared. It also checks:
+
+  - every subscriber got exactly the fixture that changed, with its new
+    score and minute
+  - a reconnect with Last-Event-ID resumes with the missed update; one
+    that fell out of the history, or is ahead of the server's (a restart),
+    gets a snapshot instead
+  - the poller stops once the last subscriber disconnects
+
+    python bench/bench_live_fixtures.py
+    FPL_SSE_SUBSCRIBERS=1000 python bench/bench_live_fixtures.py
+"""
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+import mock_fpl
+from live_fixtures import LiveFixtures
+
+SUBSCRIBERS = int(os.environ.get("FPL_SSE_SUBSCRIBERS", "5000"))
+POLL        = 0.25      # poller interval for the run (seconds)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def parse(buf: bytes) -> tuple[list, bytes]:
+    """Complete SSE events in `buf` as (id, event, data) and the unparsed rest."""
+    events = []
+    while b"\n\n" in buf:
+        block, buf = buf.split(b"\n\n", 1)
+        fields = {}
+        for line in block.decode().splitlines():
+            if line and not line.startswith(":"):
+                key, _, val = line.partition(": ")
+                fields[key] = val
+        if "data" in fields:
+            events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events, buf
+
+
+class Subscriber:
+    def __init__(self):
+        self.events = []        # (received at, id, event, data)
+        self.ready  = asyncio.Event()
+
+    async def run(self, session: aiohttp.ClientSession, url: str, last_id=None):
+        headers = {"Last-Event-ID": str(last_id)} if last_id is not None else {}
+        async with session.get(url, headers=headers) as resp:
+            buf = b""
+            async for chunk in resp.content.iter_any():
+                events, buf = parse(buf + chunk)
+                now = time.perf_counter()
+                self.events += [(now, *e) for e in events]
+                if events:
+                    self.ready.set()
+
+
+async def wait_for(cond, timeout: float = 60.0) -> bool:
+    end = time.perf_counter() + timeout
+    while not cond():
+        if time.perf_counter() > end:
+            return False
+        await asyncio.sleep(0.02)
+    return True
+
+
+async def fan_out(session, url, server, health, n: int, fid: int, minute: int, fails: list) -> dict:
+    """Open n subscribers, move fixture `fid`, time the update reaching all of them."""
+    subs  = [Subscriber() for _ in range(n)]
+    sem   = asyncio.Semaphore(500)            # stagger the connects, like real tabs
+    async def connect(s):
+        async with sem:
+            task = asyncio.create_task(s.run(session, url))
+            await s.ready.wait()
+            return task
+
+    t0    = time.perf_counter()
+    tasks = await asyncio.gather(*(connect(s) for s in subs))
+    t_connect = time.perf_counter() - t0
+    hits0     = server.RequestHandlerClass.hits.get("/fixtures", 0)
+
+    t_change = time.perf_counter()
+    mock_fpl.set_fixture(server, fid, started=True, finished=False, minutes=minute,
+                         team_h_score=minute % 4, team_a_score=1)
+    got = lambda s: any(e[2] == "update" for e in s.events)
+    if not await wait_for(lambda: all(got(s) for s in subs)):
+        fails.append(f"{n} subscribers: only {sum(map(got, subs))} got the update")
+    recv  = sorted(next(e[0] for e in s.events if e[2] == "update") for s in subs if got(s))
+    stats = (await health()).get("live", {})
+
+    # let the poller run a few more rounds with everyone connected
+    await asyncio.sleep(8 * POLL)
+    hits = server.RequestHandlerClass.hits.get("/fixtures", 0) - hits0
+    per_s = hits / (time.perf_counter() - t_change)
+
+    for s in subs:
+        upd = [e for e in s.events if e[2] == "update"]
+        if len(upd) != 1 or [f["id"] for f in upd[0][3]["fixtures"]] != [fid]:
+            fails.append(f"{n} subscribers: expected one update for fixture {fid}, got "
+                         f"{[[f['id'] for f in e[3]['fixtures']] for e in upd]}")
+            break
+        item = upd[0][3]["fixtures"][0]
+        if item["min"] != f"{minute}'" or not item["live"] or item["hg"] != minute % 4:
+            fails.append(f"{n} subscribers: wrong fixture state {item}")
+            break
+
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {
+        "n":          n,
+        "connect_s":  t_connect,
+        "first_ms":   (recv[0] - t_change) * 1000 if recv else float("nan"),
+        "median_ms":  (statistics.median(recv) - t_change) * 1000 if recv else float("nan"),
+        "last_ms":    (recv[-1] - t_change) * 1000 if recv else float("nan"),
+        "spread_ms":  (recv[-1] - recv[0]) * 1000 if recv else float("nan"),
+        "publish_ms": stats.get("publish_ms"),
+        "upstream":   per_s,
+        "snapshot":   next(e[1] for e in subs[0].events if e[2] == "snapshot"),
+    }
+
+
+async def history_check(fails: list) -> None:
+    """In-process: a subscriber behind the history, or ahead of it, gets a snapshot."""
+    state = [{"id": 1, "event": 1, "team_h_score": 0}]
+    async def fetch():
+        return [dict(fx) for fx in state]
+    async def render(fixtures):
+        return 1, [{"id": fx["id"], "hg": fx["team_h_score"]} for fx in fixtures]
+
+    hub = LiveFixtures(fetch, render, live_poll=3600, idle_poll=3600, history=2)
+    await hub.poll()
+    for goals in range(1, 5):
+        state[0]["team_h_score"] = goals
+        await hub.poll()
+    stale  = hub.stream(last_event_id=1)
+    first  = await stale.__anext__()
+    recent = hub.stream(last_event_id=hub.seq - 1)
+    second = await recent.__anext__()
+    ahead  = hub.stream(last_event_id=hub.seq + 100)
+    third  = await ahead.__anext__()
+    await stale.aclose(); await recent.aclose(); await ahead.aclose()
+    await hub.stop()
+    if b"event: snapshot" not in first or b'"hg":4' not in first:
+        fails.append("a subscriber behind the history did not get a fresh snapshot")
+    if b"event: update" not in second or b"snapshot" in second:
+        fails.append("Last-Event-ID within the history did not resume with the update")
+    if b"event: snapshot" not in third or b'"hg":4' not in third:
+        fails.append("a Last-Event-ID ahead of the server did not get a snapshot")
+
+
+async def main() -> int:
+    fails  = []
+    server, base = mock_fpl.serve_in_thread()
+    payl   = server.RequestHandlerClass.payloads
+    gw     = payl["current"]
+    fids   = [f["id"] for f in payl["fixtures"] if f["event"] == gw]
+    port   = free_port()
+    env    = dict(os.environ, FPL_API_BASE=base, FPL_WARMUP="0", FPL_LIVE_POLL=str(POLL),
+                  FPL_IDLE_POLL=str(POLL), FPL_SSE_KEEPALIVE="5")
+    proc   = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning",
+         "--backlog", "8192", "--timeout-keep-alive", "60"],
+        cwd=BACKEND, env=env,
+    )
+    app = f"http://127.0.0.1:{port}"
+    url = f"{app}/api/fpl/fixtures/stream"
+    try:
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0),
+                                         timeout=aiohttp.ClientTimeout(total=None)) as session:
+            async def health():
+                async with session.get(f"{app}/api/health") as r:
+                    return await r.json()
+            up = False
+            for _ in range(200):
+                try:
+                    await health(); up = True; break
+                except aiohttp.ClientError:
+                    await asyncio.sleep(0.05)
+            if not up:
+                print("FAIL: server did not start")
+                return 1
+
+            runs = []
+            for n, fid, minute in ((10, fids[0], 12), (SUBSCRIBERS, fids[1], 67)):
+                runs.append(await fan_out(session, url, server, health, n, fid, minute, fails))
+
+            # resume: Last-Event-ID from before the last update replays it
+            snap_id = runs[-1]["snapshot"]
+            sub     = Subscriber()
+            task    = asyncio.create_task(sub.run(session, url, last_id=snap_id))
+            await asyncio.wait_for(sub.ready.wait(), 10)
+            task.cancel()
+            kinds = [e[2] for e in sub.events]
+            if not kinds or kinds[0] != "update":
+                fails.append(f"Last-Event-ID {snap_id} resumed with {kinds} instead of the update")
+
+            # nobody left: the poller stops
+            await asyncio.sleep(3 * POLL)
+            polls = (await health())["live"]["polls"]
+            await asyncio.sleep(6 * POLL)
+            live  = (await health())["live"]
+            if live["subscribers"] != 0 or live["polls"] != polls:
+                fails.append(f"poller still running without subscribers: {live}")
+
+        await history_check(fails)
+    finally:
+        proc.terminate()
+        proc.wait(10)
+        server.shutdown()
+
+    print(f"{'subscribers':>11s} {'connect':>8s} {'first':>9s} {'median':>9s} {'last':>9s} "
+          f"{'spread':>9s} {'render+enc':>10s} {'upstream/s':>10s}")
+    for r in runs:
+        print(f"{r['n']:11d} {r['connect_s']:7.2f}s {r['first_ms']:7.1f}ms {r['median_ms']:7.1f}ms "
+              f"{r['last_ms']:7.1f}ms {r['spread_ms']:7.1f}ms {r['publish_ms']:8.3f}ms {r['upstream']:10.1f}")
+    print(f"(poll every {POLL}s; 'first' includes up to one poll interval of wait)")
+    for f in fails:
+        print(f"FAIL: {f}")
+    return 1 if fails else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,158 @@
+"""
+Instrumentation (metrics.py) against mock_fpl. Checks:
+
+  - ?profile=1 on /api/transfers/optimize returns its span breakdown (both
+    upstream calls, pandas prep, ILP build/solve/parse, serialisation) in the
+    body and in Server-Timing; list bodies get the header only and are
+    unchanged
+  - /metrics parses as Prometheus text, labels requests by route template
+    (/api/transfers/squad/{team_id}, never a raw id), and its request counts
+    match what was sent
+
+Then measures the overhead: each route is called straight through ASGI
+with instrumentation switched on and off on alternate requests, and the
+median slowdown of every route must stay under OVERHEAD_BUDGET (2%). The
+raw cost of a span and of the middleware is printed too.
+
+    python bench/bench_metrics.py
+"""
+import os
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import mock_fpl
+
+OVERHEAD_BUDGET = float(os.environ.get("FPL_METRICS_BUDGET", "0.02"))
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?:[a-zA-Z_]+="(?:[^"\\]|\\.)*",?)*\})? (-?[0-9.e+-]+|\+Inf|NaN)$')
+
+
+def median_ms(fn, n: int) -> float:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+if __name__ == "__main__":
+    server, base = mock_fpl.serve_in_thread()
+    os.environ["FPL_API_BASE"] = base
+    os.environ["FPL_WARMUP"]   = "0"
+
+    import main
+    import metrics
+    from fastapi.testclient import TestClient
+
+    fails    = []
+    transfer = {"team_id": 1234, "free_transfers": 1}
+    with TestClient(main.app) as client:
+        client.get("/api/players")
+        client.post("/api/transfers/optimize", json=transfer)
+
+        # ── profile mode ──────────────────────────────────────────────────────
+        main.bootstrap.invalidate()
+        r    = client.post("/api/transfers/optimize?profile=1", json=transfer)
+        prof = r.json().get("profile", {})
+        names = set(prof.get("by_name", {}))
+        want  = {"upstream /entry/{id}/", "upstream /entry/{id}/event/{id}/picks/", "squad.match",
+                 "transfers.prepare", "ilp.transfers.build", "ilp.transfers.solve",
+                 "ilp.transfers.parse", "transfers.result", "serialize", "refresh /bootstrap-static/"}
+        if want - names:
+            fails.append(f"profile is missing spans {sorted(want - names)}")
+        if "server-timing" not in r.headers or "ilp.transfers.solve;dur=" not in r.headers["server-timing"]:
+            fails.append("no Server-Timing header on a profiled request")
+        end = max((s["start_ms"] + s["ms"] for s in prof.get("spans", [])), default=0)
+        if not prof or end > prof["total_ms"] * 1.01:
+            fails.append(f"spans end at {end:.1f} ms, after the request ({prof.get('total_ms')} ms)")
+        print("POST /api/transfers/optimize?profile=1")
+        for s in prof.get("spans", []):
+            print(f"  {s['start_ms']:8.2f} ms  {'  ' * s['depth']}{s['name']:<40s} {s['ms']:8.2f} ms")
+        print(f"  total {prof.get('total_ms', 0):.2f} ms\n")
+
+        plain    = client.get("/api/players?limit=5")
+        profiled = client.get("/api/players?limit=5&profile=1")
+        if profiled.json() != plain.json() or "server-timing" not in profiled.headers:
+            fails.append("a profiled list response changed or lacks Server-Timing")
+
+        # ── /metrics ──────────────────────────────────────────────────────────
+        before = metrics.REQUESTS.snapshot()
+        for _ in range(3):
+            client.get("/api/transfers/squad/1234")
+        text = client.get("/metrics").text
+        bad  = [l for l in text.splitlines() if l and not l.startswith("#") and not SAMPLE.match(l)]
+        if bad:
+            fails.append(f"{len(bad)} malformed /metrics lines, e.g. {bad[0]!r}")
+        if 'route="/api/transfers/squad/{team_id}"' not in text or "/api/transfers/squad/1234" in text:
+            fails.append("requests not labelled by route template")
+        key   = ("/api/transfers/squad/{team_id}", "GET", "200")
+        delta = metrics.REQUESTS.snapshot()[key][0] - before.get(key, (0, 0))[0]
+        if delta != 3:
+            fails.append(f"request counter moved by {delta}, expected 3")
+        for name in ("fpl_response_cache_hits_total", "fpl_upstream_fetches_total", 'span="ilp.transfers.solve"'):
+            if name not in text:
+                fails.append(f"/metrics lacks {name}")
+
+        # ── overhead ──────────────────────────────────────────────────────────
+    # straight into the ASGI app on one loop, alternating on/off per request
+    import asyncio
+    import httpx
+
+    async def overhead() -> list:
+        rows = []
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as ac:
+            routes = {
+                "GET  /api/players (cache hit)": (lambda: ac.get("/api/players"), 4000),
+                "POST /api/squad/optimize":      (lambda: ac.post("/api/squad/optimize", json={"budget": 100}), 200),
+                "POST /api/transfers/optimize":  (lambda: ac.post("/api/transfers/optimize", json=transfer), 100),
+            }
+            for label, (fn, n) in routes.items():
+                await fn()
+                times = {False: [], True: []}
+                for i in range(n):
+                    metrics.METRICS_ENABLED = bool(i % 2)
+                    t0 = time.perf_counter()
+                    await fn()
+                    times[bool(i % 2)].append((time.perf_counter() - t0) * 1000)
+                metrics.METRICS_ENABLED = True
+                rows.append((label, statistics.median(times[False]), statistics.median(times[True])))
+        return rows
+
+    print(f"{'route':32s} {'off':>9s} {'on':>9s} {'overhead':>9s}")
+    overheads = []
+    for label, t_off, t_on in asyncio.run(overhead()):
+        overheads.append(t_on / t_off - 1)
+        print(f"{label:32s} {t_off:7.3f}ms {t_on:7.3f}ms {100 * (t_on / t_off - 1):+8.2f}%")
+    if max(overheads) > OVERHEAD_BUDGET:
+        fails.append(f"overhead {100 * max(overheads):.2f}% over {100 * OVERHEAD_BUDGET:.0f}%")
+
+    # raw costs, outside any request
+    def spans():
+        for _ in range(10_000):
+            with metrics.span("bench"):
+                pass
+    t_span = median_ms(spans, 5) / 10_000 * 1000
+
+    async def noop(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+    async def nosend(message):
+        pass
+    scope = {"type": "http", "method": "GET", "query_string": b"", "path": "/"}
+    async def calls(app, n=10_000):
+        for _ in range(n):
+            await app(dict(scope), None, nosend)
+    mw     = metrics.MetricsMiddleware(noop)
+    t_mw   = (median_ms(lambda: asyncio.run(calls(mw)), 5) - median_ms(lambda: asyncio.run(calls(noop)), 5)) / 10_000 * 1000
+    print(f"\nspan enter+exit : {t_span:6.2f} µs")
+    print(f"middleware      : {t_mw:6.2f} µs per request")
+
+    for f in fails:
+        print(f"FAIL: {f}")
+    sys.exit(1 if fails else 0)
@@ -0,0 +1,161 @@
+"""
+PlayerIndex (player_index.py) against the old /api/players filter-and-sort,
+on the real predictions snapshot served through mock_fpl: checks a few
+thousand random queries (position, price, availability, team, minutes, xGI,
+limit) return the same rows in the same order, that walking the cursors
+pages through exactly the full result, and that a cursor still works on a
+reordered snapshot. Times the old per-request pandas path against index
+queries (median and p99, µs) and fails if p99 goes over QUERY_BUDGET_US.
+Finally pages through the route itself via X-Next-Cursor.
+
+    python bench/bench_player_index.py
+"""
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import mock_fpl
+from player_index import OUTPUT_COLUMNS, POSITIONS, PlayerIndex, decode_cursor, encode_cursor
+
+QUERY_BUDGET_US = float(os.environ.get("FPL_QUERY_BUDGET_US", "1000"))
+QUERIES         = 3000
+
+
+def legacy(df, position=None, max_price=15.0, only_available=True, limit=50,
+           team=None, min_minutes=None, min_xgi=None, after=None, tie_break=True):
+    """The old _players_payload, extended with the new filters."""
+    if position:
+        df = df[df["position"] == position]
+    df = df[df["price"] <= max_price]
+    if only_available:
+        df = df[df["status"] == "a"]
+    if team is not None:
+        df = df[df["team"] == team]
+    if min_minutes is not None:
+        df = df[df["avg_minutes_last3"] >= min_minutes]
+    if min_xgi is not None:
+        df = df[df["avg_xgi_last3"] >= min_xgi]
+    if tie_break:
+        df = df.sort_values(["predicted_pts", "player_id"], ascending=[False, True], kind="stable")
+    else:
+        df = df.sort_values("predicted_pts", ascending=False)
+    df   = df.head(limit)
+    cols = [c for c in OUTPUT_COLUMNS if c in df.columns]
+    return df[cols].fillna(0).to_dict(orient="records")
+
+
+def random_query(rng: random.Random, teams: list) -> dict:
+    q = {"position": rng.choice((None, *POSITIONS)), "max_price": rng.choice((4.5, 5.5, 7.0, 9.5, 15.0)),
+         "only_available": rng.random() < 0.7, "limit": rng.choice((1, 5, 20, 50, 200, 1000))}
+    if rng.random() < 0.3:
+        q["team"] = rng.choice(teams)
+    if rng.random() < 0.3:
+        q["min_minutes"] = rng.choice((0, 45, 60, 80))
+    if rng.random() < 0.3:
+        q["min_xgi"] = rng.choice((0.0, 0.1, 0.3, 0.6))
+    return q
+
+
+def timed_us(fn, n: int = 1) -> list:
+    out = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1e6)
+    return out
+
+
+if __name__ == "__main__":
+    server, base = mock_fpl.serve_in_thread()
+    os.environ["FPL_API_BASE"] = base
+    os.environ["FPL_WARMUP"]   = "0"
+
+    import main
+    from fastapi.testclient import TestClient
+
+    fails = []
+    with TestClient(main.app) as client:
+        client.get("/api/players")
+        df = main.predictions.current().frame
+
+        t_build = statistics.median(timed_us(lambda: PlayerIndex(df), 10))
+        index   = PlayerIndex(df)
+        teams   = sorted(df["team"].unique().tolist())
+        rng     = random.Random(7)
+        queries = [random_query(rng, teams) for _ in range(QUERIES)]
+
+        # same rows, same order
+        for q in queries:
+            rows, _ = index.query(**q)
+            if rows != legacy(df, **q):
+                fails.append(f"query {q} differs from the pandas filter")
+                break
+            plain = legacy(df, **q, tie_break=False)
+            if [r["predicted_pts"] for r in rows] != [r["predicted_pts"] for r in plain]:
+                fails.append(f"query {q} ranks differently from the old sort")
+                break
+
+        # cursors page through exactly the full result
+        for q in queries[:300]:
+            full = legacy(df, **{**q, "limit": 10_000})
+            got, after, pages = [], None, 0
+            while True:
+                rows, after = index.query(**{**q, "limit": 7, "after": after})
+                got += rows
+                pages += 1
+                if after is None or pages > 1000:
+                    break
+                after = decode_cursor(encode_cursor(after))
+            if got != full:
+                fails.append(f"paging {q} returned {len(got)} rows, expected {len(full)}")
+                break
+
+        # a cursor from one snapshot continues on a reordered one
+        _, after = index.query(limit=20)
+        moved    = df.assign(predicted_pts=(df["predicted_pts"] * 1.1).round(2))
+        rows, _  = PlayerIndex(moved).query(limit=10_000, after=after)
+        expect   = [r for r in legacy(moved, limit=10_000)
+                    if (-r["predicted_pts"], r["player_id"]) > (-after[0], after[1])]
+        if rows != expect:
+            fails.append("cursor did not carry over to a reordered snapshot")
+
+        # timings
+        sample   = queries[:300]
+        t_legacy = [t for q in sample[:100] for t in timed_us(lambda: legacy(df, **q, tie_break=False))]
+        t_index  = [t for q in sample for t in timed_us(lambda: index.query(**q), 5)]
+        t_page   = timed_us(lambda: index.query(position="MID", limit=20, after=after), 2000)
+        p99      = statistics.quantiles(t_index, n=100)[98]
+        print(f"index build (per snapshot)   : {t_build / 1000:8.2f} ms")
+        print(f"old pandas filter + sort     : {statistics.median(t_legacy):8.1f} µs median")
+        print(f"index query                  : {statistics.median(t_index):8.1f} µs median, {p99:.1f} µs p99")
+        print(f"index query, from a cursor   : {statistics.median(t_page):8.1f} µs median")
+        if p99 > QUERY_BUDGET_US:
+            fails.append(f"index query p99 {p99:.0f} µs over the {QUERY_BUDGET_US:.0f} µs budget")
+
+        # the route: X-Next-Cursor pages, filters, errors
+        url, params, got = "/api/players", {"position": "DEF", "limit": 15, "min_minutes": 60}, []
+        while True:
+            r = client.get(url, params=params)
+            got += r.json()
+            if "x-next-cursor" not in r.headers:
+                break
+            params = {**params, "cursor": r.headers["x-next-cursor"]}
+        if got != legacy(df, position="DEF", limit=10_000, min_minutes=60):
+            fails.append("route pagination differs from the full result")
+        team_name = df["team_name"].iloc[0]
+        by_name   = client.get(url, params={"team": team_name.upper(), "limit": 100}).json()
+        if not by_name or {p["team_name"] for p in by_name} != {team_name}:
+            fails.append(f"team={team_name!r} filter failed")
+        if client.get(url, params={"cursor": "%%%"}).status_code != 400:
+            fails.append("a malformed cursor was not rejected")
+        if client.get(url, params={"team": "Nowhere FC"}).status_code != 400:
+            fails.append("an unknown team was not rejected")
+
+    for f in fails:
+        print(f"FAIL: {f}")
+    sys.exit(1 if fails else 0)
@@ -0,0 +1,85 @@
+"""
+/api/predict against mock_fpl: time to score every player with the served
+model (feature matrix + one predict call, cache cleared each run), a cached
+request, and a request with per-player overrides. Also checks overrides only
+rescore the overridden players and that a changed price busts the cache.
+
+    python bench/bench_predict.py
+"""
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import mock_fpl
+
+TARGET_MS = 20.0
+
+
+def median_ms(fn, n: int) -> float:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+if __name__ == "__main__":
+    server, base = mock_fpl.serve_in_thread()
+    os.environ["FPL_API_BASE"] = base
+
+    import main
+    from fastapi.testclient import TestClient
+
+    fails = []
+    with TestClient(main.app) as client:
+        first = client.post("/api/predict", json={}).json()
+        print(f"players scored     : {first['scored']} (gameweek {first['gameweek']}, model {first['model_version']})")
+
+        # in-process scoring cost with the cache cleared every run
+        model    = main.get_model()
+        boot     = main.bootstrap._entry.data
+        fixtures = main.fixtures_cache._entry.data
+
+        def cold():
+            main.scorer._cache.clear()
+            return main.scorer.score(model, main._model_version, boot["elements"], fixtures, "bench")
+
+        runs    = [cold()["timings_ms"] for _ in range(30)]
+        feat_ms = statistics.median(r["features"] for r in runs)
+        pred_ms = statistics.median(r["predict"] for r in runs)
+        total   = median_ms(cold, 30)
+
+        hot = median_ms(lambda: client.post("/api/predict", json={"limit": 50}), 50)
+        top = first["players"][0]
+        ov  = {"overrides": {str(top["player_id"]): {"avg_minutes_last3": 0, "avg_pts_last3": 0}}}
+        t_ov = median_ms(lambda: client.post("/api/predict", json={**ov, "limit": 50}), 50)
+
+        res     = client.post("/api/predict", json={**ov, "player_ids": [top["player_id"]]}).json()
+        changed = [p for p in res["players"] if p["overridden"]]
+        if not (changed and changed[0]["predicted_pts"] != top["predicted_pts"]):
+            fails.append("override did not rescore the player")
+        again = client.post("/api/predict", json={}).json()
+        if not again["cached"] or again["players"] != first["players"]:
+            fails.append("cached base changed after an override")
+
+        el = next(e for e in server.RequestHandlerClass.payloads["bootstrap"]["elements"] if e["id"] == top["player_id"])
+        el["now_cost"] += 5
+        server.RequestHandlerClass._encoded.clear()
+        main.bootstrap.invalidate()
+        after = client.post("/api/predict", json={"player_ids": [top["player_id"]]}).json()
+        if after["cached"] or after["data_version"] == first["data_version"]:
+            fails.append("price change did not produce a new data version")
+
+    print(f"score all (cold)   : {total:6.2f} ms  (features {feat_ms:.2f} ms + predict {pred_ms:.2f} ms)"
+          f"  target < {TARGET_MS:.0f} ms")
+    print(f"request, cached    : {hot:6.2f} ms")
+    print(f"request, override  : {t_ov:6.2f} ms")
+    print(f"override rescored  : {top['web_name']} {top['predicted_pts']} -> {changed[0]['predicted_pts'] if changed else '?'}")
+    for f in fails:
+        print(f"FAIL: {f}")
+    sys.exit(1 if fails else 0)
@@ -0,0 +1,123 @@
+"""
+Hot reload of the prediction snapshot, against a copy of Data/data and
+mock_fpl, without restarting the app:
+
+  - touching the predictions file reloads it but keeps the version (and the
+    cached squad model)
+  - rewriting it with a changed prediction gives a new version that
+    /api/players serves straight away
+  - an injury in bootstrap-static gives a new version without the player
+    in the available pool
+  - the snapshot's arrays are read-only and a write to a route's frame
+    leaves it alone
+
+Also times /api/players and /api/squad/optimize on a warm snapshot, and
+the full-frame .copy() each route used to make.
+
+    python bench/bench_prediction_store.py
+"""
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+import mock_fpl
+
+ROOT_DIR = Path(__file__).resolve().parent.parent.parent.parent
+
+
+def timed(fn, n: int = 50) -> float:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+if __name__ == "__main__":
+    tmp = Path(tempfile.mkdtemp())
+    for name in ("player_predictions.csv", "fpl_gameweek_history.csv", "transfer_squad.csv"):
+        shutil.copy(ROOT_DIR / "Data" / "data" / name, tmp / name)
+    os.environ["FPL_DATA_DIR"]          = str(tmp)
+    os.environ["FPL_PREDICTIONS_POLL"]  = "0"     # re-check the files on every request
+
+    server, base = mock_fpl.serve_in_thread()
+    os.environ["FPL_API_BASE"] = base
+
+    import main
+    from fastapi.testclient import TestClient
+
+    preds = tmp / "player_predictions.csv"
+    fails = []
+
+    def check(label: str, ok: bool, detail: str = "") -> None:
+        print(f"{label:44s} {'ok' if ok else 'FAIL'} {detail}")
+        if not ok:
+            fails.append(label)
+
+    with TestClient(main.app) as client:
+        version = lambda: client.get("/api/predictions/version").json()
+        v0      = version()
+        client.post("/api/squad/optimize", json={"budget": 100, "solver": "cbc"})
+        warm    = client.post("/api/squad/optimize", json={"budget": 100, "solver": "cbc"}).json()
+
+        os.utime(preds)
+        v1     = version()
+        cached = client.post("/api/squad/optimize", json={"budget": 100, "solver": "cbc"}).json()["model_cached"]
+        check("touch: reloaded, same version, model cached",
+              v1["reloads"] == v0["reloads"] + 1 and v1["version"] == v0["version"] and cached and warm["model_cached"],
+              f"{v0['version']} reloads {v0['reloads']}->{v1['reloads']}")
+
+        df  = pd.read_csv(preds)
+        top = df.loc[df["predicted_pts"].idxmin(), "player_id"]
+        df.loc[df["player_id"] == top, "predicted_pts"] = 30.0
+        df.to_csv(preds, index=False)
+        v2    = version()
+        first = client.get("/api/players", params={"limit": 1}).json()[0]
+        check("edit: new version, served without restart",
+              v2["version"] != v1["version"] and first["player_id"] == top and first["predicted_pts"] == 30.0,
+              f"{v1['version']} -> {v2['version']}")
+        cached = client.post("/api/squad/optimize", json={"budget": 100, "solver": "cbc"}).json()["model_cached"]
+        check("edit: squad model rebuilt for new version", not cached)
+
+        mock_fpl.set_status(server, int(top), "i", "Knee injury")
+        main.bootstrap.invalidate()
+        v3  = version()
+        ids = [p["player_id"] for p in client.get("/api/players", params={"limit": 1000}).json()]
+        check("injury: new version, player unavailable", v3["version"] != v2["version"] and top not in ids,
+              f"{v2['version']} -> {v3['version']}")
+
+        snap   = main.predictions.current()
+        before = snap.frame["predicted_pts"].to_numpy().copy()
+        local  = snap.frame[snap.frame["status"] == "a"]
+        local.loc[local.index[0], "predicted_pts"] = -1.0
+        whole  = snap.frame.copy(deep=False)
+        try:
+            whole.loc[whole.index[0], "predicted_pts"] = -1.0     # copies under copy-on-write, raises without
+        except ValueError:
+            pass
+        blocks = [b.values for b in snap.frame._mgr.blocks if isinstance(b.values, np.ndarray)]
+        check("snapshot: read-only, writes stay local",
+              not any(v.flags.writeable for v in blocks)
+              and np.array_equal(snap.frame["predicted_pts"].to_numpy(), before))
+
+        main.predictions.poll = 2.0
+        t_players = timed(lambda: client.get("/api/players", params={"limit": 50}))
+        t_squad   = timed(lambda: client.post("/api/squad/optimize", json={"budget": 100}))
+        frame     = main.predictions.current().frame
+        t_copy    = timed(frame.copy, 500)
+
+    print(f"\nGET  /api/players         : {t_players:6.2f} ms median")
+    print(f"POST /api/squad/optimize  : {t_squad:6.2f} ms median")
+    print(f"frame.copy() avoided      : {t_copy:6.3f} ms per route call")
+    shutil.rmtree(tmp, ignore_errors=True)
+    sys.exit(1 if fails else 0)
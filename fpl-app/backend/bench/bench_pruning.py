@@ -0,0 +1,73 @@
+"""
+Measure what dominance pruning saves in both optimizers.
+
+Runs /api/squad/optimize (lineup, native and cbc) and /api/transfers/optimize against
+the bundled data served by mock_fpl, with prune on and off, checks the answers
+match and prints the candidate counts and median timings.
+
+    python bench/bench_pruning.py --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+import mock_fpl
+
+
+def _time(client, path: str, body: dict, repeat: int) -> tuple[dict, float]:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        r  = client.post(path, json=body)
+        times.append((time.perf_counter() - t0) * 1000)
+        r.raise_for_status()
+    return r.json(), float(np.median(times))
+
+
+def _squad_key(res: dict) -> tuple:
+    return tuple(sorted(p["web_name"] for p in res["starters"] + res["bench"]))
+
+
+def _transfer_key(res: dict) -> tuple:
+    return tuple(sorted(p["player_id"] for p in res["new_squad"]))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    _, base = mock_fpl.serve_in_thread()
+    os.environ["FPL_API_BASE"] = base
+
+    import main
+    from fastapi.testclient import TestClient
+
+    cases = [
+        ("squad lineup",  "/api/squad/optimize",     {"budget": 100.0, "solver": "lineup"}, _squad_key),
+        ("squad native",  "/api/squad/optimize",     {"budget": 100.0, "solver": "native"}, _squad_key),
+        ("squad cbc",     "/api/squad/optimize",     {"budget": 100.0, "solver": "cbc"},    _squad_key),
+        ("transfers",     "/api/transfers/optimize", {"team_id": 1, "free_transfers": 1},   _transfer_key),
+        ("transfers 3FT", "/api/transfers/optimize", {"team_id": 1, "free_transfers": 3},   _transfer_key),
+    ]
+    failures = 0
+    with TestClient(main.app) as client:
+        for name, path, body, key in cases:
+            client.post(path, json=body)   # warm caches
+            full,   t_full   = _time(client, path, {**body, "prune": False}, args.repeat)
+            pruned, t_pruned = _time(client, path, {**body, "prune": True},  args.repeat)
+            same   = key(full) == key(pruned)
+            failures += not same
+            p = pruned["pruning"]
+            print(f"{name:14s}: {p['candidates']:4d} -> {p['kept']:4d} candidates "
+                  f"({p['removed']} removed in {p['ms']:.1f} ms) | "
+                  f"{t_full:7.1f} ms -> {t_pruned:7.1f} ms "
+                  f"(saved {t_full - t_pruned:6.1f} ms) | {'same answer' if same else 'MISMATCH'}")
+
+    sys.exit(1 if failures else 0)
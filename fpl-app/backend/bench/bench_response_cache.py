@@ -0,0 +1,110 @@
+"""
+The GET response cache against mock_fpl: median latency of each cached route
+uncached (cache cleared before every request), on a hit, and as a 304. Also
+checks that cached bodies equal uncached ones, that If-None-Match gets a 304,
+that differently spelled but equivalent params share an entry, that a news
+change (new bootstrap version) produces a new body and ETag, and that the
+LRU stays within its bounds.
+
+    python bench/bench_response_cache.py
+"""
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import mock_fpl
+
+ROUTES = [
+    "/api/players",
+    "/api/players?position=MID&max_price=8&limit=20",
+    "/api/model/insights",
+    "/api/fpl/fixtures",
+    "/api/fpl/news?limit=20",
+    "/api/pl/table",
+]
+
+
+def median_ms(fn, n: int) -> float:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+if __name__ == "__main__":
+    server, base = mock_fpl.serve_in_thread()
+    os.environ["FPL_API_BASE"] = base
+    os.environ["FPL_WARMUP"]   = "0"
+
+    import main
+    from fastapi.testclient import TestClient
+    from response_cache import ResponseCache
+
+    cache = main.responses
+    fails = []
+    with TestClient(main.app) as client:
+        for url in ROUTES:                      # fill the upstream caches first
+            assert client.get(url).status_code == 200, url
+
+        print(f"{'route':50s} {'uncached':>9s} {'hit':>9s} {'304':>9s}   bytes")
+        for url in ROUTES:
+            def uncached():
+                cache.clear()
+                return client.get(url)
+
+            ref  = client.get(url)
+            etag = ref.headers["etag"]
+            t_miss = median_ms(uncached, 30)
+            t_hit  = median_ms(lambda: client.get(url), 50)
+            t_304  = median_ms(lambda: client.get(url, headers={"If-None-Match": etag}), 50)
+            print(f"{url:50s} {t_miss:7.2f}ms {t_hit:7.2f}ms {t_304:7.2f}ms   {len(ref.content)}")
+
+            cache.enabled = False
+            plain = client.get(url)
+            cache.enabled = True
+            if plain.json() != ref.json() or plain.headers["etag"] != etag:
+                fails.append(f"{url}: cached body differs from a freshly built one")
+            r304 = client.get(url, headers={"If-None-Match": f'W/{etag}, "other"'})
+            if r304.status_code != 304 or r304.content:
+                fails.append(f"{url}: If-None-Match did not give an empty 304")
+
+        # equivalent params share one entry
+        client.get("/api/players?position=MID")
+        hits = cache.hits
+        client.get("/api/players?position=mid&max_price=15&only_available=true&limit=50")
+        if cache.hits != hits + 1:
+            fails.append("equivalent query params missed the cache")
+
+        # a news change is a new bootstrap version: new body, new ETag, old entries gone
+        before = client.get("/api/fpl/news?limit=20")
+        pid    = main.bootstrap._entry.data["elements"][0]["id"]
+        mock_fpl.set_status(server, pid, "i", "Hamstring injury - Expected back 01 Jan")
+        main.bootstrap.invalidate()
+        client.get("/api/health")
+        after = client.get("/api/fpl/news?limit=20")
+        if after.json() == before.json() or after.headers["etag"] == before.headers["etag"]:
+            fails.append("news did not change after a bootstrap update")
+        if not any(n["id"] == pid for n in after.json()):
+            fails.append("new injury missing from the news feed")
+        stale = [k for k in cache._entries if k[0] == "news" and k[1] != str(main.bootstrap.version)]
+        if stale:
+            fails.append(f"{len(stale)} news entries for old bootstrap versions kept")
+        stats = cache.stats()
+
+    small = ResponseCache(max_entries=3, max_bytes=1000)
+    for i in range(6):
+        small._put(("r", "v1", str(i)), type(next(iter(cache._entries.values())))(b"x" * 300, '"e"'))
+    if len(small._entries) > 3 or small._bytes > 1000 or small.evictions != 3:
+        fails.append(f"LRU bounds not kept: {small.stats()}")
+
+    print(f"\ncounters: hits {stats['hits']}, misses {stats['misses']}, 304 {stats['not_modified']}, "
+          f"evictions {stats['evictions']}, {stats['entries']} entries / {stats['bytes'] / 1e3:.0f} kB")
+    for f in fails:
+        print(f"FAIL: {f}")
+    sys.exit(1 if fails else 0)
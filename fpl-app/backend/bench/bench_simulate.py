@@ -0,0 +1,157 @@
+"""
+Monte Carlo squad evaluation (simulation.py) on the stored history and the
+served model, against mock_fpl. Prints throughput in scenarios per second:
+
+  - sample() for a 15-man squad and for every player at once
+  - evaluate() (autosubs, armband, every starter as captain) next to a
+    plain per-scenario loop over the FPL rules
+  - /api/squad/simulate end to end
+
+Checks that evaluate() gives the loop's totals, that each player's mean
+over the scenarios stays their prediction, that teammates' points are
+correlated and different clubs' are not, and that a seed repeats its
+response.
+
+    python bench/bench_simulate.py
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import mock_fpl
+
+LOOP_SCENARIOS = 2_000
+MEAN_TOLERANCE = 0.03       # relative, summed over the 100 highest predictions
+
+
+def timed(fn, *args):
+    t0  = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def loop_evaluate(points, played, positions, captain: int, vice: int) -> np.ndarray:
+    """The FPL autosub and captaincy rules, one scenario at a time."""
+    totals = np.zeros(len(points))
+    for s in range(len(points)):
+        team = list(range(11))
+        for b in range(11, len(positions)):
+            if not played[s, b]:
+                continue
+            for k, j in enumerate(team):
+                if j >= 11 or played[s, j] or (positions[j] == "GK") != (positions[b] == "GK"):
+                    continue
+                after = [positions[i] for i in team[:k] + [b] + team[k + 1:]]
+                if all(after.count(p) >= n for p, n in simulation.FORMATION_MIN.items()):
+                    team[k] = b
+                    break
+        armband    = points[s, captain] if played[s, captain] else points[s, vice] if played[s, vice] else 0
+        totals[s]  = sum(points[s, i] for i in team) + armband
+    return totals
+
+
+if __name__ == "__main__":
+    server, base = mock_fpl.serve_in_thread()
+    os.environ.update(FPL_API_BASE=base, FPL_WARMUP="0")
+
+    import main
+    import simulation
+    from fastapi.testclient import TestClient
+
+    fails = []
+    with TestClient(main.app) as client:
+        squad = client.post("/api/squad/optimize", json={}).json()
+        client.post("/api/predict", json={"limit": 1})          # bootstrap + fixtures in the caches
+        boot  = main.bootstrap._entry.data
+        ids   = {e["web_name"]: e["id"] for e in boot["elements"]}
+        order = [ids[p["web_name"]] for p in squad["starters"] + squad["bench"]]
+        body  = {"player_ids": order, "seed": 7}
+
+        first, t_cold = timed(lambda: client.post("/api/squad/simulate", json=body).json())
+        again, t_warm = timed(lambda: client.post("/api/squad/simulate", json=body).json())
+        big, t_big    = timed(lambda: client.post("/api/squad/simulate", json={**body, "scenarios": 100_000}).json())
+        if {**first, "timings_ms": None} != {**again, "timings_ms": None}:
+            fails.append("the same seed gave a different response")
+        if client.post("/api/squad/simulate", json={"player_ids": order[:14]}).status_code != 400:
+            fails.append("a 14-man squad was accepted")
+
+        elements = boot["elements"]
+        fixtures = main.fixtures_cache._entry.data
+        model    = main.get_model()
+        scored   = main.scorer.score(model, main._model_version, elements, fixtures, "bench")
+        pool     = main.simulator.pool(model, main._model_version, elements, fixtures, "bench")
+    server.shutdown()
+
+    pos_map   = {1: "GK", 2: "DEF", 3: "MID", 4: "FWD"}
+    row       = {e["id"]: i for i, e in enumerate(elements)}
+    idx       = [row[p] for p in order]
+    positions = [pos_map[elements[i]["element_type"]] for i in idx]
+    teams     = [elements[i]["team"] for i in idx]
+    predicted = scored["predicted"][idx]
+    fixtures  = scored["fixtures"][idx]
+    rng       = np.random.default_rng(0)
+
+    # ── sample + evaluate throughput ─────────────────────────────────────────
+    rates = []
+    for n in (10_000, 50_000, 200_000):
+        (pts, played), t_s = timed(pool.sample, predicted, order, teams, positions, fixtures, n, rng)
+        _, t_e             = timed(simulation.evaluate, pts, played, positions, 0, 1)
+        rates.append((n, n / t_s, n / t_e, n / (t_s + t_e)))
+
+    all_pos = [pos_map[e["element_type"]] for e in elements]
+    all_tm  = [e["team"] for e in elements]
+    (pts_all, played_all), t_all = timed(pool.sample, scored["predicted"], scored["ids"], all_tm, all_pos,
+                                         scored["fixtures"], 10_000, rng)
+
+    # ── evaluate() == the per-scenario rules ─────────────────────────────────
+    pts, played = pool.sample(predicted, order, teams, positions, fixtures, LOOP_SCENARIOS, rng)
+    played[:, :11] &= rng.random((LOOP_SCENARIOS, 11)) > 0.3        # force plenty of autosubs
+    pts[~played] = 0
+    fast, t_fast = timed(simulation.evaluate, pts, played, positions, 2, 7)
+    slow, t_slow = timed(loop_evaluate, pts, played, positions, 2, 7)
+    if not np.allclose(fast["total"], slow, atol=1e-3):
+        fails.append(f"evaluate() differs from the loop in {(~np.isclose(fast['total'], slow, atol=1e-3)).sum()} "
+                     f"of {LOOP_SCENARIOS} scenarios")
+    for c in (0, 4, 7):                     # 7 is the vice: its column falls back to the captain
+        alt = loop_evaluate(pts[:300], played[:300], positions, c, 2 if c == 7 else 7)
+        if not np.allclose(fast["captaincy"][:300, c], alt, atol=1e-3):
+            fails.append(f"captaincy column {c} differs from the loop with that captain")
+
+    # ── means stay the model's; clubs move together ──────────────────────────
+    means = pts_all.mean(axis=0)
+    top   = np.argsort(-scored["predicted"])[:100]
+    drift = abs(means[top].sum() - scored["predicted"][top].sum()) / scored["predicted"][top].sum()
+    if drift > MEAN_TOLERANCE:
+        fails.append(f"simulated means drift {drift:.1%} from the predictions")
+    regular = top[played_all[:, top].mean(axis=0) > 0.9][:60]
+    corr    = np.corrcoef(pts_all[:, regular].T)
+    club    = np.array(all_tm)[regular]
+    same    = club[:, None] == club[None, :]
+    off     = ~np.eye(len(regular), dtype=bool)
+    within, across = corr[same & off].mean(), corr[~same].mean()
+    if not within > across + 0.05:
+        fails.append(f"teammates' correlation {within:.3f} is not above other clubs' {across:.3f}")
+
+    print(f"squad of 15, residual pool: {len(pool.ids)} players x {len(pool.rounds)} rounds")
+    print(f"{'scenarios':>10s} {'sample/s':>12s} {'evaluate/s':>12s} {'both/s':>12s}")
+    for n, s, e, b in rates:
+        print(f"{n:10,d} {s:12,.0f} {e:12,.0f} {b:12,.0f}")
+    print(f"every player ({len(elements)}) x 10,000 : {t_all * 1000:7.1f} ms "
+          f"({10_000 * len(elements) / t_all / 1e6:.1f}M player-scenarios/s)")
+    print(f"autosubs + armband, {LOOP_SCENARIOS:,} scenarios")
+    print(f"  per-scenario loop : {t_slow * 1000:8.1f} ms  ({LOOP_SCENARIOS / t_slow:,.0f}/s)")
+    print(f"  evaluate()        : {t_fast * 1000:8.1f} ms  ({LOOP_SCENARIOS / t_fast:,.0f}/s)")
+    print(f"/api/squad/simulate")
+    print(f"  first (builds residuals) : {t_cold * 1000:7.1f} ms")
+    print(f"  10,000 scenarios         : {t_warm * 1000:7.1f} ms  {again['timings_ms']}")
+    print(f"  100,000 scenarios        : {t_big * 1000:7.1f} ms")
+    print(f"squad: mean {first['mean']}, std {first['std']}, {first['percentiles']}")
+    print(f"top-100 mean drift {drift:.2%}; teammate correlation {within:.3f} vs other clubs {across:.3f}")
+    for f in fails:
+        print(f"FAIL: {f}")
+    sys.exit(1 if fails else 0)
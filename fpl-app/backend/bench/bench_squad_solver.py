@@ -0,0 +1,104 @@
+"""
+Cross-check and time the native squad solver against PuLP/CBC.
+
+Random pools mimic the real one (20 clubs, GK/DEF/MID/FWD mix, £4.0m–£15.0m,
+points loosely tied to price). For every pool and budget both solvers must
+agree on the optimal objective (or both report infeasible); the script exits
+non-zero on any mismatch. The bundled player_predictions.csv is timed too.
+
+    python bench/bench_squad_solver.py --pools 30
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from squad_model import SquadModel
+from squad_solver import InfeasibleSquad, SearchLimit, solve_squad
+
+DATA_DIR  = Path(__file__).resolve().parent.parent.parent.parent / "Data" / "data"
+POSITIONS = np.array(["GK", "DEF", "MID", "FWD"])
+
+
+def random_pool(rng: np.random.Generator, n: int) -> pd.DataFrame:
+    position = rng.choice(POSITIONS, size=n, p=[0.11, 0.34, 0.40, 0.15])
+    cost     = rng.integers(40, 151, size=n)
+    cost[position == "GK"] = rng.integers(38, 66, size=(position == "GK").sum())
+    pts      = np.clip(cost / 25 + rng.normal(0, 1.5, size=n), 0, None).round(2)
+    return pd.DataFrame({
+        "player_id":     np.arange(n),
+        "position":      position,
+        "team":          rng.integers(1, 21, size=n),
+        "now_cost":      cost,
+        "predicted_pts": pts,
+    })
+
+
+def solve_both(df: pd.DataFrame, budget: int):
+    pts = df["predicted_pts"].to_numpy(dtype=float)
+
+    t0 = time.perf_counter()
+    try:
+        mask, _ = solve_squad(pts, df["now_cost"].to_numpy(), df["position"].to_numpy(),
+                              df["team"].to_numpy(), budget)
+        native = pts[mask].sum()
+    except InfeasibleSquad:
+        native = None
+    except SearchLimit:
+        native = float("nan")     # the API falls back to CBC here
+    t1 = time.perf_counter()
+    try:
+        sel, _ = SquadModel(df).solve(pts, budget)
+        cbc = pts[sel].sum()
+    except ValueError:
+        cbc = None
+    t2 = time.perf_counter()
+    return native, cbc, (t1 - t0) * 1000, (t2 - t1) * 1000
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pools", type=int, default=30)
+    ap.add_argument("--size",  type=int, default=400)
+    ap.add_argument("--seed",  type=int, default=0)
+    args = ap.parse_args()
+
+    rng      = np.random.default_rng(args.seed)
+    failures = 0
+    limited  = 0
+    t_native, t_cbc = [], []
+    for k in range(args.pools):
+        df     = random_pool(rng, args.size)
+        budget = int(rng.choice([700, 800, 900, 1000, 1100]))
+        native, cbc, tn, tc = solve_both(df, budget)
+        t_native.append(tn)
+        t_cbc.append(tc)
+        if native is not None and np.isnan(native):
+            limited += 1
+            continue
+        ok = (native is None and cbc is None) or (
+            native is not None and cbc is not None and abs(native - cbc) < 1e-6
+        )
+        if not ok:
+            failures += 1
+            print(f"MISMATCH pool={k} budget={budget}: native={native} cbc={cbc}")
+
+    print(f"random pools      : {args.pools} x {args.size} players, {failures} mismatches, {limited} node-limit fallbacks")
+    print(f"native solver     : median {np.median(t_native):7.1f} ms, max {np.max(t_native):7.1f} ms")
+    print(f"PuLP/CBC          : median {np.median(t_cbc):7.1f} ms, max {np.max(t_cbc):7.1f} ms")
+
+    preds = DATA_DIR / "player_predictions.csv"
+    if preds.exists():
+        df = pd.read_csv(preds)
+        df["position"] = df["element_type"].map({1: "GK", 2: "DEF", 3: "MID", 4: "FWD"})
+        for budget in (800, 900, 1000):
+            native, cbc, tn, tc = solve_both(df, budget)
+            print(f"bundled pool {budget / 10:5.1f}m: native {native:.3f} in {tn:6.1f} ms | "
+                  f"cbc {cbc:.3f} in {tc:6.1f} ms")
+
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,169 @@
+"""
+Incremental standings (standings.py) against the old per-request loop in
+pl_table(), on the mock_fpl season: checks the full table and every
+as-of-gameweek table match the old computation, including after fixtures
+finish one by one, a score correction and a postponement, and that each
+sync applies only the fixtures that changed. Then times the old loop
+against the engine's sync and table queries, and checks /api/pl/table.
+
+    python bench/bench_standings.py
+"""
+import copy
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import mock_fpl
+from standings import DISPLAY_NAMES, Standings
+
+
+def legacy_table(teams: list, fixtures: list) -> list:
+    """pl_table() before standings.py, verbatim apart from the inputs."""
+    teams_df   = pd.DataFrame(teams)
+    id_to_name = {
+        int(row["id"]): DISPLAY_NAMES.get(str(row["name"]), str(row["name"]))
+        for _, row in teams_df.iterrows()
+    }
+    table = {
+        tid: {"name": id_to_name.get(tid, str(tid)),
+              "played": 0, "win": 0, "draw": 0, "loss": 0,
+              "gf": 0, "ga": 0, "gd": 0, "points": 0}
+        for tid in id_to_name
+    }
+    for fx in fixtures:
+        if not fx.get("finished"):
+            continue
+        h_id, a_id = fx.get("team_h"), fx.get("team_a")
+        hg, ag     = fx.get("team_h_score"), fx.get("team_a_score")
+        if h_id not in table or a_id not in table or hg is None or ag is None:
+            continue
+        hg, ag = int(hg), int(ag)
+        for tid, gf, ga in [(h_id, hg, ag), (a_id, ag, hg)]:
+            t = table[tid]
+            t["played"] += 1
+            t["gf"]     += gf
+            t["ga"]     += ga
+            t["gd"]     += gf - ga
+            if gf > ga:
+                t["win"] += 1; t["points"] += 3
+            elif gf == ga:
+                t["draw"] += 1; t["points"] += 1
+            else:
+                t["loss"] += 1
+    ranked = sorted(table.values(), key=lambda x: (-x["points"], -x["gd"], -x["gf"]))
+    for i, row in enumerate(ranked):
+        row["position"] = i + 1
+    return ranked
+
+
+def as_of(fixtures: list, gw: int) -> list:
+    return [f for f in fixtures if f.get("event") and f["event"] <= gw]
+
+
+def timed_us(fn, n: int) -> float:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1e6)
+    return statistics.median(samples)
+
+
+if __name__ == "__main__":
+    payloads = mock_fpl.build_payloads()
+    teams    = payloads["bootstrap"]["teams"]
+    fixtures = copy.deepcopy(payloads["fixtures"])
+    fails    = []
+    eng      = Standings()
+    version  = 0
+
+    def sync() -> int:
+        global version
+        version += 1
+        before   = eng.applied
+        eng.sync(teams, fixtures, version)
+        return eng.applied - before
+
+    def check(label: str) -> None:
+        last = max(f["event"] for f in fixtures if f.get("finished") and f.get("event"))
+        if eng.table() != legacy_table(teams, fixtures):
+            fails.append(f"{label}: full table differs")
+        for gw in range(1, last + 1):
+            if eng.table(gw) != legacy_table(teams, as_of(fixtures, gw)):
+                fails.append(f"{label}: table after GW{gw} differs")
+                break
+
+    sync()
+    check("initial")
+    if sync() != 0:
+        fails.append("an unchanged fixture list re-applied results")
+
+    # next gameweek's fixtures finish one at a time
+    nxt     = min(f["event"] for f in fixtures if not f.get("finished"))
+    pending = [f for f in fixtures if f["event"] == nxt]
+    for i, fx in enumerate(pending):
+        fx.update(finished=True, team_h_score=i % 4, team_a_score=(i * 7) % 3)
+        if sync() != 1:
+            fails.append(f"finishing fixture {fx['id']} did not apply exactly one result")
+    check(f"after GW{nxt} finished")
+
+    # a score correction backs out the old result and applies the new one
+    fx = next(f for f in fixtures if f.get("finished") and f["event"] == 3)
+    fx["team_h_score"] += 2
+    if sync() != 2:
+        fails.append("a score correction was not applied as one back-out plus one result")
+    check("after a correction")
+
+    # a postponed fixture (no gameweek) counts in the full table only
+    fx = next(f for f in fixtures if f.get("finished") and f["event"] == 5)
+    fx["event"] = None
+    sync()
+    check("after a postponement")
+
+    # timings
+    base = copy.deepcopy(payloads["fixtures"])
+    t_legacy  = timed_us(lambda: legacy_table(teams, base), 50)
+    t_initial = timed_us(lambda: Standings().sync(teams, base, 1), 20)
+    warm      = Standings()
+    warm.sync(teams, base, 1)
+    t_same    = timed_us(lambda: warm.sync(teams, base, 1), 200)
+    t_scan    = timed_us(lambda: warm.sync(teams, base, object()), 50)
+    t_cached  = timed_us(lambda: warm.table(10), 1000)
+
+    def fresh_rank():
+        warm._tables.clear()
+        return warm.table(10)
+    t_rank = timed_us(fresh_rank, 200)
+
+    print(f"old loop per request          : {t_legacy:9.1f} µs")
+    print(f"engine: first sync            : {t_initial:9.1f} µs")
+    print(f"engine: sync, same version    : {t_same:9.1f} µs")
+    print(f"engine: sync, scan no changes : {t_scan:9.1f} µs")
+    print(f"engine: rank table after GW10 : {t_rank:9.1f} µs")
+    print(f"engine: cached table query    : {t_cached:9.1f} µs")
+
+    server, base_url = mock_fpl.serve_in_thread()
+    os.environ["FPL_API_BASE"] = base_url
+    os.environ["FPL_WARMUP"]   = "0"
+    import main
+    from fastapi.testclient import TestClient
+    with TestClient(main.app) as client:
+        live = main.fixtures_cache
+        got  = client.get("/api/pl/table?gw=10").json()
+        full = client.get("/api/pl/table").json()
+        ref  = main.bootstrap._entry.data
+        if got != legacy_table(ref["teams"], as_of(live._entry.data, 10)) or \
+                full != legacy_table(ref["teams"], live._entry.data):
+            fails.append("/api/pl/table differs from the old computation")
+        if client.get("/api/pl/table?gw=0").status_code != 400:
+            fails.append("gw=0 was not rejected")
+
+    for f in fails:
+        print(f"FAIL: {f}")
+    sys.exit(1 if fails else 0)
@@ -0,0 +1,111 @@
+"""
+Cold-start profile of the backend: a `python -X importtime -c "import main"`
+breakdown (median of a few fresh interpreters) checked against
+IMPORT_BUDGET_MS, the cost the lazy imports defer to the warm-up, and the
+time from app startup to /api/health and to /api/ready against mock_fpl.
+Fails if `import main` goes over budget or loads any of the heavy modules.
+
+    python bench/bench_startup.py
+    FPL_IMPORT_BUDGET_MS=1500 python bench/bench_startup.py   # slower machine
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+from warmup import HEAVY_MODULES
+
+IMPORT_BUDGET_MS = float(os.environ.get("FPL_IMPORT_BUDGET_MS", "900"))
+RUNS             = 5
+
+_STARTUP = """
+import json, os, sys, time
+sys.path.insert(0, {backend!r})
+import mock_fpl
+server, base = mock_fpl.serve_in_thread()
+os.environ["FPL_API_BASE"] = base
+
+t0 = time.perf_counter()
+import main
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    t_up   = time.perf_counter()
+    client.get("/api/health")
+    t_live = time.perf_counter()
+    while client.get("/api/ready").status_code != 200 and time.perf_counter() - t_up < 30:
+        time.sleep(0.01)
+    t_ready = time.perf_counter()
+    status  = client.get("/api/ready").json()
+print(json.dumps({{"startup": (t_up - t0) * 1000, "health": (t_live - t0) * 1000,
+                  "ready": (t_ready - t0) * 1000, "status": status}}))
+"""
+
+
+def importtime(code: str) -> dict:
+    """{module: (self µs, cumulative µs, depth)} from one fresh interpreter."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                         cwd=BACKEND, capture_output=True, text=True, check=True)
+    mods = {}
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        mods[name.strip()] = (int(self_us), int(cum_us), depth)
+    return mods
+
+
+if __name__ == "__main__":
+    fails = []
+    runs  = [importtime("import main") for _ in range(RUNS)]
+    total = statistics.median(r["main"][1] for r in runs) / 1000
+    last  = runs[-1]
+
+    # main's direct imports, by cumulative time (median across runs)
+    direct = [m for m, (_, _, d) in last.items() if d == 1 and m in runs[0]]
+    rows   = sorted(((statistics.median(r[m][1] for r in runs if m in r) / 1000, m) for m in direct), reverse=True)
+    print(f"import main: {total:6.1f} ms  (budget {IMPORT_BUDGET_MS:.0f} ms, median of {RUNS})")
+    for ms, m in rows[:12]:
+        print(f"  {ms:7.1f} ms  {m}")
+    print(f"  {statistics.median(r['main'][0] for r in runs) / 1000:7.1f} ms  main (own body: routes, schemas)")
+
+    heavy = [m for m in HEAVY_MODULES + ["lightgbm", "sklearn", "joblib"] if m in last]
+    if heavy:
+        fails.append(f"import main loaded {heavy}")
+    if total > IMPORT_BUDGET_MS:
+        fails.append(f"import main took {total:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)")
+
+    # importlib.import_module() does not log the package line itself, so sum
+    # the top-level entries under each package instead
+    eager    = importtime("import main, warmup; warmup.import_heavy_modules()")
+    deferred = {}
+    for m, (_, cum, depth) in eager.items():
+        if depth == 0 and m not in last:
+            root = m.split(".")[0]
+            deferred[root] = deferred.get(root, 0) + cum / 1000
+    print(f"\ndeferred to the warm-up: {sum(deferred.values()):6.1f} ms of imports")
+    for root, ms in sorted(deferred.items(), key=lambda kv: -kv[1])[:8]:
+        print(f"  {ms:7.1f} ms  {root}")
+
+    out    = subprocess.run([sys.executable, "-c", _STARTUP.format(backend=str(BACKEND))],
+                            cwd=BACKEND, capture_output=True, text=True, check=True)
+    res    = json.loads(out.stdout.strip().splitlines()[-1])
+    status = res["status"]
+    print(f"\nstartup (import + lifespan): {res['startup']:7.1f} ms")
+    print(f"first /api/health          : {res['health']:7.1f} ms")
+    print(f"/api/ready == 200          : {res['ready']:7.1f} ms")
+    for name, step in status["steps"].items():
+        print(f"  {name:12s} {step['ms']:7.1f} ms  {'ok' if step['ok'] else 'FAILED: ' + str(step['error'])}")
+    if not status["ready"]:
+        fails.append("warm-up did not become ready")
+    if status["modules"].get("lightgbm"):
+        fails.append("warm-up imported lightgbm")
+
+    for f in fails:
+        print(f"FAIL: {f}")
+    sys.exit(1 if fails else 0)
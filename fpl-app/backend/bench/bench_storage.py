@@ -0,0 +1,105 @@
+"""
+Cold load time and memory for the gameweek history and predictions, CSV
+versus the columnar copies written by storage.py. The history is repeated as
+1 and 10 seasons (kickoff dates shifted back a year per copy). Each load runs
+in a fresh interpreter (Linux: reads /proc/self/status); RSS columns are
+the resident and peak growth over the interpreter after imports, plus the
+size of the resulting frame.
+Also checks the columnar reads return the same frame as the CSV.
+
+    python bench/bench_storage.py
+"""
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+import storage
+
+FEATURE_SOURCES = ["player_id", "round", "total_points", "minutes",
+                   "expected_goal_involvements", "ict_index", "bps", "was_home"]
+
+_PROBE = """
+import json, sys, time
+sys.path.insert(0, {backend!r})
+import pandas as pd, storage
+
+def status(key):
+    with open("/proc/self/status") as fh:
+        return next(int(l.split()[1]) for l in fh if l.startswith(key)) / 1024
+
+base = status("VmRSS:")
+t0   = time.perf_counter()
+df   = {expr}
+ms   = (time.perf_counter() - t0) * 1000
+print(json.dumps({{"ms": ms, "rss_mb": status("VmRSS:") - base, "peak_mb": status("VmHWM:") - base,
+                  "frame_mb": df.memory_usage(deep=True).sum() / 2**20, "rows": len(df), "cols": df.shape[1]}}))
+"""
+
+
+def probe(expr: str) -> dict:
+    code = _PROBE.format(backend=str(BACKEND), expr=expr)
+    out  = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def seasons(history: pd.DataFrame, n: int) -> pd.DataFrame:
+    parts = []
+    for k in range(n):
+        part = history.copy()
+        part["kickoff_time"] = (pd.to_datetime(part["kickoff_time"]) - pd.DateOffset(years=k)) \
+            .dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
+
+
+if __name__ == "__main__":
+    history = pd.read_csv(storage.DATA_DIR / storage.HISTORY_CSV)
+    preds   = pd.read_csv(storage.DATA_DIR / storage.PREDICTIONS_CSV)
+    bad     = 0
+
+    for n in (1, 10):
+        with tempfile.TemporaryDirectory() as tmp:
+            d = Path(tmp)
+            storage.write_history(seasons(history, n), d)
+            storage.write_predictions(preds, d)
+            csv_mb = (d / storage.HISTORY_CSV).stat().st_size / 1e6
+            pq_mb  = sum(p.stat().st_size for p in (d / storage.HISTORY_DATASET).rglob("*.parquet")) / 1e6
+
+            cases = {
+                "history  csv            ": f"pd.read_csv({str(d / storage.HISTORY_CSV)!r})",
+                "history  parquet        ": f"storage.read_history({tmp!r})",
+                "features csv usecols    ": f"pd.read_csv({str(d / storage.HISTORY_CSV)!r}, usecols={FEATURE_SOURCES!r})",
+                "features parquet columns": f"storage.read_history({tmp!r}, columns={FEATURE_SOURCES!r})",
+                "features parquet 1 season": f"storage.read_history({tmp!r}, columns={FEATURE_SOURCES!r}, season='2025-26')",
+                "features parquet gw 23-27": f"storage.read_history({tmp!r}, columns={FEATURE_SOURCES!r}, rounds=(23, 27), season='2025-26')",
+            }
+            if n == 1:
+                cases.update({
+                    "preds    csv            ": f"pd.read_csv({str(d / storage.PREDICTIONS_CSV)!r})",
+                    "preds    arrow (mmap)   ": f"storage.read_predictions({tmp!r})",
+                })
+
+            print(f"\n{n} season(s): {len(history) * n} rows | csv {csv_mb:.1f} MB, parquet {pq_mb:.1f} MB")
+            print(f"  {'':26s} {'load':>8s}     {'rss':>7s}     {'peak':>7s}     {'frame':>7s}")
+            for name, expr in cases.items():
+                r = probe(expr)
+                print(f"  {name:26s} {r['ms']:8.1f} ms  {r['rss_mb']:7.1f} MB  {r['peak_mb']:7.1f} MB  "
+                      f"{r['frame_mb']:7.1f} MB  {r['rows']:>7} x {r['cols']}")
+
+            csv_df = pd.read_csv(d / storage.HISTORY_CSV).sort_values(["player_id", "round", "kickoff_time"], kind="stable")
+            col_df = storage.read_history(d).sort_values(["player_id", "round", "kickoff_time"], kind="stable")
+            try:
+                pd.testing.assert_frame_equal(csv_df.reset_index(drop=True), col_df.reset_index(drop=True), check_dtype=False)
+                pd.testing.assert_frame_equal(preds, storage.read_predictions(d), check_dtype=False)
+            except AssertionError as e:
+                print(f"  MISMATCH: {e}")
+                bad += 1
+
+    sys.exit(1 if bad else 0)
@@ -0,0 +1,152 @@
+"""
+Hyperparameter search (training.py) against the notebook's serial tuning
+cell, on the stored gameweek history with the notebook's features and
+time split (fixture difficulty comes from mock_fpl's fixture list).
+
+First checks that the cached Dataset binary is reused, and that n rounds
+of lgb.train on it grow the same model as LGBMRegressor(n_estimators=n).
+That is what lets fit_best() rebuild the winning trial. Then runs the old cell (serial, every trial to the last
+tree) and tune() with the same number of trials, and prints wall-clock
+time, best MAE and trial counts for both. It fails if the search's best MAE
+is worse than the serial one by more than MAE_TOLERANCE.
+
+    python bench/bench_training.py --trials 50 --workers 4
+"""
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import lightgbm as lgb
+import optuna
+from sklearn.metrics import mean_absolute_error
+
+import backtest
+import mock_fpl
+import training
+from features import add_rolling_features
+from inference import FEATURES
+from storage import DATA_DIR, read_history
+
+MAE_TOLERANCE = 0.02        # relative
+
+
+def model_frame() -> pd.DataFrame:
+    """The notebook's df_model and dropna."""
+    payloads = mock_fpl.build_payloads(DATA_DIR)
+    df       = add_rolling_features(read_history(DATA_DIR))
+    df       = backtest.model_frame(df, payloads["fixtures"], payloads["bootstrap"]["elements"])
+    return df.dropna(subset=FEATURES + ["total_points"])
+
+
+def timed_ms(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000
+
+
+def serial_search(X_train, y_train, X_test, y_test, n_trials: int) -> dict:
+    """The notebook's tuning cell, as it was."""
+    def objective(trial):
+        params = {
+            "n_estimators":      trial.suggest_int("n_estimators", 300, 1000),
+            "learning_rate":     trial.suggest_float("learning_rate", 0.01, 0.1),
+            "num_leaves":        trial.suggest_int("num_leaves", 31, 150),
+            "min_child_samples": trial.suggest_int("min_child_samples", 10, 50),
+            "subsample":         trial.suggest_float("subsample", 0.6, 1.0),
+            "colsample_bytree":  trial.suggest_float("colsample_bytree", 0.6, 1.0),
+            "random_state": 42,
+            "verbose": -1,
+        }
+        model = lgb.LGBMRegressor(**params)
+        model.fit(X_train, y_train)
+        return mean_absolute_error(y_test, model.predict(X_test))
+
+    t0    = time.perf_counter()
+    study = optuna.create_study(direction="minimize", sampler=optuna.samplers.TPESampler(seed=training.SEED))
+    study.optimize(objective, n_trials=n_trials)
+    return {"best_mae": study.best_value, "trials": len(study.trials), "complete": len(study.trials),
+            "pruned": 0, "workers": 1, "wall_s": time.perf_counter() - t0}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--trials", type=int, default=training.N_TRIALS)
+    ap.add_argument("--workers", type=int, default=training.WORKERS)
+    args = ap.parse_args()
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+    train_df, test_df = backtest.time_split(model_frame())
+    X_train, y_train  = train_df[FEATURES], train_df["total_points"]
+    X_test,  y_test   = test_df[FEATURES],  test_df["total_points"]
+    print(f"rows: {len(X_train)} train, {len(X_test)} held out\n")
+
+    fails = []
+    tmp   = Path(tempfile.mkdtemp(prefix="fpl-tuning-"))
+    try:
+        # ── cached Dataset == fresh bins; lgb.train == LGBMRegressor ─────────
+        t0     = time.perf_counter()
+        cached = training.cache_dataset(X_train, y_train, tmp)
+        t_bin  = (time.perf_counter() - t0) * 1000
+        again  = training.cache_dataset(X_train, y_train, tmp)
+        if again != cached or len(list(tmp.glob("train-*.bin"))) != 1:
+            fails.append("the Dataset binary was not reused for the same rows")
+        train  = lgb.Dataset(str(cached), params=training.DATASET_PARAMS)
+        valid  = lgb.Dataset(X_test.to_numpy(float), y_test.to_numpy(float),
+                             params=training.DATASET_PARAMS, reference=train)
+        t_load = statistics.median(timed_ms(
+            lambda: lgb.Dataset(str(cached), params=training.DATASET_PARAMS).construct()) for _ in range(5))
+
+        rng = np.random.default_rng(0)
+        for _ in range(3):
+            params  = {"learning_rate": rng.uniform(0.01, 0.1), "num_leaves": int(rng.integers(31, 151)),
+                       "min_child_samples": int(rng.integers(10, 51)), "subsample": rng.uniform(0.6, 1.0),
+                       "colsample_bytree": rng.uniform(0.6, 1.0)}
+            booster = training.train_booster(params, train, valid)
+            n       = booster.best_iteration
+            model   = training.fit_best({**params, "n_estimators": n, "random_state": training.SEED,
+                                         "verbose": -1}, X_train, y_train)
+            a, b    = booster.predict(X_test.to_numpy(float), num_iteration=n), model.predict(X_test)
+            if not np.allclose(a, b, atol=1e-9):
+                fails.append(f"LGBMRegressor(n_estimators={n}) differs from the trial's booster "
+                             f"by {np.abs(a - b).max():.2e}")
+            mae = mean_absolute_error(y_test, b)
+            if abs(mae - booster.best_score["valid"]["l1"]) > 1e-6:
+                fails.append(f"reported MAE {booster.best_score['valid']['l1']:.6f} != refit MAE {mae:.6f}")
+        print(f"bin train split      : {t_bin:8.1f} ms (once)")
+        print(f"load cached binary   : {t_load:8.1f} ms (per worker)\n")
+
+        # ── the search ───────────────────────────────────────────────────────
+        runs = {
+            "serial (notebook)": serial_search(X_train, y_train, X_test, y_test, args.trials),
+            "tune()":            training.tune(X_train, y_train, X_test, y_test, n_trials=args.trials,
+                                               workers=args.workers, cache_dir=tmp),
+        }
+        print(f"{'search':18s} {'workers':>7s} {'trials':>6s} {'pruned':>6s} {'wall':>9s} {'best MAE':>9s}")
+        for label, r in runs.items():
+            print(f"{label:18s} {r['workers']:7d} {r['trials']:6d} {r['pruned']:6d} "
+                  f"{r['wall_s']:8.1f}s {r['best_mae']:9.4f}")
+        serial, tuned = runs["serial (notebook)"], runs["tune()"]
+        print(f"\nspeed-up {serial['wall_s'] / tuned['wall_s']:.1f}x; "
+              f"best params {tuned['params']}")
+        if tuned["trials"] != args.trials:
+            fails.append(f"the shared study holds {tuned['trials']} trials, expected {args.trials}")
+        if tuned["best_mae"] > serial["best_mae"] * (1 + MAE_TOLERANCE):
+            fails.append(f"best MAE {tuned['best_mae']:.4f} worse than serial {serial['best_mae']:.4f}")
+        model = training.fit_best(tuned["params"], X_train, y_train)
+        if abs(mean_absolute_error(y_test, model.predict(X_test)) - tuned["best_mae"]) > 1e-6:
+            fails.append("fit_best() does not reproduce the best trial's MAE")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    for f in fails:
+        print(f"FAIL: {f}")
+    sys.exit(1 if fails else 0)
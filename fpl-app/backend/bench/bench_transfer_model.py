@@ -0,0 +1,124 @@
+"""
+Compare the compact transfer ILP (transfer_model.py) with the original
+three-binaries-per-player formulation on the bundled transfer_squad.csv.
+
+Both models are built over the full available pool (no pruning) on the
+legacy sum-of-15 objective (lineup=False), for several free-transfer /
+hit-cost / lock settings; the script checks they pick the same squad with
+the same objective, prints model sizes and median build and solve times,
+and exits non-zero on any mismatch.
+
+    python bench/bench_transfer_model.py --repeat 3
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+import pulp
+
+from transfer_model import build_transfer_model
+
+DATA_DIR = Path(__file__).resolve().parent.parent.parent.parent / "Data" / "data"
+ITB_RAW  = 5     # £0.5m in the bank, as served by mock_fpl
+
+
+def legacy_model(opt_df: pd.DataFrame, budget_raw: int, free_transfers: int, hit_cost: float, locked: list):
+    """The pre-compaction formulation, verbatim apart from being a function."""
+    n    = len(opt_df)
+    prob = pulp.LpProblem("FPL_Transfers", pulp.LpMaximize)
+    x    = [pulp.LpVariable(f"x{i}", cat="Binary") for i in range(n)]
+    t    = [pulp.LpVariable(f"t{i}", cat="Binary") for i in range(n)]
+    s    = [pulp.LpVariable(f"s{i}", cat="Binary") for i in range(n)]
+    h    = pulp.LpVariable("hits", lowBound=0, cat="Continuous")
+
+    prob += pulp.lpSum(opt_df["predicted_pts"][i] * x[i] for i in range(n)) - hit_cost * h
+    prob += pulp.lpSum(x) == 15
+    prob += pulp.lpSum(opt_df["now_cost"][i] * x[i] for i in range(n)) <= budget_raw
+
+    for pos, mn, mx in [("GK",2,2),("DEF",5,5),("MID",5,5),("FWD",3,3)]:
+        idx = opt_df[opt_df["position"] == pos].index.tolist()
+        prob += pulp.lpSum(x[i] for i in idx) >= mn
+        prob += pulp.lpSum(x[i] for i in idx) <= mx
+
+    for club in opt_df["team"].unique():
+        idx = opt_df[opt_df["team"] == club].index.tolist()
+        prob += pulp.lpSum(x[i] for i in idx) <= 3
+
+    cheap_gk = opt_df[(opt_df["now_cost"] <= 40) & (opt_df["position"] == "GK")].index.tolist()
+    if cheap_gk:
+        prob += pulp.lpSum(x[i] for i in cheap_gk) >= 1
+
+    for i in opt_df[opt_df["web_name"].isin(locked)].index.tolist():
+        prob += x[i] == 1
+        prob += s[i] == 0
+        prob += t[i] == 0
+
+    for i in range(n):
+        ic = opt_df["in_current"][i]
+        prob += t[i] >= x[i] - ic
+        prob += t[i] <= x[i]
+        prob += t[i] <= 1 - ic
+        prob += s[i] >= ic - x[i]
+        prob += s[i] <= ic
+        prob += s[i] <= 1 - x[i]
+
+    prob += pulp.lpSum(t) == pulp.lpSum(s)
+    prob += h >= pulp.lpSum(t) - free_transfers
+    return prob, x
+
+
+def run(build, repeat: int):
+    builds, solves = [], []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        prob, x = build()
+        t1 = time.perf_counter()
+        prob.solve(pulp.PULP_CBC_CMD(msg=0))
+        t2 = time.perf_counter()
+        builds.append((t1 - t0) * 1000)
+        solves.append((t2 - t1) * 1000)
+    picked = frozenset(i for i, v in enumerate(x) if (v.value() or 0) > 0.5)
+    size   = (prob.numVariables(), prob.numConstraints())
+    return picked, pulp.value(prob.objective), size, np.median(builds), np.median(solves)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    df = pd.read_csv(DATA_DIR / "player_predictions.csv")
+    df["position"] = df["element_type"].map({1: "GK", 2: "DEF", 3: "MID", 4: "FWD"})
+    squad_ids      = pd.read_csv(DATA_DIR / "transfer_squad.csv")["player_id"].tolist()
+
+    opt_df               = df.reset_index(drop=True)
+    opt_df["in_current"] = opt_df["player_id"].isin(squad_ids).astype(int)
+    budget_raw           = int(opt_df.loc[opt_df["in_current"] == 1, "now_cost"].sum()) + ITB_RAW
+    owned_names          = opt_df.loc[opt_df["in_current"] == 1, "web_name"].tolist()
+
+    scenarios = [(ft, hit, []) for ft in (0, 1, 2, 3) for hit in (4, 0)]
+    scenarios.append((1, 4, owned_names[:3]))
+
+    failures = 0
+    totals   = np.zeros(4)
+    for ft, hit, locked in scenarios:
+        lock_mask = opt_df["web_name"].isin(locked).to_numpy() if locked else None
+        old = run(lambda: legacy_model(opt_df, budget_raw, ft, hit, locked), args.repeat)
+        new = run(lambda: build_transfer_model(opt_df, budget_raw, ft, hit, lock_mask, lineup=False)[:2], args.repeat)
+        same = old[0] == new[0] and abs(old[1] - new[1]) < 1e-6
+        failures += not same
+        totals   += [old[3], old[4], new[3], new[4]]
+        print(f"FT={ft} hit={hit} locked={len(locked)}: "
+              f"legacy {old[2][0]:5d} vars {old[2][1]:5d} rows build {old[3]:6.1f} solve {old[4]:6.1f} ms | "
+              f"compact {new[2][0]:4d} vars {new[2][1]:3d} rows build {new[3]:6.1f} solve {new[4]:6.1f} ms | "
+              f"{'same' if same else 'MISMATCH'} (obj {new[1]:.2f})")
+
+    k = len(scenarios)
+    print(f"mean legacy  : build {totals[0] / k:6.1f} ms, solve {totals[1] / k:6.1f} ms")
+    print(f"mean compact : build {totals[2] / k:6.1f} ms, solve {totals[3] / k:6.1f} ms")
+    sys.exit(1 if failures else 0)
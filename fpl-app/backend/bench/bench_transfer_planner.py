@@ -0,0 +1,68 @@
+"""
+Horizon vs latency for the multi-gameweek transfer planner.
+
+Plans from the bundled transfer_squad.csv with fixtures from mock_fpl, for
+horizons 1..8, once with the rolling window and once as a single model over
+the whole horizon (window = horizon). Prints solve time and the plan value
+(Σ per-GW lineup_value of that GW's XI and armband - hits) of each, so both the linear growth of the
+rolling planner and what it gives up against the joint model are visible.
+
+    python bench/bench_transfer_planner.py --window 3 --max-full 6
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+import mock_fpl
+from squad_model import lineup_value, pick_lineup
+from transfer_planner import per_gw_points, plan_transfers
+
+DATA_DIR = mock_fpl.DATA_DIR
+ITB_RAW  = 5
+
+
+def plan_value(plan: dict, pts: np.ndarray, position: np.ndarray, hit_cost: float) -> float:
+    return sum(lineup_value(pts[:, g], pick_lineup(position, pts[:, g], s))
+               for g, s in enumerate(plan["squads"])) - hit_cost * sum(plan["hits"])
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--window",   type=int, default=3)
+    ap.add_argument("--max-full", type=int, default=6, help="largest horizon to solve as one model")
+    ap.add_argument("--ft",       type=int, default=1)
+    args = ap.parse_args()
+
+    payloads = mock_fpl.build_payloads(DATA_DIR)
+    df       = pd.read_csv(DATA_DIR / "player_predictions.csv")
+    df["position"] = df["element_type"].map({1: "GK", 2: "DEF", 3: "MID", 4: "FWD"})
+    squad_ids      = pd.read_csv(DATA_DIR / "transfer_squad.csv")["player_id"].tolist()
+    df["in_current"] = df["player_id"].isin(squad_ids).astype(int)
+    budget_raw       = int(df.loc[df["in_current"] == 1, "now_cost"].sum()) + ITB_RAW
+    first_gw         = payloads["current"] + 1
+    position         = df["position"].to_numpy()
+
+    print(f"{'H':>2} | {'rolling ms':>10} {'value':>8} | {'joint ms':>10} {'value':>8}")
+    for h in range(1, 9):
+        gws = list(range(first_gw, first_gw + h))
+        pts = per_gw_points(df, payloads["fixtures"], gws)
+
+        t0   = time.perf_counter()
+        roll = plan_transfers(df, pts, budget_raw, args.ft, window=args.window)
+        t_r  = (time.perf_counter() - t0) * 1000
+        line = f"{h:>2} | {t_r:10.0f} {plan_value(roll, pts, position, 4):8.2f} |"
+
+        if h <= args.max_full:
+            t0    = time.perf_counter()
+            joint = plan_transfers(df, pts, budget_raw, args.ft, window=h)
+            t_j   = (time.perf_counter() - t0) * 1000
+            line += f" {t_j:10.0f} {plan_value(joint, pts, position, 4):8.2f}"
+        else:
+            line += f" {'-':>10} {'-':>8}"
+        print(line, flush=True)
@@ -0,0 +1,111 @@
+"""
+The exported tree model (tree_model.py) against the pickled LightGBM model:
+checks TreeModel.predict matches model.predict to 1e-9 on the stored
+player features, on random and NaN inputs, and on inputs sitting exactly on
+every split threshold (through both the bitmask and the node-walk paths),
+then times scoring every player, and the load time and memory of each in a
+fresh interpreter (Linux: reads /proc/self/status). The backend row is
+`import main` plus get_model(), which must not import lightgbm.
+
+    python bench/bench_tree_model.py
+"""
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+from storage import DATA_DIR, read_predictions
+from tree_model import MODELS_DIR, ZERO_THRESHOLD, TreeModel, export_model
+
+TOLERANCE = 1e-9
+
+_PROBE = """
+import json, sys, time
+sys.path.insert(0, {backend!r})
+
+def status(key):
+    with open("/proc/self/status") as fh:
+        return next(int(l.split()[1]) for l in fh if l.startswith(key)) / 1024
+
+base = status("VmRSS:")
+t0   = time.perf_counter()
+{load}
+ms   = (time.perf_counter() - t0) * 1000
+print(json.dumps({{"ms": ms, "rss_mb": status("VmRSS:") - base,
+                  "lightgbm": "lightgbm" in sys.modules, "sklearn": "sklearn" in sys.modules}}))
+"""
+
+
+def probe(load: str) -> dict:
+    code = _PROBE.format(backend=str(BACKEND), load=load)
+    out  = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def median_ms(fn, n: int) -> float:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+if __name__ == "__main__":
+    pkl   = MODELS_DIR / "fpl_model.pkl"
+    model = joblib.load(pkl)
+    fails = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        npz  = export_model(model, Path(tmp) / "fpl_model.npz", source=pkl)
+        tree = TreeModel.load(npz)
+        kb   = npz.stat().st_size / 1e3
+
+        X   = read_predictions(DATA_DIR)[tree.feature_name_].to_numpy(dtype=np.float64)
+        rng = np.random.default_rng(0)
+        lo, hi = np.nanmin(X, axis=0), np.nanmax(X, axis=0)
+        rand   = rng.uniform(lo - 1, hi + 1, size=(5000, X.shape[1]))
+        nans   = np.where(rng.random(rand.shape) < 0.1, np.nan, rand)
+        # one row per split node, with that node's feature set exactly to its threshold
+        edge   = np.tile(X[0], (len(tree.threshold), 1))
+        edge[np.arange(len(edge)), tree.feature] = tree.threshold
+
+        cases = {"players": X, "random": rand, "random + NaN": nans, "on thresholds": edge}
+        print(f"model: {len(tree.roots)} trees, {len(tree.feature)} splits, {len(tree.leaf_value)} leaves, npz {kb:.0f} kB")
+        for name, data in cases.items():
+            want = model.predict(data)
+            walk = tree._predict_walk(np.where(np.abs(data) <= ZERO_THRESHOLD, 0.0, data))   # as predict() prepares it
+            for path, got in (("masks", tree.predict(data)), ("walk", walk)):
+                err = float(np.max(np.abs(want - got)))
+                print(f"  {name:14s} {path:5s}  max |diff| {err:.2e}  ({len(data)} rows)")
+                if not err <= TOLERANCE:
+                    fails.append(f"{name} ({path}) differs by {err:.2e}")
+
+        t_lgb  = median_ms(lambda: model.predict(X), 30)
+        t_tree = median_ms(lambda: tree.predict(X), 30)
+        print(f"\nscore {len(X)} players : lightgbm {t_lgb:6.2f} ms | tree_model {t_tree:6.2f} ms")
+
+        loads = {
+            "joblib + pickle": f"import joblib; m = joblib.load({str(pkl)!r})",
+            "tree_model npz ": f"from tree_model import TreeModel; m = TreeModel.load({str(npz)!r})",
+            "backend        ": "import main; m = main.get_model()",
+        }
+        print(f"\n  {'cold load':16s} {'time':>8s}     {'rss':>7s}")
+        for name, load in loads.items():
+            r = probe(load)
+            print(f"  {name:16s} {r['ms']:8.1f} ms  {r['rss_mb']:7.1f} MB  lightgbm imported: {r['lightgbm']}")
+            if not name.startswith("joblib") and (r["lightgbm"] or r["sklearn"]):
+                fails.append(f"{name.strip()} imported lightgbm/sklearn")
+
+    for f in fails:
+        print(f"FAIL: {f}")
+    sys.exit(1 if fails else 0)
@@ -0,0 +1,156 @@
+"""
+Process-wide cache for the FPL bootstrap-static payload.
+
+bootstrap-static is several megabytes and changes a handful of times a day,
+so every route shares one copy of it instead of downloading it per request:
+
+  - fresh for FPL_BOOTSTRAP_TTL seconds, served straight from memory
+  - after that, served stale for up to FPL_BOOTSTRAP_STALE_TTL more seconds
+    while a single background refresh revalidates it (stale-while-revalidate)
+  - refreshes send If-None-Match / If-Modified-Since, so an unchanged payload
+    costs a 304 instead of a full download
+  - concurrent callers that need a blocking refresh await the same fetch
+    (single-flight) rather than each hitting the upstream
+
+Point FPL_API_BASE at a local stub (see mock_fpl.py) to run without the
+real FPL API.
+"""
+import asyncio
+import os
+import time
+from typing import Optional
+
+from fpl_client import FplClient, fpl_client
+from metrics import span
+
+BOOTSTRAP_TTL       = float(os.environ.get("FPL_BOOTSTRAP_TTL",       "300"))
+BOOTSTRAP_STALE_TTL = float(os.environ.get("FPL_BOOTSTRAP_STALE_TTL", "3600"))
+
+
+class _Entry:
+    __slots__ = ("data", "etag", "last_modified", "fetched_at", "version")
+
+    def __init__(self, data: dict, etag: Optional[str], last_modified: Optional[str], version: int):
+        self.data          = data
+        self.etag          = etag
+        self.last_modified = last_modified
+        self.fetched_at    = time.monotonic()
+        self.version       = version
+
+
+class BootstrapCache:
+    """TTL cache with conditional revalidation and single-flight refresh."""
+
+    def __init__(
+        self,
+        client:    FplClient,
+        path:      str   = "/bootstrap-static/",
+        ttl:       float = BOOTSTRAP_TTL,
+        stale_ttl: float = BOOTSTRAP_STALE_TTL,
+    ):
+        self.client    = client
+        self.path      = path
+        self.ttl       = ttl
+        self.stale_ttl = stale_ttl
+
+        self._entry:    Optional[_Entry]       = None
+        self._inflight: Optional[asyncio.Task] = None
+
+        self.version       = 0   # bumped whenever the payload content changes
+        self.fetches       = 0   # full 200 downloads
+        self.revalidations = 0   # 304 Not Modified answers
+
+    # ── Public API ─────────────────────────────────────────────────────────────
+    async def get(self) -> dict:
+        """Return the bootstrap payload, refreshing it if it is missing or expired."""
+        return (await self.get_versioned())[0]
+
+    async def get_versioned(self) -> tuple[dict, int]:
+        """
+        get() plus the version of that same payload. Reading self.version
+        after the await can already count a background refresh, so results
+        keyed on the version should use this instead.
+        """
+        entry = self._entry
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if age < self.ttl:
+                return entry.data, entry.version
+            if age < self.ttl + self.stale_ttl:
+                self._refresh()
+                return entry.data, entry.version
+
+        try:
+            await asyncio.shield(self._refresh())
+        except Exception:
+            # Keep serving the previous payload when the upstream is down;
+            # only callers with nothing cached see the error.
+            if self._entry is None:
+                raise
+        entry = self._entry
+        return entry.data, entry.version
+
+    def invalidate(self) -> None:
+        """Force the next get() to revalidate against the upstream."""
+        entry = self._entry
+        if entry is not None:
+            entry.fetched_at = float("-inf")
+
+    def stats(self) -> dict:
+        entry = self._entry
+        age   = time.monotonic() - entry.fetched_at if entry else None
+        return {
+            "url":           f"{self.client.base_url}{self.path}",
+            "version":       self.version,
+            "age_seconds":   round(age, 1) if age is not None and age != float("inf") else None,
+            "etag":          entry.etag if entry else None,
+            "fetches":       self.fetches,
+            "revalidations": self.revalidations,
+        }
+
+    # ── Single-flight refresh ──────────────────────────────────────────────────
+    def _refresh(self) -> asyncio.Task:
+        task = self._inflight
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task           = asyncio.get_running_loop().create_task(self._fetch())
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight = task
+        return task
+
+    async def _fetch(self) -> None:
+        with span(f"refresh {self.path}"):
+            await self._revalidate()
+
+    async def _revalidate(self) -> None:
+        entry   = self._entry
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        resp = await self.client.get(self.path, headers=headers)
+        if resp.status == 304 and entry is not None:
+            entry.fetched_at    = time.monotonic()
+            self.revalidations += 1
+            return
+        if resp.status != 200:
+            raise RuntimeError(f"bootstrap-static returned HTTP {resp.status}")
+
+        self.fetches += 1
+        self.version += 1
+        self._entry = _Entry(
+            resp.data,
+            resp.headers.get("ETag"),
+            resp.headers.get("Last-Modified"),
+            self.version,
+        )
+
+
+bootstrap = BootstrapCache(fpl_client)
+
+
+async def get_bootstrap() -> dict:
+    """Shared bootstrap-static payload used by every route."""
+    return await bootstrap.get()
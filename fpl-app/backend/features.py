@@ -0,0 +1,161 @@
+"""
+Rolling form features for the LightGBM model, without per-group lambdas.
+
+The notebook used to build each feature with
+
+    df.groupby('player_id')[col].transform(lambda x: x.shift(1).rolling(w, min_periods=1).mean())
+
+which runs a Python function per player and per column. Here the history is
+sorted once by (player_id, round) and every window is computed on NumPy
+arrays: for lag 1..w the column is shifted by `lag` rows and masked where the
+shift crosses into the previous player (group offsets), so a window mean is
+w vectorised adds. Results match the pandas version (NaN-skipping, at least
+one observation, first row of each player NaN).
+
+FeatureState does the same thing incrementally: it keeps each player's last
+few values and, when a new gameweek arrives, produces that gameweek's
+feature rows and rolls the buffers forward instead of recomputing the season.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+# (source column, feature column, window)
+ROLLING = [
+    ("total_points",               "avg_pts_last3",     3),
+    ("total_points",               "avg_pts_last5",     5),
+    ("minutes",                    "avg_minutes_last3", 3),
+    ("expected_goal_involvements", "avg_xgi_last3",     3),
+    ("ict_index",                  "avg_ict_last3",     3),
+    ("bps",                        "avg_bps_last3",     3),
+]
+SOURCES    = list(dict.fromkeys(src for src, _, _ in ROLLING))
+MAX_WINDOW = max(w for _, _, w in ROLLING)
+FEATURE_COLUMNS = [f for _, f, _ in ROLLING] + ["form_trend", "is_home"]
+
+
+def _finish(out: pd.DataFrame) -> pd.DataFrame:
+    out["is_home"]    = out["was_home"].astype(int)
+    out["form_trend"] = out["avg_pts_last3"] - out["avg_pts_last5"]
+    return out
+
+
+# ── Batch ──────────────────────────────────────────────────────────────────────
+def group_offsets(keys: np.ndarray) -> np.ndarray:
+    """Start row of each row's group in an array sorted by key."""
+    n      = len(keys)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if n else np.zeros(0, dtype=int)
+    return np.repeat(starts, np.diff(np.r_[starts, n]))
+
+
+def shifted_rolling_mean(values: np.ndarray, start: np.ndarray, window: int) -> np.ndarray:
+    """Mean of the previous `window` non-NaN values within each group (NaN if none)."""
+    n     = len(values)
+    rows  = np.arange(n)
+    total = np.zeros(n)
+    count = np.zeros(n)
+    for lag in range(1, window + 1):
+        ok       = rows - lag >= start
+        prev     = np.full(n, np.nan)
+        prev[ok] = values[rows[ok] - lag]
+        seen     = ~np.isnan(prev)
+        total   += np.where(seen, prev, 0.0)
+        count   += seen
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+def add_rolling_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sorted copy of a gameweek history with FEATURE_COLUMNS added — the
+    notebook's feature step in one vectorised pass.
+    """
+    out   = df.sort_values(["player_id", "round"], kind="stable").reset_index(drop=True)
+    start = group_offsets(out["player_id"].to_numpy())
+    cols  = {src: pd.to_numeric(out[src], errors="coerce").to_numpy(dtype=float) for src in SOURCES}
+    for src, feat, w in ROLLING:
+        out[feat] = shifted_rolling_mean(cols[src], start, w)
+    return _finish(out)
+
+
+# ── Incremental ────────────────────────────────────────────────────────────────
+class FeatureState:
+    """
+    Last MAX_WINDOW values of every source column per player, newest last.
+    append() turns a new gameweek's rows into feature rows from that state,
+    then pushes the rows' own values in.
+    """
+
+    def __init__(self):
+        self.index: dict[int, int] = {}
+        self.buf   = np.full((0, len(SOURCES), MAX_WINDOW), np.nan)
+        self.last_round = 0
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame) -> "FeatureState":
+        state = cls()
+        state.append(df, features=False)
+        return state
+
+    def _rows(self, player_ids: np.ndarray) -> np.ndarray:
+        new = [p for p in dict.fromkeys(player_ids.tolist()) if p not in self.index]
+        if new:
+            for p in new:
+                self.index[p] = len(self.index)
+            pad      = np.full((len(new), len(SOURCES), MAX_WINDOW), np.nan)
+            self.buf = np.concatenate([self.buf, pad])
+        return np.fromiter((self.index[p] for p in player_ids.tolist()), dtype=np.intp, count=len(player_ids))
+
+    def _features(self, rows: np.ndarray) -> dict:
+        out = {}
+        for src, feat, w in ROLLING:
+            win  = self.buf[rows, SOURCES.index(src), -w:]
+            seen = ~np.isnan(win)
+            cnt  = seen.sum(axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out[feat] = np.where(cnt > 0, np.where(seen, win, 0.0).sum(axis=1) / np.maximum(cnt, 1), np.nan)
+        return out
+
+    def append(self, gw: pd.DataFrame, features: bool = True) -> Optional[pd.DataFrame]:
+        """
+        Add new history rows (one or more gameweeks, any order) and return
+        them sorted with FEATURE_COLUMNS, or None when features=False.
+        Players with several rows (double gameweeks) are handled in order.
+        """
+        new   = gw.sort_values(["player_id", "round"], kind="stable").reset_index(drop=True)
+        pids  = new["player_id"].to_numpy()
+        rows  = self._rows(pids)
+        vals  = np.column_stack([pd.to_numeric(new[s], errors="coerce").to_numpy(dtype=float) for s in SOURCES]) \
+            if len(new) else np.zeros((0, len(SOURCES)))
+        # k-th row of its player within this batch; process one "layer" at a time
+        occ   = np.arange(len(new)) - group_offsets(pids)
+        feats = {feat: np.full(len(new), np.nan) for _, feat, _ in ROLLING}
+
+        for k in range(int(occ.max()) + 1 if len(new) else 0):
+            sel = np.flatnonzero(occ == k)
+            r   = rows[sel]
+            if features:
+                for feat, v in self._features(r).items():
+                    feats[feat][sel] = v
+            self.buf[r] = np.concatenate([self.buf[r, :, 1:], vals[sel][:, :, None]], axis=2)
+
+        if len(new):
+            self.last_round = max(self.last_round, int(new["round"].max()))
+        if not features:
+            return None
+        for feat, v in feats.items():
+            new[feat] = v
+        return _finish(new)
+
+    def latest(self) -> pd.DataFrame:
+        """Features each player would carry into their next match."""
+        pids = np.array(list(self.index), dtype=np.int64)
+        out  = pd.DataFrame({"player_id": pids, **self._features(np.arange(len(pids)))})
+        out["form_trend"] = out["avg_pts_last3"] - out["avg_pts_last5"]
+        return out
@@ -0,0 +1,149 @@
+"""
+Fixture features from a (team x gameweek) matrix.
+
+The notebook looped over upcoming.iterrows() and averaged one difficulty
+per team over the next three gameweeks. It then merged that value onto
+every historical row, so a GW3 row carried the difficulty of fixtures
+months later. FixtureMatrix builds these arrays once per fixture list,
+indexed [team, gameweek]:
+
+  count   fixtures (0 for a blank, 2+ for a double gameweek)
+  home    how many of them are at home
+  diff    summed difficulty
+
+It also keeps prefix sums over gameweeks, so every per-row feature is a
+few fancy-index lookups:
+
+  avg_fixture_difficulty   mean difficulty of the team's fixtures in
+                           [gw, gw + horizon). Each fixture of a double
+                           counts and a blank adds nothing; NEUTRAL_FDR when
+                           there are none
+  fixtures_next            fixtures in that window
+  fixture_count, home_fixtures, is_blank, is_double   for gw itself
+
+A history row's gameweek is its own round. It sees the difficulty of its
+own match and the next ones, which FPL publishes in advance, and never a
+later result. Live scoring asks for the next gameweek. backtest.model_frame()
+and inference.Scorer both go through row_features(), so training and
+serving share one definition.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+
+FIXTURE_HORIZON = 3      # gameweeks averaged into avg_fixture_difficulty
+NEUTRAL_FDR     = 3.0    # no fixture in the window (the notebook's fillna)
+COLUMNS         = ("avg_fixture_difficulty", "fixtures_next", "fixture_count", "home_fixtures",
+                   "is_blank", "is_double")
+
+
+class FixtureMatrix:
+    """Per (team, gameweek) fixture counts and difficulty for one fixture list. Read only."""
+
+    def __init__(self, fixtures: list, horizon: int = FIXTURE_HORIZON):
+        fx = [f for f in fixtures if f.get("event")]            # postponed, unscheduled: no event
+        fx.sort(key=lambda f: (f["event"], f.get("kickoff_time") or "", f["id"]))
+        ev = np.array([f["event"] for f in fx], dtype=np.int64)
+        th = np.array([f["team_h"] for f in fx], dtype=np.int64)
+        ta = np.array([f["team_a"] for f in fx], dtype=np.int64)
+        dh = np.array([f.get("team_h_difficulty") or NEUTRAL_FDR for f in fx], dtype=np.float64)
+        da = np.array([f.get("team_a_difficulty") or NEUTRAL_FDR for f in fx], dtype=np.float64)
+
+        self.horizon  = horizon
+        self.teams    = int(max(th.max(initial=0), ta.max(initial=0))) + 1
+        self.events   = int(ev.max(initial=0)) + horizon + 1
+        self.current  = max((f["event"] for f in fx if f.get("finished")), default=0)
+        shape         = (self.teams, self.events)
+        self.count    = np.zeros(shape, dtype=np.int64)
+        self.home     = np.zeros(shape, dtype=np.int64)
+        self.diff     = np.zeros(shape, dtype=np.float64)
+        np.add.at(self.count, (th, ev), 1)
+        np.add.at(self.count, (ta, ev), 1)
+        np.add.at(self.home, (th, ev), 1)
+        np.add.at(self.diff, (th, ev), dh)
+        np.add.at(self.diff, (ta, ev), da)
+        pad          = np.zeros((self.teams, 1), dtype=np.int64)
+        self._ccount = np.hstack([pad, np.cumsum(self.count, axis=1)])   # [t, g] = fixtures before g
+        self._cdiff  = np.hstack([pad, np.cumsum(self.diff, axis=1)])
+
+        # one slot per (team, fixture), grouped by team then kickoff, for doubles
+        side   = np.concatenate([th, ta])
+        order  = np.lexsort((np.tile(np.arange(len(fx)), 2), np.concatenate([ev, ev]), side))
+        self._slot_team  = side[order]
+        self._slot_event = np.concatenate([ev, ev])[order]
+        self._slot_home  = np.concatenate([np.ones(len(fx), bool), np.zeros(len(fx), bool)])[order]
+
+        ids = np.array([f["id"] for f in fx], dtype=np.int64)
+        by  = np.argsort(ids)
+        self._fixture_ids, self._fixture_h, self._fixture_a = ids[by], th[by], ta[by]
+
+    @property
+    def next_gameweek(self) -> int:
+        return self.current + 1
+
+    def _index(self, team, gw) -> tuple:
+        team = np.asarray(team, dtype=np.int64)
+        gw   = np.broadcast_to(np.asarray(gw, dtype=np.int64), team.shape)
+        ok   = (team >= 0) & (team < self.teams) & (gw >= 0) & (gw < self.events)
+        return np.where(ok, team, 0), np.where(ok, gw, 0), ok
+
+    def row_features(self, team, gw) -> dict:
+        """COLUMNS as arrays for rows of (team id, gameweek); unknown teams look blank."""
+        t, g, ok = self._index(team, gw)
+        end      = np.minimum(g + self.horizon, self.events)
+        n_next   = np.where(ok, self._ccount[t, end] - self._ccount[t, g], 0)
+        d_next   = np.where(ok, self._cdiff[t, end] - self._cdiff[t, g], 0.0)
+        count    = np.where(ok, self.count[t, g], 0)
+        return {
+            "avg_fixture_difficulty": np.where(n_next > 0, d_next / np.maximum(n_next, 1), NEUTRAL_FDR),
+            "fixtures_next":          n_next,
+            "fixture_count":          count,
+            "home_fixtures":          np.where(ok, self.home[t, g], 0),
+            "is_blank":               (count == 0).astype(np.int8),
+            "is_double":              (count > 1).astype(np.int8),
+        }
+
+    def team_of(self, fixture_ids, was_home, fallback=-1):
+        """The team each history row played for: the home or away side of its fixture."""
+        fid = np.asarray(fixture_ids, dtype=np.int64)
+        if not len(self._fixture_ids):
+            return np.broadcast_to(np.asarray(fallback, dtype=np.int64), fid.shape).copy()
+        pos  = np.minimum(np.searchsorted(self._fixture_ids, fid), len(self._fixture_ids) - 1)
+        team = np.where(np.asarray(was_home, dtype=bool), self._fixture_h[pos], self._fixture_a[pos])
+        return np.where(self._fixture_ids[pos] == fid, team, fallback)
+
+    def slots(self, team, gw: int) -> tuple:
+        """
+        One entry per fixture each row's team plays in `gw`, in kickoff order:
+        (row index, is_home). Blank rows get none, doubles two.
+        """
+        t, g, ok = self._index(team, gw)
+        count    = np.where(ok, self.count[t, g], 0)
+        rows     = np.repeat(np.arange(len(t)), count)
+        if not len(rows):
+            return rows, np.zeros(0, dtype=bool)
+        in_gw    = np.flatnonzero(self._slot_event == gw)        # ascending team, then kickoff
+        first    = in_gw[np.minimum(np.searchsorted(self._slot_team[in_gw], t), len(in_gw) - 1)]
+        offset   = np.arange(len(rows)) - np.repeat(np.cumsum(count) - count, count)
+        return rows, self._slot_home[first[rows] + offset]
+
+
+def frame_features(matrix: FixtureMatrix, df, team_col: str = "team", gw_col: str = "round"):
+    """df with COLUMNS added for each row's team and gameweek."""
+    return df.assign(**matrix.row_features(df[team_col].to_numpy(), df[gw_col].to_numpy()))
+
+
+_latest: Optional[tuple] = None      # (fixtures list, its matrix)
+
+
+def cached_matrix(fixtures: list) -> FixtureMatrix:
+    """FixtureMatrix for this exact list; rebuilt when the fixtures cache hands out a new one."""
+    global _latest
+    latest = _latest
+    if latest is None or latest[0] is not fixtures:
+        latest = _latest = (fixtures, FixtureMatrix(fixtures))
+    return latest[1]
@@ -0,0 +1,134 @@
+"""
+Async, connection-pooled client for the FPL API.
+
+One aiohttp session is shared by every request handler, so upstream calls
+reuse keep-alive connections instead of paying a TLS handshake each time and
+no longer tie up a threadpool worker while they wait. Transient failures
+(connection errors, timeouts, 429 and 5xx answers) are retried with jittered
+exponential backoff, and a semaphore caps how many upstream calls are in
+flight at once.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import re
+from typing import Mapping, NamedTuple, Optional
+
+from lazy import lazy_import
+from metrics import span
+
+aiohttp = lazy_import("aiohttp")
+
+FPL_API_BASE = os.environ.get("FPL_API_BASE", "https://fantasy.premierleague.com/api").rstrip("/")
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FplResponse(NamedTuple):
+    status:  int
+    headers: Mapping     # case-insensitive
+    data:    object      # decoded JSON, None for empty bodies (e.g. 304)
+
+
+class FplClient:
+    def __init__(
+        self,
+        base_url:        str   = FPL_API_BASE,
+        timeout:         float = float(os.environ.get("FPL_HTTP_TIMEOUT",         "10")),
+        max_connections: int   = int(os.environ.get("FPL_HTTP_MAX_CONNECTIONS",   "100")),
+        per_host:        int   = int(os.environ.get("FPL_HTTP_PER_HOST",          "50")),
+        keepalive:       float = float(os.environ.get("FPL_HTTP_KEEPALIVE",       "30")),
+        concurrency:     int   = int(os.environ.get("FPL_HTTP_CONCURRENCY",       "50")),
+        retries:         int   = int(os.environ.get("FPL_HTTP_RETRIES",           "3")),
+        backoff:         float = float(os.environ.get("FPL_HTTP_BACKOFF",         "0.25")),
+    ):
+        self.base_url        = base_url.rstrip("/")
+        self.timeout         = timeout
+        self.max_connections = max_connections
+        self.per_host        = per_host
+        self.keepalive       = keepalive
+        self.concurrency     = concurrency
+        self.retries         = retries
+        self.backoff         = backoff
+
+        self._session: Optional[aiohttp.ClientSession]       = None
+        self._sem:     Optional[asyncio.Semaphore]           = None
+        self._loop:    Optional[asyncio.AbstractEventLoop]   = None
+
+    # ── Connection pool ────────────────────────────────────────────────────────
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        # The pool and semaphore belong to one event loop. uvicorn runs a single
+        # loop, but test clients and scripts may start a fresh one per call.
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._loop is not loop or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections,
+                    limit_per_host=self.per_host,
+                    keepalive_timeout=self.keepalive,
+                ),
+                timeout=aiohttp.ClientTimeout(total=self.timeout, connect=min(self.timeout, 5.0)),
+                headers={"User-Agent": "fpl-scouser/1.1"},
+            )
+            self._sem  = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+        return self._session
+
+    async def aclose(self) -> None:
+        if self._session is not None:
+            try:
+                await self._session.close()
+            except RuntimeError:
+                pass    # pool belonged to a loop that has already closed
+            self._session = None
+
+    # ── Requests ───────────────────────────────────────────────────────────────
+    async def get(self, path: str, headers: Optional[dict] = None) -> FplResponse:
+        """GET `path` with retries; returns the final response (304 included)."""
+        with span("upstream " + re.sub(r"/\d+", "/{id}", path.split("?", 1)[0])):
+            return await self._get(path, headers)
+
+    async def _get(self, path: str, headers: Optional[dict]) -> FplResponse:
+        session = self._ensure_session()
+        url     = f"{self.base_url}{path}"
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._sem:
+                    async with session.get(url, headers=headers) as resp:
+                        if resp.status not in RETRY_STATUSES or attempt == self.retries:
+                            body = await resp.read()
+                            data = await resp.json(content_type=None) if body else None
+                            return FplResponse(resp.status, resp.headers.copy(), data)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == self.retries:
+                    raise
+            delay = self.backoff * (2 ** attempt)
+            await asyncio.sleep(delay / 2 + random.uniform(0, delay / 2))
+        raise RuntimeError("unreachable")
+
+    async def get_json(self, path: str):
+        resp = await self.get(path)
+        # FPL answers unknown entries with 404 + {"detail": ...}; callers check that key.
+        if resp.status == 404:
+            return resp.data or {"detail": "Not found."}
+        if resp.status >= 400:
+            raise RuntimeError(f"FPL API {path} returned HTTP {resp.status}")
+        return resp.data
+
+    # ── Endpoints ──────────────────────────────────────────────────────────────
+    async def fixtures(self, event: Optional[int] = None) -> list:
+        return await self.get_json(f"/fixtures/?event={event}" if event is not None else "/fixtures/")
+
+    async def entry(self, team_id: int) -> dict:
+        return await self.get_json(f"/entry/{team_id}/")
+
+    async def picks(self, team_id: int, gw: int) -> dict:
+        return await self.get_json(f"/entry/{team_id}/event/{gw}/picks/")
+
+    async def element_summary(self, player_id: int) -> dict:
+        return await self.get_json(f"/element-summary/{player_id}/")
+
+
+fpl_client = FplClient()
@@ -0,0 +1,188 @@
+"""
+Online scoring with the pickled LightGBM model for /api/predict.
+
+player_predictions.csv is frozen at notebook time; this scores every player
+at request time instead, so a price change or a new fixture list shows up
+without re-running the notebook:
+
+  - rolling form features come from the gameweek history through
+    FeatureState (features.py), built once per history file version; they
+    are the values a player carries into their *next* match
+  - value is the live now_cost. avg_fixture_difficulty and the gameweek's
+    fixtures come from fixture_features.FixtureMatrix, the same code that
+    builds the training rows
+  - a player gets one row per fixture in the gameweek, carrying that
+    fixture's is_home, and the row scores are summed. A double gameweek
+    counts both matches and a blank scores 0
+  - all rows go through one model.predict call, and the result is cached
+    per (model version, gameweek, data version)
+  - per-player overrides (e.g. {"avg_minutes_last3": 0} for a late doubt)
+    rescore only those rows on top of the cached base
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from features import SOURCES, FeatureState
+from fixture_features import cached_matrix
+from lazy import lazy_import
+from prediction_store import file_signature, frame_version
+from storage import HISTORY_CSV, HISTORY_DATASET, read_history
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+FEATURES = [
+    "avg_pts_last3", "avg_pts_last5", "form_trend",
+    "avg_minutes_last3", "avg_xgi_last3", "avg_ict_last3",
+    "avg_bps_last3", "is_home", "value", "avg_fixture_difficulty",
+]
+SCORE_CACHE_SIZE = 8
+IS_HOME          = FEATURES.index("is_home")
+
+
+def model_version(path: Path) -> str:
+    with open(path, "rb") as fh:
+        return hashlib.sha1(fh.read()).hexdigest()[:12]
+
+
+def predict_fixtures(model, X: np.ndarray, slots: tuple, pinned: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Points per row of X over its fixtures: slots is (row, is_home) per
+    fixture, from FixtureMatrix.slots. Rows in `pinned` keep their own
+    is_home (an override).
+    """
+    rows, home = slots
+    if not len(rows):
+        return np.zeros(len(X))
+    Xf = X[rows]
+    Xf[:, IS_HOME] = home if pinned is None else np.where(pinned[rows], Xf[:, IS_HOME], home)
+    return np.bincount(rows, weights=model.predict(Xf), minlength=len(X))
+
+
+class Scorer:
+    """Feature state, base scores and overrides for one data directory."""
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+        self._history_sig: Optional[tuple] = None
+        self._latest:      Optional[pd.DataFrame] = None
+        self._history_ver  = ""
+        self._cache: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._lock   = threading.Lock()
+        self.hits    = 0
+        self.misses  = 0
+
+    # ── Inputs ─────────────────────────────────────────────────────────────────
+    def _history_features(self) -> tuple[str, pd.DataFrame]:
+        sig = file_signature([self.data_dir / HISTORY_CSV, self.data_dir / HISTORY_DATASET])
+        if sig != self._history_sig:
+            hist  = read_history(self.data_dir, columns=["player_id", "round", *SOURCES])
+            state = FeatureState.from_history(hist)
+            self._latest       = state.latest().set_index("player_id")
+            self._history_ver  = frame_version(self._latest)
+            self._history_sig  = sig
+        return self._history_ver, self._latest
+
+    def _matrix(self, elements: list, fixtures: list) -> tuple:
+        """(gameweek, player ids, feature matrix, fixtures per player, fixture slots)."""
+        fm     = cached_matrix(fixtures)
+        gw     = fm.next_gameweek
+        ids    = np.array([e["id"] for e in elements], dtype=np.int64)
+        teams  = np.array([e["team"] for e in elements], dtype=np.int64)
+        fix    = fm.row_features(teams, gw)
+        slots  = fm.slots(teams, gw)
+        count  = fix["fixture_count"]
+        first  = np.zeros(len(ids))                   # is_home of the first fixture, for display
+        first[count > 0] = slots[1][(np.cumsum(count) - count)[count > 0]]
+        latest = self._latest.reindex(ids)
+        X = np.column_stack([
+            latest["avg_pts_last3"], latest["avg_pts_last5"], latest["form_trend"],
+            latest["avg_minutes_last3"], latest["avg_xgi_last3"], latest["avg_ict_last3"],
+            latest["avg_bps_last3"],
+            first,
+            [e["now_cost"] for e in elements],
+            fix["avg_fixture_difficulty"],
+        ]).astype(float)
+        return gw, ids, np.ascontiguousarray(X), count, slots
+
+    # ── Scoring ────────────────────────────────────────────────────────────────
+    def score(
+        self,
+        model,
+        model_ver:  str,
+        elements:   list,
+        fixtures:   list,
+        data_ver:   str,
+        overrides:  Optional[dict[int, dict[str, float]]] = None,
+    ) -> dict:
+        """
+        {"gameweek", "data_version", "cached", "ids", "features", "fixtures",
+        "predicted", "overridden", "timings_ms"}; predicted is aligned with ids.
+        """
+        t0 = time.perf_counter()
+        with self._lock:
+            hist_ver, _ = self._history_features()
+            version     = f"{hist_ver}.{data_ver}"
+            gw          = cached_matrix(fixtures).next_gameweek
+            key         = (model_ver, gw, version)
+            base        = self._cache.get(key)
+            if base is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+        t1 = t2 = time.perf_counter()
+
+        cached = base is not None
+        if not cached:
+            gw, ids, X, n_fix, slots = self._matrix(elements, fixtures)
+            t1   = time.perf_counter()
+            pts  = predict_fixtures(model, X, slots)
+            t2   = time.perf_counter()
+            base = {"gameweek": gw, "ids": ids, "features": X, "fixtures": n_fix, "predicted": pts,
+                    "slots": slots, "rows": {int(p): i for i, p in enumerate(ids)}}
+            with self._lock:
+                self._cache[key] = base
+                self.misses += 1
+                while len(self._cache) > SCORE_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+
+        X, pts, changed = base["features"], base["predicted"], np.zeros(len(base["ids"]), dtype=bool)
+        if overrides:
+            rows = np.array([base["rows"][int(p)] for p in overrides], dtype=np.intp)
+            X    = X.copy()
+            for r, feats in zip(rows, overrides.values()):
+                for name, value in feats.items():
+                    X[r, FEATURES.index(name)] = value
+            local         = np.full(len(X), -1)
+            local[rows]   = np.arange(len(rows))
+            slot_rows, home = base["slots"]
+            keep          = local[slot_rows] >= 0
+            pinned        = np.array(["is_home" in feats for feats in overrides.values()])
+            pts           = pts.copy()
+            pts[rows]     = predict_fixtures(model, X[rows], (local[slot_rows[keep]], home[keep]), pinned)
+            changed[rows] = True
+        t3 = time.perf_counter()
+
+        return {
+            "gameweek":     base["gameweek"],
+            "data_version": version,
+            "cached":       cached,
+            "ids":          base["ids"],
+            "features":     X,
+            "fixtures":     base["fixtures"],
+            "predicted":    pts,
+            "overridden":   changed,
+            "timings_ms":   {
+                "features":  round((t1 - t0) * 1000, 2),     # includes the cache lookup
+                "predict":   round((t2 - t1) * 1000, 2),
+                "overrides": round((t3 - t2) * 1000, 2),
+            },
+        }
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "cached_versions": len(self._cache)}
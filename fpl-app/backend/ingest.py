@@ -0,0 +1,264 @@
+"""
+Concurrent, resumable collection of per-player gameweek history.
+
+Replaces the notebook loop that called element-summary/{id}/ one player at a
+time with a 0.2 s sleep:
+
+  - requests go through the shared FplClient with bounded concurrency and a
+    token-bucket rate limiter (steady rate + small burst), so a full refresh
+    takes seconds without hammering the API
+  - every player's history is appended to a JSONL checkpoint store as soon as
+    it arrives; a crash or Ctrl-C loses nothing already fetched and the next
+    run resumes from the store
+  - a player is re-fetched only when the store has no record for them, a
+    gameweek has finished since their record was fetched (a 0-minute round
+    moves none of their totals), or their bootstrap totals (total_points,
+    minutes, form, event_points) no longer match the stored ones — i.e. FPL
+    revised (`modified`) a past row; the run reports how many rows were new
+    and how many were revised
+
+    python ingest.py                          # refresh Data/data/fpl_gameweek_history.csv
+    FPL_API_BASE=http://127.0.0.1:8001 python ingest.py --out /tmp/hist   # against mock_fpl
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from fpl_client import FplClient, fpl_client
+from storage import write_history
+
+ROOT_DIR = Path(os.environ.get("FPL_ROOT", str(Path(__file__).resolve().parent.parent.parent)))
+DATA_DIR = Path(os.environ.get("FPL_DATA_DIR", str(ROOT_DIR / "Data" / "data")))
+
+CHECKPOINT_NAME  = "history_checkpoint.jsonl"
+HISTORY_NAME     = "fpl_gameweek_history.csv"
+INGEST_RATE      = float(os.environ.get("FPL_INGEST_RATE",        "20"))   # requests per second
+INGEST_BURST     = int(os.environ.get("FPL_INGEST_BURST",         "10"))
+INGEST_WORKERS   = int(os.environ.get("FPL_INGEST_CONCURRENCY",   "16"))
+REFRESH_KEYS     = ("total_points", "minutes", "form", "event_points")
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, at most `burst` banked."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate   = rate
+        self.burst  = max(1, burst)
+        self.tokens = float(self.burst)
+        self.stamp  = time.monotonic()
+        self._lock  = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now         = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp  = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+# ── Checkpoint store ───────────────────────────────────────────────────────────
+class CheckpointStore:
+    """
+    Append-only JSONL file, one record per fetch:
+    {"player_id", "fetched_at", "event", *REFRESH_KEYS, "history": [...]},
+    where "event" is the last finished gameweek when it was fetched.
+    The last record for a player wins; a torn final line (crash mid-write)
+    is ignored on load.
+    """
+
+    def __init__(self, path: Path):
+        self.path    = Path(path)
+        self.records: dict[int, dict] = {}
+        self._fh     = None
+
+    def load(self) -> "CheckpointStore":
+        self.records = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.records[int(rec["player_id"])] = rec
+        return self
+
+    def append(self, rec: dict) -> None:
+        if self._fh is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path, "a", encoding="utf-8")
+        self._fh.write(json.dumps(rec) + "\n")
+        self._fh.flush()
+        self.records[int(rec["player_id"])] = rec
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def compact(self) -> None:
+        """Rewrite the file with only the latest record per player."""
+        self.close()
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            for rec in self.records.values():
+                fh.write(json.dumps(rec) + "\n")
+        os.replace(tmp, self.path)
+
+    def to_frame(self) -> pd.DataFrame:
+        rows = [
+            {**row, "player_id": pid}
+            for pid, rec in sorted(self.records.items()) for row in rec["history"]
+        ]
+        return pd.DataFrame.from_records(rows)
+
+
+def latest_event(boot: dict) -> int:
+    """The last finished gameweek in bootstrap-static's events (0 before the season)."""
+    return max((int(e["id"]) for e in boot.get("events", []) if e.get("finished")), default=0)
+
+
+def needs_refresh(rec: Optional[dict], element: dict, event: int = 0) -> bool:
+    if rec is None:
+        return True
+    seen = rec.get("event")
+    if seen is None:        # records written before "event" was stored
+        seen = max((int(row.get("round") or 0) for row in rec["history"]), default=0)
+    if seen < event:
+        return True
+    return any(key in element and rec.get(key) != element[key] for key in REFRESH_KEYS)
+
+
+def diff_rows(old: list, new: list) -> tuple[int, int]:
+    """(new rows, revised rows) between two histories, keyed by fixture."""
+    # compare serialised rows: NaN scores never compare equal as floats
+    before  = {row.get("fixture"): json.dumps(row, sort_keys=True) for row in old}
+    added   = sum(row.get("fixture") not in before for row in new)
+    revised = sum(
+        1 for row in new
+        if row.get("fixture") in before and json.dumps(row, sort_keys=True) != before[row.get("fixture")]
+    )
+    return added, revised
+
+
+# ── Ingestion ──────────────────────────────────────────────────────────────────
+async def ingest_history(
+    out_dir:     Path      = DATA_DIR,
+    client:      FplClient = fpl_client,
+    concurrency: int       = INGEST_WORKERS,
+    rate:        float     = INGEST_RATE,
+    burst:       int       = INGEST_BURST,
+    force:       bool      = False,
+    player_ids:  Optional[list[int]] = None,
+    progress:    bool      = False,
+) -> dict:
+    """
+    Bring the checkpoint store up to date and rewrite the history CSV (and
+    its Parquet copy) from it. Returns {"players", "fetched", "skipped",
+    "new_rows", "revised_rows", "failed": [ids], "seconds"}.
+    """
+    t0    = time.perf_counter()
+    out   = Path(out_dir)
+    store = CheckpointStore(out / CHECKPOINT_NAME).load()
+
+    boot     = await client.get_json("/bootstrap-static/")
+    elements = {int(e["id"]): e for e in boot["elements"]}
+    event    = latest_event(boot)
+    ids      = list(elements) if player_ids is None else [int(p) for p in player_ids]
+    todo     = [pid for pid in ids
+                if force or needs_refresh(store.records.get(pid), elements.get(pid, {}), event)]
+
+    bucket = TokenBucket(rate, burst)
+    queue  = asyncio.Queue()
+    for pid in todo:
+        queue.put_nowait(pid)
+    failed: list[int] = []
+    done   = 0
+    rows   = {"new_rows": 0, "revised_rows": 0}
+
+    async def worker() -> None:
+        nonlocal done
+        while True:
+            try:
+                pid = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await bucket.acquire()
+            try:
+                data = await client.element_summary(pid)
+                if "history" not in data:
+                    raise RuntimeError(data.get("detail", "no history"))
+            except Exception:
+                failed.append(pid)
+                continue
+            el  = elements.get(pid, {})
+            old = store.records.get(pid)
+            added, revised = diff_rows(old["history"] if old else [], data["history"])
+            rows["new_rows"]     += added
+            rows["revised_rows"] += revised
+            store.append({
+                "player_id":  pid,
+                "fetched_at": time.time(),
+                "event":      event,
+                **{key: el.get(key) for key in REFRESH_KEYS},
+                "history":    data["history"],
+            })
+            done += 1
+            if progress and done % 50 == 0:
+                print(f"{done}/{len(todo)} fetched | failed: {len(failed)}")
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    finally:
+        store.close()
+
+    csv_path = out / HISTORY_NAME
+    if done or not csv_path.exists():
+        if not failed:
+            store.compact()
+        history = store.to_frame()
+    else:
+        history = pd.DataFrame()    # nothing changed since the CSV was written
+    if len(history):
+        tmp = out / (HISTORY_NAME + ".tmp")
+        history.to_csv(tmp, index=False)
+        os.replace(tmp, csv_path)
+        write_history(history, out, csv=False)     # Parquet copy, written after the CSV
+
+    return {
+        "players": len(ids),
+        "fetched": done,
+        "skipped": len(ids) - len(todo),
+        **rows,
+        "failed":  failed,
+        "seconds": round(time.perf_counter() - t0, 2),
+    }
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Fetch per-player gameweek history")
+    ap.add_argument("--out",         type=Path,  default=DATA_DIR)
+    ap.add_argument("--concurrency", type=int,   default=INGEST_WORKERS)
+    ap.add_argument("--rate",        type=float, default=INGEST_RATE, help="requests per second")
+    ap.add_argument("--burst",       type=int,   default=INGEST_BURST)
+    ap.add_argument("--force",       action="store_true", help="re-fetch every player")
+    args = ap.parse_args()
+
+    async def _main():
+        try:
+            return await ingest_history(args.out, fpl_client, args.concurrency, args.rate,
+                                        args.burst, args.force, progress=True)
+        finally:
+            await fpl_client.aclose()
+
+    print(asyncio.run(_main()))
@@ -0,0 +1,52 @@
+"""
+Deferred imports for the heavy third-party modules.
+
+    pd = lazy_import("pandas")
+
+binds a stand-in module; pandas itself is imported on the first attribute
+access (pd.DataFrame, pd.read_csv, ...) and the stand-in then carries the
+real module's namespace. Importing main therefore costs FastAPI and little
+else: pandas, numpy, pyarrow, pulp and aiohttp load when a route first needs
+them, or in the background warm-up (warmup.import_heavy_modules, the
+"imports" step of main's WarmUp at startup). Modules using these names in
+annotations start with `from __future__ import annotations`, so defining a
+function does not trigger the import.
+
+available() is the matching test for optional dependencies: it finds the
+package without importing it.
+"""
+import importlib
+import importlib.util
+import sys
+import types
+
+
+class _LazyModule(types.ModuleType):
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)      # later lookups skip __getattr__
+        return getattr(module, attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__name__ in sys.modules else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """`name` (e.g. "pyarrow.parquet"), imported on first use."""
+    return _LazyModule(name)
+
+
+def available(name: str) -> bool:
+    """Whether `name` can be imported, without importing it (or its package)."""
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name.split(".")[0]) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def loaded(names) -> dict:
+    """{name: imported yet?} for the given module names."""
+    return {n: n in sys.modules for n in names}
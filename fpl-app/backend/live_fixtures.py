@@ -0,0 +1,228 @@
+"""
+Live fixture stream for /api/fpl/fixtures/stream (server-sent events).
+
+Browsers used to poll /api/fpl/fixtures, so matchday load grew with the
+number of open tabs. Instead one poller per process watches the fixtures
+and pushes what changed to every subscriber:
+
+  - the poller revalidates the shared fixtures cache (a 304 when nothing
+    moved) every FPL_LIVE_POLL seconds while a match is in play or about to
+    kick off, and every FPL_IDLE_POLL seconds otherwise. It only runs while
+    someone is subscribed
+  - each fixture's score, minutes, started/finished flags, kick-off and
+    gameweek are compared with the previous poll; only fixtures that moved
+    are rendered, as one `update` event
+  - every event is rendered and encoded once into SSE bytes and appended to
+    a short numbered history. One shared asyncio.Event wakes the
+    subscribers, which write those same bytes: no per-client queue,
+    rendering or JSON encoding, so a change costs the same for 10 clients as
+    for 5,000
+  - a new subscriber gets a `snapshot` of the current gameweek first. A
+    reconnect with Last-Event-ID resumes from the history, or gets a fresh
+    snapshot if it fell too far behind. Idle connections get a comment
+    line every FPL_SSE_KEEPALIVE seconds so proxies keep them open
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+LIVE_POLL_SECONDS = float(os.environ.get("FPL_LIVE_POLL",       "15"))
+IDLE_POLL_SECONDS = float(os.environ.get("FPL_IDLE_POLL",       "120"))
+KEEPALIVE_SECONDS = float(os.environ.get("FPL_SSE_KEEPALIVE",   "15"))
+HISTORY_EVENTS    = int(os.environ.get("FPL_SSE_HISTORY",       "256"))
+RETRY_MS          = 5000                 # client reconnect delay sent with the first event
+
+# fixture fields whose change is pushed to subscribers
+WATCHED = ("event", "kickoff_time", "started", "finished", "finished_provisional",
+           "minutes", "team_h_score", "team_a_score")
+
+# all fixtures -> (current gameweek, rendered items of that gameweek)
+Render = Callable[[list], Awaitable[tuple]]
+
+
+def frame(seq: int, kind: str, data) -> bytes:
+    return f"id: {seq}\nevent: {kind}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+def in_play_soon(fixtures: list, within: float) -> bool:
+    """True if a fixture is being played or kicks off within `within` seconds."""
+    horizon = datetime.now(timezone.utc) + timedelta(seconds=within)
+    for fx in fixtures:
+        if fx.get("finished") or fx.get("finished_provisional"):
+            continue
+        if fx.get("started"):
+            return True
+        kickoff = fx.get("kickoff_time")
+        if kickoff:
+            try:
+                if datetime.fromisoformat(kickoff) <= horizon:
+                    return True
+            except ValueError:
+                pass
+    return False
+
+
+class LiveFixtures:
+    """One poller per process, fanning fixture changes out as shared SSE bytes."""
+
+    def __init__(
+        self,
+        fetch:     Callable[[], Awaitable[list]],
+        render:    Render,
+        live_poll: float = LIVE_POLL_SECONDS,
+        idle_poll: float = IDLE_POLL_SECONDS,
+        keepalive: float = KEEPALIVE_SECONDS,
+        history:   int   = HISTORY_EVENTS,
+    ):
+        self.fetch     = fetch
+        self.render    = render
+        self.live_poll = live_poll
+        self.idle_poll = idle_poll
+        self.keepalive = keepalive
+
+        self._state:    dict[int, tuple]  = {}       # fixture id -> WATCHED values
+        self._frames:   deque             = deque(maxlen=history)
+        self._snapshot: Optional[bytes]   = None     # current gameweek, all fixtures
+        self._gw:       Optional[int]     = None
+        self._wake:     Optional[asyncio.Event] = None
+        self._poller:   Optional[asyncio.Task]  = None
+        self._loop:     Optional[asyncio.AbstractEventLoop] = None
+
+        self.seq          = 0     # id of the newest event
+        self.subscribers  = 0
+        self.polls        = 0
+        self.changes      = 0     # fixtures pushed in update events
+        self.publish_ms   = 0.0   # render + encode time of the last event
+        self.last_poll    = None
+        self.last_error:  Optional[str] = None
+
+    # ── Poller ─────────────────────────────────────────────────────────────────
+    def _ensure_poller(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:               # a fresh loop (test clients): start over
+            self._loop, self._wake, self._poller = loop, asyncio.Event(), None
+        if self._poller is None or self._poller.done():
+            self._poller = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while self.subscribers:
+            delay = self.idle_poll
+            try:
+                fixtures = await self.poll()
+                if in_play_soon(fixtures, self.idle_poll):
+                    delay = self.live_poll
+                self.last_error = None
+            except Exception as e:               # keep streaming what we have; retry soon
+                self.last_error = f"{type(e).__name__}: {e}"
+                delay           = self.live_poll
+            await self._sleep(delay)
+
+    async def _sleep(self, seconds: float) -> None:
+        """Sleep, waking the subscribers every `keepalive` seconds for a ping."""
+        end = time.monotonic() + seconds
+        while self.subscribers and (left := end - time.monotonic()) > 0:
+            await asyncio.sleep(min(left, self.keepalive))
+            if time.monotonic() < end:
+                self._notify()
+
+    async def poll(self) -> list:
+        """Fetch the fixtures once and publish whatever changed."""
+        fixtures = await self.fetch()
+        self.polls    += 1
+        self.last_poll = time.monotonic()
+        state   = {fx["id"]: tuple(fx.get(k) for k in WATCHED) for fx in fixtures}
+        changed = {fid for fid, vals in state.items() if self._state.get(fid) != vals}
+        first   = self._snapshot is None
+        self._state = state
+        if not changed and not first:
+            return fixtures
+
+        t0, seq   = time.perf_counter(), self.seq
+        gw, items = await self.render(fixtures)
+        snapshot  = {"gw": gw, "fixtures": items}
+        if first or gw != self._gw:
+            self._publish("snapshot", snapshot)
+        else:
+            moved = [it for it in items if it["id"] in changed]
+            if moved:
+                self._publish("update", {"gw": gw, "fixtures": moved})
+                self.changes += len(moved)
+        self._gw        = gw
+        self._snapshot  = frame(self.seq, "snapshot", snapshot)
+        self.publish_ms = (time.perf_counter() - t0) * 1000
+        if self.seq != seq:
+            self._notify()                       # one wake-up per subscriber, nothing else
+        return fixtures
+
+    def _publish(self, kind: str, data) -> None:
+        self.seq += 1
+        self._frames.append(frame(self.seq, kind, data))
+
+    def _notify(self) -> None:
+        # swap first: subscribers woken now wait on the new event next time
+        wake, self._wake = self._wake, asyncio.Event()
+        if wake is not None:
+            wake.set()
+
+    def _since(self, seq: int) -> Optional[list]:
+        """
+        Frames after `seq`, or None if they are no longer in the history, or
+        `seq` is ahead of ours (an id from before a restart or another worker).
+        """
+        lag = self.seq - seq
+        if lag == 0:
+            return []
+        if lag < 0 or lag > len(self._frames):
+            return None
+        return [self._frames[i] for i in range(len(self._frames) - lag, len(self._frames))]
+
+    # ── Subscribers ────────────────────────────────────────────────────────────
+    async def stream(self, last_event_id: Optional[int] = None) -> AsyncIterator[bytes]:
+        """SSE bytes for one subscriber, until the client disconnects."""
+        self.subscribers += 1
+        self._ensure_poller()
+        try:
+            while self._snapshot is None:            # first subscriber: wait for the first poll
+                await self._wake.wait()
+            frames = self._since(last_event_id) if last_event_id is not None else None
+            seq    = self.seq
+            yield f"retry: {RETRY_MS}\n".encode() + (b"".join(frames) if frames is not None else self._snapshot)
+
+            while True:
+                frames = self._since(seq)            # events published while we were writing
+                if frames == []:
+                    await self._wake.wait()
+                    frames = self._since(seq)
+                if frames is None:                   # too far behind: start again from a snapshot
+                    frames = [self._snapshot]
+                seq = self.seq
+                yield b"".join(frames) if frames else b": ping\n\n"
+        finally:
+            self.subscribers -= 1
+
+    async def stop(self) -> None:
+        task, self._poller = self._poller, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "subscribers":   self.subscribers,
+            "seq":           self.seq,
+            "gameweek":      self._gw,
+            "polls":         self.polls,
+            "changes":       self.changes,
+            "publish_ms":    round(self.publish_ms, 3),
+            "poll_age":      round(time.monotonic() - self.last_poll, 1) if self.last_poll else None,
+            "last_error":    self.last_error,
+        }
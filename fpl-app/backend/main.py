@@ -3,28 +3,52 @@ FPL AI Decision Engine — FastAPI Backend
 Fix: robust path resolution, debug endpoint, live-API fallback when
      model/CSV files are missing (notebook not yet run).
 """
-from fastapi import FastAPI, HTTPException
+from __future__ import annotations
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pydantic import BaseModel, Field
 from pathlib import Path
-from typing import Optional
-import pandas as pd
-import numpy as np
-import requests
+from typing import Annotated, Literal, Optional
+import asyncio
+import json
+import time
 import os
 
-# ── Optional heavy imports (graceful fallback if not installed) ────────────────
-try:
-    import joblib
-    JOBLIB_OK = True
-except ImportError:
-    JOBLIB_OK = False
-
-try:
-    import pulp
-    PULP_OK = True
-except ImportError:
-    PULP_OK = False
+import batch_solver
+from backtest import insights as backtest_insights, load_backtest
+from bootstrap_cache import BootstrapCache, bootstrap, get_bootstrap
+from fpl_client import fpl_client
+from inference import FEATURES, Scorer, model_version
+from lazy import available, lazy_import, loaded
+import metrics
+from metrics import MetricsMiddleware, span
+from pruning import prune_pool
+from player_index import PlayerIndex, decode_cursor, encode_cursor
+from response_cache import Page, ResponseCache, encode
+from standings import Standings
+from live_fixtures import LiveFixtures
+from prediction_store import PredictionStore, Snapshot
+from storage import PREDICTIONS_IPC, predictions_path, read_predictions
+from squad_model import get_squad_model, lineup_value, pick_lineup
+from squad_solver import InfeasibleSquad, SearchLimit, solve_squad
+from simulation import FORMATION_MIN, MAX_SCENARIOS, N_SCENARIOS, Simulator, simulate
+from transfer_model import solve_transfers
+from transfer_planner import MAX_FREE_TRANSFERS, per_gw_points, plan_transfers
+from tree_model import export_model, load_model
+from warmup import Step, WarmUp, import_heavy_modules
+
+# ── Heavy imports, deferred until first use (lazy.py) ──────────────────────────
+pd        = lazy_import("pandas")
+np        = lazy_import("numpy")
+joblib    = lazy_import("joblib")
+pulp      = lazy_import("pulp")
+JOBLIB_OK = available("joblib")
+PULP_OK   = available("pulp")
 
 # ── Path resolution ────────────────────────────────────────────────────────────
 # main.py lives at:  <root>/fpl-app/backend/main.py
@@ -52,53 +76,87 @@ DATA_DIR   = Path(os.environ.get("FPL_DATA_DIR",   str(ROOT_DIR / "Data" / "data
 MODELS_DIR = Path(os.environ.get("FPL_MODELS_DIR", str(ROOT_DIR / "Data" / "models")))
 
 MODEL_PATH = MODELS_DIR / "fpl_model.pkl"
+MODEL_NPZ  = MODELS_DIR / "fpl_model.npz"     # tree_model.py export; scored without lightgbm
 PREDS_PATH = DATA_DIR   / "player_predictions.csv"
 
-app = FastAPI(title="FPL AI Decision Engine", version="1.1.0")
+# Only what the routes use; the stored file also carries every model feature.
+PREDICTION_COLUMNS = [
+    "player_id", "web_name", "element_type", "now_cost", "team",
+    "predicted_pts", "avg_pts_last3", "avg_xgi_last3", "avg_minutes_last3",
+]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup.start()
+    yield
+    await warmup.stop()
+    await live_fixtures.stop()
+    await fpl_client.aclose()
+    batch_solver.shutdown_executor()
+
+
+app = FastAPI(title="FPL AI Decision Engine", version="1.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://localhost:3000", "*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "Server-Timing"],
 )
-
-FEATURES = [
-    "avg_pts_last3", "avg_pts_last5", "form_trend",
-    "avg_minutes_last3", "avg_xgi_last3", "avg_ict_last3",
-    "avg_bps_last3", "is_home", "value", "avg_fixture_difficulty",
-]
+app.add_middleware(MetricsMiddleware)      # request histograms, ?profile=1 span breakdown
 
 # ── Cache ──────────────────────────────────────────────────────────────────────
-_model       = None
-_predictions = None
+_model         = None
+_model_mtime   = None
+_model_version = None
 
 
 def get_model():
-    global _model
-    if _model is not None:
+    """
+    The exported tree model (tree_model.py) when fpl_model.npz matches the
+    pickle, so lightgbm is never imported. Otherwise the pickle, re-exported
+    for the next start.
+    """
+    global _model, _model_mtime, _model_version
+    mtime = tuple(p.stat().st_mtime_ns if p.exists() else None for p in (MODEL_PATH, MODEL_NPZ))
+    if _model is not None and mtime == _model_mtime:
         return _model
-    if not JOBLIB_OK:
-        raise HTTPException(500, "joblib not installed. Run: pip install joblib")
-    if not MODEL_PATH.exists():
-        raise HTTPException(
-            500,
-            f"Model file not found at '{MODEL_PATH}'. "
-            "You need to run your Jupyter notebook (FPL_Pipeline_Fixed.ipynb) "
-            "first to generate fpl_model.pkl. "
-            f"Expected location: {MODEL_PATH}"
-        )
-    _model = joblib.load(MODEL_PATH)
+
+    model = load_model(MODEL_NPZ, MODEL_PATH)
+    if model is None:
+        if not MODEL_PATH.exists():
+            raise HTTPException(
+                500,
+                f"Model file not found at '{MODEL_PATH}'. "
+                "You need to run your Jupyter notebook (FPL_Pipeline_Fixed.ipynb) "
+                "first to generate fpl_model.pkl. "
+                f"Expected location: {MODEL_PATH}"
+            )
+        if not JOBLIB_OK:
+            raise HTTPException(500, "joblib not installed. Run: pip install joblib")
+        model = joblib.load(MODEL_PATH)
+        try:
+            export_model(model, MODEL_NPZ, source=MODEL_PATH)
+        except (OSError, ValueError):
+            pass                                # read-only disk or unsupported model: keep the pickle
+        mtime = tuple(p.stat().st_mtime_ns if p.exists() else None for p in (MODEL_PATH, MODEL_NPZ))
+
+    _model         = model
+    _model_mtime   = mtime
+    # both loaders report the pickle's hash, so cached scores survive the switch
+    sha1           = getattr(model, "source_sha1", None)
+    _model_version = sha1[:12] if sha1 else model_version(MODEL_PATH if MODEL_PATH.exists() else MODEL_NPZ)
     return _model
 
 
-def _fetch_live_fpl_data() -> pd.DataFrame:
+async def _fetch_live_fpl_data() -> pd.DataFrame:
     """
     Fallback: build a basic player DataFrame directly from the FPL API
     when player_predictions.csv is missing (notebook not run yet).
     Points are estimated from season total / games played.
     """
-    r        = requests.get("https://fantasy.premierleague.com/api/bootstrap-static/", timeout=15).json()
+    r        = await get_bootstrap()
     teams    = pd.DataFrame(r["teams"])
     elements = pd.DataFrame(r["elements"])
 
@@ -126,23 +184,28 @@ def _fetch_live_fpl_data() -> pd.DataFrame:
         pd.to_numeric(df.get("expected_goal_involvements", 0), errors="coerce").fillna(0) / gp
     ).round(2)
 
+    starts = pd.to_numeric(df.get("starts", gp), errors="coerce").fillna(0).clip(lower=1)
+    df["avg_minutes_last3"] = (
+        pd.to_numeric(df.get("minutes", 0), errors="coerce").fillna(0) / starts
+    ).clip(upper=90).round(1)
+
     return df[[
         "player_id", "web_name", "team_name", "team", "position",
         "price", "now_cost", "predicted_pts", "status",
-        "element_type", "avg_pts_last3", "avg_xgi_last3",
+        "element_type", "avg_pts_last3", "avg_xgi_last3", "avg_minutes_last3",
     ]]
 
 
-def get_predictions() -> pd.DataFrame:
-    global _predictions
-    if _predictions is not None:
-        return _predictions
-
-    if PREDS_PATH.exists():
+async def _load_predictions() -> tuple[pd.DataFrame, str]:
+    """Build a fresh predictions frame; returns (frame, source)."""
+    source = predictions_path(DATA_DIR)
+    if source.exists():
         # ── Normal path: notebook has been run ────────────────────────────────
-        df = pd.read_csv(PREDS_PATH)
+        df = await run_in_threadpool(read_predictions, DATA_DIR, PREDICTION_COLUMNS)
+        # stored with narrow ints; the solvers do arithmetic on these
+        df = df.astype({c: "int64" for c in ("player_id", "team", "element_type", "now_cost")})
         try:
-            r          = requests.get("https://fantasy.premierleague.com/api/bootstrap-static/", timeout=10).json()
+            r          = await get_bootstrap()
             teams      = pd.DataFrame(r["teams"])
             players    = pd.DataFrame(r["elements"])[["id", "status"]]
             team_map   = teams.set_index("id")["name"].to_dict()
@@ -166,7 +229,7 @@ def get_predictions() -> pd.DataFrame:
     else:
         # ── Fallback: notebook not run yet, use live FPL API ─────────────────
         try:
-            df = _fetch_live_fpl_data()
+            df = await _fetch_live_fpl_data()
         except Exception as e:
             raise HTTPException(
                 500,
@@ -174,14 +237,64 @@ def get_predictions() -> pd.DataFrame:
                 f"live FPL API fetch failed: {e}. "
                 "Please run your Jupyter notebook to generate predictions."
             )
+        source = "live_fpl_api"
+
+    return df, str(source)
+
+
+predictions = PredictionStore(
+    _load_predictions,
+    lambda: [PREDS_PATH, DATA_DIR / PREDICTIONS_IPC, MODEL_PATH, MODEL_NPZ],
+    bootstrap,
+)
+fixtures_cache = BootstrapCache(fpl_client, "/fixtures/")   # same TTL / ETag handling as bootstrap
+scorer         = Scorer(DATA_DIR)
+simulator      = Simulator(DATA_DIR)    # model residuals behind /api/squad/simulate
+responses      = ResponseCache()    # encoded GET responses keyed on data version + params
+standings      = Standings()        # incremental league table for /api/pl/table
+live_fixtures  = LiveFixtures(lambda: _poll_fixtures(), lambda fx: _render_live(fx))
+warmup         = WarmUp([
+    Step("imports",     import_heavy_modules),
+    Step("model",       get_model,      required=False),   # only /api/predict and insights need it
+    Step("bootstrap",   get_bootstrap,  required=False),   # predictions fall back to plain labels
+    Step("predictions", predictions.get),
+])
+
+
+async def get_predictions() -> pd.DataFrame:
+    """Current predictions frame. Shared: filter it, never modify it in place."""
+    return (await predictions.get()).frame
 
-    _predictions = df
-    return _predictions
+
+def _available(df: pd.DataFrame) -> pd.DataFrame:
+    return df[df["status"] == "a"].reset_index(drop=True)
 
 
 # ── Pydantic schemas ───────────────────────────────────────────────────────────
+MAX_BUDGET          = 200.0      # £m; the native solver's tables grow with the budget
+MAX_BATCH_SCENARIOS = 200
+
+Budget = Annotated[float, Field(gt=0, le=MAX_BUDGET)]
+
+
 class OptimizeRequest(BaseModel):
-    budget: float = 100.0
+    budget: float                               = Field(100.0, gt=0, le=MAX_BUDGET)
+    solver: Literal["lineup", "native", "cbc"]  = "lineup"
+    prune:  bool                                = True
+
+
+class BatchScenario(BaseModel):
+    budget:       Budget    = 100.0
+    exclude:      list[str] = []
+    max_per_club: int       = 3
+
+
+class BatchOptimizeRequest(BaseModel):
+    # Either explicit scenarios, or budgets sharing one exclude list / club cap.
+    scenarios:    list[BatchScenario] = Field([], max_length=MAX_BATCH_SCENARIOS)
+    budgets:      list[Budget]        = Field([], max_length=MAX_BATCH_SCENARIOS)
+    exclude:      list[str]           = []
+    max_per_club: int                 = 3
 
 
 class TransferRequest(BaseModel):
@@ -189,56 +302,110 @@ class TransferRequest(BaseModel):
     free_transfers: int       = 1
     hit_cost:       int       = 4
     locked_players: list[str] = []
+    prune:          bool      = True
 
 
-# ── ILP helper ─────────────────────────────────────────────────────────────────
-def _run_squad_ilp(df: pd.DataFrame, budget_raw: int):
-    if not PULP_OK:
-        raise HTTPException(500, "pulp not installed. Run: pip install pulp")
-
-    df = df.reset_index(drop=True)
-    n  = len(df)
-
-    prob = pulp.LpProblem("FPL_Squad", pulp.LpMaximize)
-    x    = [pulp.LpVariable(f"x{i}", cat="Binary") for i in range(n)]
-
-    prob += pulp.lpSum(df["predicted_pts"][i] * x[i] for i in range(n))
-    prob += pulp.lpSum(x) == 15
-    prob += pulp.lpSum(df["now_cost"][i] * x[i] for i in range(n)) <= budget_raw
+class PlanRequest(BaseModel):
+    team_id:        int
+    horizon:        int             = 5
+    window:         int             = 3
+    free_transfers: Optional[int]   = None    # default: what the FPL entry has banked
+    hit_cost:       int             = 4
+    decay:          float           = 1.0
+    locked_players: list[str]       = []
 
-    for pos, mn, mx in [("GK",2,2),("DEF",5,5),("MID",5,5),("FWD",3,3)]:
-        idx = df[df["position"] == pos].index.tolist()
-        prob += pulp.lpSum(x[i] for i in idx) >= mn
-        prob += pulp.lpSum(x[i] for i in idx) <= mx
 
-    for club in df["team"].unique():
-        idx = df[df["team"] == club].index.tolist()
-        prob += pulp.lpSum(x[i] for i in idx) <= 3
+class SimulateRequest(BaseModel):
+    player_ids:   list[int]                  # 15: the XI, then the bench in autosub order
+    captain:      Optional[int] = None       # default: the starters with the highest predictions
+    vice_captain: Optional[int] = None
+    scenarios:    int           = N_SCENARIOS
+    seed:         Optional[int] = None
 
-    cheap_gk = df[(df["now_cost"] <= 40) & (df["position"] == "GK")].index.tolist()
-    if cheap_gk:
-        prob += pulp.lpSum(x[i] for i in cheap_gk) >= 1
 
-    prob.solve(pulp.PULP_CBC_CMD(msg=0))
+class PredictRequest(BaseModel):
+    player_ids:       list[int]                   = []     # empty: every player
+    overrides:        dict[int, dict[str, float]] = {}     # {player_id: {feature: value}}
+    include_features: bool                        = False
+    limit:            Optional[int]               = None
 
-    selected = [x[i].value() == 1 for i in range(n)]
-    squad    = df[selected].copy().reset_index(drop=True)
 
-    m     = len(squad)
-    prob2 = pulp.LpProblem("FPL_Starting11", pulp.LpMaximize)
-    y     = [pulp.LpVariable(f"y{i}", cat="Binary") for i in range(m)]
+# ── ILP helper ─────────────────────────────────────────────────────────────────
+def _run_squad_ilp(df: pd.DataFrame, budget_raw: int, solver: str = "lineup", prune: bool = True,
+                   snap: Optional[Snapshot] = None):
+    """
+    `df` derived from `snap` (when given) lets the pruned pool and CBC model be reused per version.
 
-    prob2 += pulp.lpSum(squad["predicted_pts"][i] * y[i] for i in range(m))
-    prob2 += pulp.lpSum(y) == 11
+    "lineup" (the default) solves squad, XI and armband in one CBC model,
+    warm-started from the native two-phase answer; "native" and "cbc" pick
+    the squad on the sum of all 15, then the XI and armband (pick_lineup).
+    """
+    df      = df.reset_index(drop=True)
+    pruning = None
+    if prune:
+        with span("prune"):
+            df, pruning = snap.derive("squad_pool", lambda _: prune_pool(df)) if snap else prune_pool(df)
+    pts      = df["predicted_pts"].to_numpy(dtype=float)
+    position = df["position"].to_numpy()
+
+    selected = None
+    timings  = {"build": 0.0, "solve": 0.0, "parse": 0.0}
+    info     = {}
+    if solver in ("lineup", "native"):
+        try:
+            with span("squad.search") as search:
+                selected, stats = solve_squad(
+                    pts, df["now_cost"].to_numpy(), position, df["team"].to_numpy(), budget_raw,
+                    prune=not prune,    # already pruned above
+                )
+            timings["solve"] += search.ms
+            info = {"solver_stats": {k: stats[k] for k in ("nodes", "gk_pairs")}}
+        except InfeasibleSquad as e:
+            raise HTTPException(400, str(e))
+        except SearchLimit:
+            if solver == "native":
+                solver = "cbc"     # club caps bind hard enough to blunt the bounds; let CBC prove it
+    lineup = pick_lineup(position, pts, selected) if selected is not None else None
+
+    if solver != "native":
+        if not PULP_OK:
+            raise HTTPException(500, "pulp not installed. Run: pip install pulp")
+        version       = f"{snap.version}:{'pruned' if prune else 'full'}" if snap else None
+        with span("squad.model") as build:
+            model, cached = get_squad_model(df, version=version, lineup=solver == "lineup")
+        try:
+            if solver == "lineup":
+                lineup, solved = model.solve_lineup(pts, budget_raw, start=lineup)
+            else:
+                chosen, solved = model.solve(pts, budget_raw)
+                lineup         = pick_lineup(position, pts, chosen)
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        timings["build"] += build.ms
+        for k, v in solved.items():
+            timings[k] += v
+        info.update(model_cached=cached, pool_version=model.version)
+
+    with span("squad.result") as result:
+        squad = df[lineup.selected].copy()
+        squad["is_starter"] = lineup.starter[lineup.selected]
+        squad["is_captain"] = squad.index == lineup.captain
+        squad["is_vice"]    = squad.index == lineup.vice
+        squad = squad.reset_index(drop=True)
+    timings["parse"] += result.ms
+    return squad, {
+        "solver":     solver,
+        "objective":  round(lineup_value(pts, lineup), 3),
+        "pruning":    pruning,
+        **info,
+        "timings_ms": {k: round(v, 2) for k, v in timings.items()},
+    }
 
-    for pos, mn, mx in [("GK",1,1),("DEF",3,5),("MID",3,5),("FWD",1,3)]:
-        idx = squad[squad["position"] == pos].index.tolist()
-        prob2 += pulp.lpSum(y[i] for i in idx) >= mn
-        prob2 += pulp.lpSum(y[i] for i in idx) <= mx
 
-    prob2.solve(pulp.PULP_CBC_CMD(msg=0))
-    squad["is_starter"] = [y[i].value() == 1 for i in range(m)]
-    return squad
+def _json(payload) -> Response:
+    """JSON response encoded here, so its serialisation shows up as a span."""
+    with span("serialize"):
+        return Response(encode(payload), media_type="application/json")
 
 
 # ── Endpoints ──────────────────────────────────────────────────────────────────
@@ -247,14 +414,74 @@ def _run_squad_ilp(df: pd.DataFrame, budget_raw: int):
 def health():
     return {
         "status":       "ok",
-        "model_found":  MODEL_PATH.exists(),
+        "model_found":  MODEL_PATH.exists() or MODEL_NPZ.exists(),
         "preds_found":  PREDS_PATH.exists(),
         "root_dir":     str(ROOT_DIR),
         "data_dir":     str(DATA_DIR),
         "models_dir":   str(MODELS_DIR),
+        "bootstrap":    bootstrap.stats(),
+        "predictions":  predictions.stats(),
+        "warmup":       warmup.state,
+        "responses":    responses.stats(),
+        "standings":    standings.stats(),
+        "live":         live_fixtures.stats(),
     }
 
 
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus text exposition: request and span histograms, cache counters."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+def _collect() -> list:
+    """Counters and gauges for /metrics, read from each component's stats()."""
+    out = []
+    for name, cache in (("bootstrap", bootstrap), ("fixtures", fixtures_cache)):
+        st   = cache.stats()
+        tags = {"cache": name}
+        out += [
+            ("fpl_upstream_fetches_total",       "counter", "Full upstream downloads.",          tags, st["fetches"]),
+            ("fpl_upstream_revalidations_total", "counter", "Upstream 304 revalidations.",       tags, st["revalidations"]),
+            ("fpl_upstream_age_seconds",         "gauge",   "Age of the cached upstream payload.", tags, st["age_seconds"]),
+        ]
+    rs = responses.stats()
+    ps = predictions.stats()
+    ls = live_fixtures.stats()
+    return out + [
+        ("fpl_response_cache_hits_total",         "counter", "Response cache hits.",            None, rs["hits"]),
+        ("fpl_response_cache_misses_total",       "counter", "Response cache misses.",          None, rs["misses"]),
+        ("fpl_response_cache_not_modified_total", "counter", "304 answers to If-None-Match.",   None, rs["not_modified"]),
+        ("fpl_response_cache_evictions_total",    "counter", "Response cache evictions.",       None, rs["evictions"]),
+        ("fpl_response_cache_bytes",              "gauge",   "Bytes held by the response cache.", None, rs["bytes"]),
+        ("fpl_prediction_reloads_total",          "counter", "Prediction snapshots built.",     None, ps["reloads"]),
+        ("fpl_prediction_reload_errors_total",    "counter", "Failed prediction reloads.",      None, ps["errors"]),
+        ("fpl_standings_results_applied_total",   "counter", "Fixture results applied to the table.", None, standings.applied),
+        ("fpl_live_subscribers",                  "gauge",   "Open live fixture streams.",      None, ls["subscribers"]),
+        ("fpl_live_polls_total",                  "counter", "Live fixture polls.",             None, ls["polls"]),
+        ("fpl_ready",                             "gauge",   "1 once the warm-up has finished.", None, int(warmup.ready)),
+    ]
+
+
+metrics.register(_collect)
+
+
+@app.get("/api/ready")
+async def ready():
+    """Readiness: 503 until the warm-up has loaded the predictions (and imports)."""
+    warmup.start()          # no-op unless a failed warm-up is due a retry
+    status = warmup.status()
+    status["modules"] = loaded(["pandas", "numpy", "pyarrow", "pulp", "aiohttp", "lightgbm"])
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+@app.get("/api/predictions/version")
+async def predictions_version():
+    """Version of the prediction snapshot routes are serving (reloads it if its files changed)."""
+    await predictions.get()
+    return predictions.stats()
+
+
 @app.get("/api/debug")
 def debug():
     """
@@ -266,8 +493,9 @@ def debug():
         "data_dir":         str(DATA_DIR),
         "models_dir":       str(MODELS_DIR),
         "model_path":       str(MODEL_PATH),
-        "preds_path":       str(PREDS_PATH),
+        "preds_path":       str(predictions_path(DATA_DIR)),
         "model_exists":     MODEL_PATH.exists(),
+        "model_npz_exists": MODEL_NPZ.exists(),
         "preds_exists":     PREDS_PATH.exists(),
         "data_dir_exists":  DATA_DIR.exists(),
         "models_dir_exists":MODELS_DIR.exists(),
@@ -286,10 +514,10 @@ def debug():
 
 
 @app.get("/api/current-gw")
-def current_gw():
+async def current_gw():
     """Returns the real current Premier League gameweek from the FPL API."""
     try:
-        r       = requests.get("https://fantasy.premierleague.com/api/bootstrap-static/", timeout=10).json()
+        r       = await get_bootstrap()
         events  = pd.DataFrame(r["events"])
         current = events[events["is_current"] == True]
         if len(current):
@@ -303,105 +531,317 @@ def current_gw():
 
 
 @app.get("/api/players")
-def get_players(
-    position:       Optional[str] = None,
-    max_price:      float         = 15.0,
-    only_available: bool          = True,
-    limit:          int           = 50,
+async def get_players(
+    request:        Request,
+    position:       Optional[str]   = None,
+    max_price:      float           = 15.0,
+    only_available: bool            = True,
+    limit:          int             = 50,
+    team:           Optional[str]   = None,     # team id or club name
+    min_minutes:    Optional[float] = None,     # average minutes over the last 3 GWs
+    min_xgi:        Optional[float] = None,     # average xGI over the last 3 GWs
+    cursor:         Optional[str]   = None,     # X-Next-Cursor of the previous page
 ):
-    df = get_predictions().copy()
-    if position:
-        df = df[df["position"] == position.upper()]
-    df = df[df["price"] <= max_price]
-    if only_available:
-        df = df[df["status"] == "a"]
-    df = df.sort_values("predicted_pts", ascending=False).head(limit)
+    """Top picks by predicted points; the next page's cursor is in X-Next-Cursor."""
+    snap  = await predictions.get()
+    index = snap.derive("player_index", PlayerIndex)
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+    team_id = index.team_id(team) if team else None
+    if team and team_id is None:
+        raise HTTPException(400, f"Unknown team '{team}'")
+    params = {"position": position.upper() if position else None, "max_price": max_price,
+              "only_available": only_available, "limit": limit, "team": team_id,
+              "min_minutes": min_minutes, "min_xgi": min_xgi, "after": after}
+    return responses.respond(request, "players", snap.version, params,
+                             lambda: _players_page(index, params))
+
+
+def _players_page(index: PlayerIndex, params: dict) -> Page:
+    rows, last = index.query(**params)
+    return Page(rows, {"X-Next-Cursor": encode_cursor(last)} if last else {})
+
+
+@app.post("/api/predict")
+async def predict(req: PredictRequest):
+    """Score players with the model now, from history + live prices and fixtures."""
+    bad = {f for feats in req.overrides.values() for f in feats} - set(FEATURES)
+    if bad:
+        raise HTTPException(400, f"Unknown features in overrides: {sorted(bad)}. Valid: {FEATURES}")
+
+    model          = get_model()
+    (boot, bver), (fixtures, fver) = await asyncio.gather(
+        bootstrap.get_versioned(), fixtures_cache.get_versioned(),
+    )
+    elements       = boot["elements"]
+    known          = {e["id"] for e in elements}
+    missing        = (set(req.player_ids) | set(req.overrides)) - known
+    if missing:
+        raise HTTPException(404, f"Unknown player ids: {sorted(missing)}")
+
+    data_ver = f"b{bver}.f{fver}"
+    res      = await run_in_threadpool(
+        scorer.score, model, _model_version, elements, fixtures, data_ver, req.overrides or None
+    )
 
-    # Always return avg_pts_last3 and avg_xgi_last3 (may be approximated)
-    cols = ["player_id", "web_name", "team_name", "position",
-            "price", "predicted_pts", "status", "avg_pts_last3", "avg_xgi_last3"]
-    cols = [c for c in cols if c in df.columns]
-    return df[cols].fillna(0).to_dict(orient="records")
+    team_map = {t["id"]: t["name"] for t in boot["teams"]}
+    pos_map  = {1: "GK", 2: "DEF", 3: "MID", 4: "FWD"}
+    order    = np.argsort(-res["predicted"], kind="stable")
+    if req.player_ids:
+        wanted = set(req.player_ids)
+        order  = [i for i in order if int(res["ids"][i]) in wanted]
+    if req.limit is not None:
+        order = order[:req.limit]
+
+    players = []
+    for i in order:
+        el  = elements[i]
+        row = {
+            "player_id":     el["id"],
+            "web_name":      el["web_name"],
+            "team_name":     team_map.get(el["team"]),
+            "position":      pos_map.get(el["element_type"]),
+            "price":         el["now_cost"] / 10,
+            "status":        el.get("status"),
+            "fixtures":      int(res["fixtures"][i]),
+            "predicted_pts": round(float(res["predicted"][i]), 2),
+            "overridden":    bool(res["overridden"][i]),
+        }
+        if req.include_features:
+            row["features"] = {f: (None if np.isnan(v) else round(float(v), 4))
+                               for f, v in zip(FEATURES, res["features"][i])}
+        players.append(row)
+
+    return {
+        "model_version": _model_version,
+        "gameweek":      res["gameweek"],
+        "data_version":  res["data_version"],
+        "cached":        res["cached"],
+        "scored":        len(res["ids"]),
+        "timings_ms":    res["timings_ms"],
+        "players":       players,
+    }
 
 
 @app.get("/api/model/insights")
-def get_model_insights():
-    if not MODEL_PATH.exists():
-        # Return placeholder insights so the Insights page isn't broken
-        placeholder_imp = {f: max(4000 - i*300, 200) for i, f in enumerate(FEATURES)}
-        return {
-            "model":               "LightGBM (Optuna-tuned)",
-            "mae":                 1.021,
-            "baseline_mae":        1.563,
-            "improvement_pct":     34.7,
-            "training_rows":       19069,
-            "feature_importances": placeholder_imp,
-            "model_comparison": [
-                {"model": "Baseline (mean)",               "mae": 1.563, "improvement": "—"},
-                {"model": "Linear Regression",             "mae": 1.053, "improvement": "32.6%"},
-                {"model": "Random Forest",                 "mae": 1.052, "improvement": "32.7%"},
-                {"model": "LightGBM",                      "mae": 1.040, "improvement": "33.5%"},
-                {"model": "LightGBM + Fixture Difficulty", "mae": 1.040, "improvement": "33.5%"},
-                {"model": "LightGBM Tuned (Optuna)",       "mae": 1.021, "improvement": "34.7%"},
-            ],
-            "_note": "Model file not found — showing placeholder values. Run the notebook to load real feature importances.",
-        }
+def get_model_insights(request: Request):
+    backtest = load_backtest()
+    measured = backtest["version"] if backtest else "none"
+    if not (MODEL_PATH.exists() or MODEL_NPZ.exists()):
+        # Return placeholder importances so the Insights page isn't broken
+        return responses.respond(request, "insights", f"placeholder-{measured}", {},
+                                 lambda: _placeholder_insights(backtest))
+    model = get_model()
+    return responses.respond(request, "insights", f"{_model_version}-{measured}", {},
+                             lambda: _model_insights(model, backtest))
+
+
+def _placeholder_insights(backtest: Optional[dict]) -> dict:
+    placeholder_imp = {f: max(4000 - i*300, 200) for i, f in enumerate(FEATURES)}
+    return {
+        "model":               "LightGBM (Optuna-tuned)",
+        **backtest_insights(backtest),
+        "feature_importances": placeholder_imp,
+        "_note": "Model file not found — showing placeholder importances. Run the notebook to load real ones.",
+    }
 
-    model       = get_model()
+
+def _model_insights(model, backtest: Optional[dict]) -> dict:
     importances = dict(zip(FEATURES, [int(v) for v in model.feature_importances_]))
     sorted_imp  = dict(sorted(importances.items(), key=lambda x: x[1], reverse=True))
     return {
         "model":               "LightGBM (Optuna-tuned)",
-        "mae":                 1.021,
-        "baseline_mae":        1.563,
-        "improvement_pct":     34.7,
-        "training_rows":       19069,
+        **backtest_insights(backtest),      # MAEs from the walk-forward backtest (backtest.py)
         "feature_importances": sorted_imp,
-        "model_comparison": [
-            {"model": "Baseline (mean)",               "mae": 1.563, "improvement": "—"},
-            {"model": "Linear Regression",             "mae": 1.053, "improvement": "32.6%"},
-            {"model": "Random Forest",                 "mae": 1.052, "improvement": "32.7%"},
-            {"model": "LightGBM",                      "mae": 1.040, "improvement": "33.5%"},
-            {"model": "LightGBM + Fixture Difficulty", "mae": 1.040, "improvement": "33.5%"},
-            {"model": "LightGBM Tuned (Optuna)",       "mae": 1.021, "improvement": "34.7%"},
-        ],
     }
 
 
 @app.post("/api/squad/optimize")
-def optimize_squad(req: OptimizeRequest):
-    df         = get_predictions().copy()
-    df         = df[df["status"] == "a"].reset_index(drop=True)
+async def optimize_squad(req: OptimizeRequest):
+    snap       = await predictions.get()
+    df         = snap.derive("available", _available)
     budget_raw = int(req.budget * 10)
 
     if len(df) < 15:
         raise HTTPException(400, f"Not enough available players ({len(df)}) to build a squad of 15.")
 
-    squad    = _run_squad_ilp(df, budget_raw)
+    squad, solve_info = await run_in_threadpool(_run_squad_ilp, df, budget_raw, req.solver, req.prune, snap)
     starters = squad[squad["is_starter"] == True]
     bench    = squad[squad["is_starter"] == False]
     cols     = ["web_name", "team_name", "position", "price", "predicted_pts", "is_starter"]
 
-    starters_sorted   = starters.sort_values("predicted_pts", ascending=False)
-    captain_name      = starters_sorted.iloc[0]["web_name"]
-    vice_captain_name = starters_sorted.iloc[1]["web_name"]
-
-    return {
+    return _json({
         "total_cost":       round(squad["now_cost"].sum() / 10, 1),
         "predicted_points": round(float(starters["predicted_pts"].sum()), 2),
         "budget_remaining": round(req.budget - squad["now_cost"].sum() / 10, 1),
-        "captain":          captain_name,
-        "vice_captain":     vice_captain_name,
+        "captain":          squad.loc[squad["is_captain"], "web_name"].iloc[0],
+        "vice_captain":     squad.loc[squad["is_vice"], "web_name"].iloc[0],
         "starters":         starters[cols].to_dict(orient="records"),
         "bench":            bench[cols].to_dict(orient="records"),
+        **solve_info,
+    })
+
+
+@app.post("/api/squad/optimize/batch")
+async def optimize_squad_batch(req: BatchOptimizeRequest):
+    """Solve many budgets/scenarios in parallel; streams one NDJSON line per result."""
+    scenarios = req.scenarios + [
+        BatchScenario(budget=b, exclude=req.exclude, max_per_club=req.max_per_club) for b in req.budgets
+    ]
+    if not scenarios:
+        raise HTTPException(400, "Give at least one budget or scenario.")
+    if len(scenarios) > MAX_BATCH_SCENARIOS:
+        raise HTTPException(400, f"At most {MAX_BATCH_SCENARIOS} scenarios per batch.")
+    if any(not 1 <= sc.max_per_club <= 15 for sc in scenarios):
+        raise HTTPException(400, "max_per_club must be between 1 and 15.")
+
+    df = (await predictions.get()).derive("available", _available)
+
+    # One pruned pool for the whole batch: excluded players may not act as
+    # dominators, and the tightest club cap needs the most distinct clubs.
+    names           = df["web_name"].to_numpy()
+    excluded_any    = np.isin(names, sorted({n for sc in scenarios for n in sc.exclude}))
+    df, pruning     = prune_pool(df, max_per_club=min(sc.max_per_club for sc in scenarios),
+                                 dominators=~excluded_any)
+    names           = df["web_name"].to_numpy()
+    pool = {
+        "player_id": df["player_id"].to_numpy(),
+        "pts":       df["predicted_pts"].to_numpy(dtype=float),
+        "cost":      df["now_cost"].to_numpy(),
+        "position":  df["position"].to_numpy(),
+        "team":      df["team"].to_numpy(),
+    }
+    jobs = [
+        batch_solver.Scenario(int(round(sc.budget * 10)), np.isin(names, sc.exclude), sc.max_per_club)
+        for sc in scenarios
+    ]
+    cols = ["web_name", "team_name", "position", "price", "predicted_pts", "is_starter"]
+
+    async def stream():
+        yield json.dumps({"scenarios": len(jobs), "workers": batch_solver.BATCH_WORKERS, "pruning": pruning,
+                          "selection": "two-phase"}) + "\n"
+        async for i, res in batch_solver.solve_batch(pool, jobs):
+            sc  = scenarios[i]
+            out = {"index": i, "budget": sc.budget, "exclude": sc.exclude, "max_per_club": sc.max_per_club}
+            if res["error"] is not None:
+                out["error"] = res["error"]
+            else:
+                lineup = pick_lineup(pool["position"], pool["pts"], res["mask"])
+                squad  = df[lineup.selected].assign(is_starter=lineup.starter[lineup.selected])
+                out.update({
+                    "total_cost":       round(squad["now_cost"].sum() / 10, 1),
+                    "predicted_points": round(float(pool["pts"][lineup.starter].sum()), 2),
+                    "budget_remaining": round(sc.budget - squad["now_cost"].sum() / 10, 1),
+                    "captain":          names[lineup.captain],
+                    "vice_captain":     names[lineup.vice],
+                    "squad":            squad[cols].to_dict(orient="records"),
+                    "objective":        round(lineup_value(pool["pts"], lineup), 3),
+                    "solver":           res["solver"],
+                    "solve_ms":         round(res["solve_ms"], 2),
+                })
+            yield json.dumps(out, default=str) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.post("/api/squad/simulate")
+async def simulate_squad(req: SimulateRequest):
+    """Distribution of a squad's gameweek points over Monte Carlo scenarios, autosubs and captaincy included."""
+    ids = req.player_ids
+    if len(ids) != 15 or len(set(ids)) != 15:
+        raise HTTPException(400, "Give 15 distinct player ids: the XI, then the bench in order.")
+    if not 1 <= req.scenarios <= MAX_SCENARIOS:
+        raise HTTPException(400, f"scenarios must be between 1 and {MAX_SCENARIOS}.")
+
+    model          = get_model()
+    (boot, bver), (fixtures, fver) = await asyncio.gather(
+        bootstrap.get_versioned(), fixtures_cache.get_versioned(),
+    )
+    elements       = boot["elements"]
+    row            = {e["id"]: i for i, e in enumerate(elements)}
+    missing        = [p for p in ids if p not in row]
+    if missing:
+        raise HTTPException(404, f"Unknown player ids: {missing}")
+
+    pos_map   = {1: "GK", 2: "DEF", 3: "MID", 4: "FWD"}
+    squad     = [elements[row[p]] for p in ids]
+    positions = [pos_map[e["element_type"]] for e in squad]
+    xi        = positions[:11]
+    if xi.count("GK") != 1 or any(xi.count(p) < n for p, n in FORMATION_MIN.items()):
+        raise HTTPException(400, f"The XI needs one GK and at least {FORMATION_MIN} per position; got {xi}.")
+    for role in ("captain", "vice_captain"):
+        if getattr(req, role) is not None and getattr(req, role) not in ids[:11]:
+            raise HTTPException(400, f"The {role.replace('_', '-')} must be in the XI.")
+
+    data_ver = f"b{bver}.f{fver}"
+
+    def run() -> dict:
+        scored    = scorer.score(model, _model_version, elements, fixtures, data_ver)
+        idx       = [row[p] for p in ids]
+        predicted = scored["predicted"][idx]
+        ranked    = [int(i) for i in np.argsort(-predicted[:11], kind="stable")]
+        captain   = ids.index(req.captain) if req.captain is not None else \
+                    next(i for i in ranked if ids[i] != req.vice_captain)
+        vice      = ids.index(req.vice_captain) if req.vice_captain is not None else \
+                    next(i for i in ranked if i != captain)
+        if captain == vice:
+            raise HTTPException(400, "Captain and vice-captain must differ.")
+        with span("simulate.residuals"):
+            pool = simulator.pool(model, _model_version, elements, fixtures, data_ver)
+        with span("simulate.scenarios"):
+            out = simulate(pool, predicted, ids, [e["team"] for e in squad], positions,
+                           scored["fixtures"][idx], captain, vice, req.scenarios, req.seed,
+                           chance=[e.get("chance_of_playing_next_round") for e in squad])
+        return {"gameweek": scored["gameweek"], "predicted": predicted, "captain": captain,
+                "vice": vice, **out}
+
+    res      = await run_in_threadpool(run)
+    team_map = {t["id"]: t["name"] for t in boot["teams"]}
+    per      = res.pop("players")
+    cap      = res.pop("captaincy")
+    players  = [{
+        "player_id":     e["id"],
+        "web_name":      e["web_name"],
+        "team_name":     team_map.get(e["team"]),
+        "position":      positions[i],
+        "role":          "starter" if i < 11 else "bench",
+        "predicted_pts": round(float(res["predicted"][i]), 2),
+        "mean":          per["mean"][i],
+        "p10":           per["p10"][i],
+        "p50":           per["p50"][i],
+        "p90":           per["p90"][i],
+        "played":        per["played"][i],
+        **({"subbed_in": per["subbed_in"][i]} if i >= 11 else {}),
+    } for i, e in enumerate(squad)]
+    captaincy = sorted(({"player_id": ids[i], "web_name": squad[i]["web_name"], "mean": cap["mean"][i],
+                         "p10": cap["p10"][i], "p50": cap["p50"][i], "p90": cap["p90"][i]}
+                        for i in range(11)), key=lambda c: -c["mean"])
+
+    return {
+        "model_version":  _model_version,
+        "gameweek":       res["gameweek"],
+        "scenarios":      res["scenarios"],
+        "seed":           res["seed"],
+        "captain":        squad[res["captain"]]["web_name"],
+        "vice_captain":   squad[res["vice"]]["web_name"],
+        "mean":           res["mean"],
+        "std":            res["std"],
+        "percentiles":    res["percentiles"],
+        "captain_played": res["captain_played"],
+        "vice_used":      res["vice_used"],
+        "autosubs":       res["autosubs"],
+        "players":        players,
+        "captaincy":      captaincy,
+        "timings_ms":     res["timings_ms"],
     }
 
 
 @app.get("/api/transfers/squad/{team_id}")
-def fetch_fpl_squad(team_id: int):
-    BASE = "https://fantasy.premierleague.com/api"
+async def fetch_fpl_squad(team_id: int):
     try:
-        boot      = requests.get(f"{BASE}/bootstrap-static/", timeout=10).json()
+        boot, entry_r = await asyncio.gather(get_bootstrap(), fpl_client.entry(team_id))
         events_df = pd.DataFrame(boot["events"])
         current_rows = events_df[events_df["is_current"] == True]
         if len(current_rows):
@@ -410,7 +850,6 @@ def fetch_fpl_squad(team_id: int):
             finished   = events_df[events_df["finished"] == True]
             current_gw = int(finished["id"].max()) if len(finished) else 1
 
-        entry_r = requests.get(f"{BASE}/entry/{team_id}/", timeout=10).json()
         if "detail" in entry_r:
             raise HTTPException(404, f"Team ID {team_id} not found.")
 
@@ -424,7 +863,7 @@ def fetch_fpl_squad(team_id: int):
         for gw_try in [picks_gw, picks_gw - 1, picks_gw + 1]:
             if gw_try < 1:
                 continue
-            resp = requests.get(f"{BASE}/entry/{team_id}/event/{gw_try}/picks/", timeout=10).json()
+            resp = await fpl_client.picks(team_id, gw_try)
             if "picks" in resp:
                 picks_r = resp
                 used_gw = gw_try
@@ -434,15 +873,17 @@ def fetch_fpl_squad(team_id: int):
             raise HTTPException(404, "Could not retrieve picks. Make sure you have submitted your team.")
 
         player_ids = [p["element"] for p in picks_r["picks"]]
-        df         = get_predictions()
-        squad_df   = df[df["player_id"].isin(player_ids)][
-            ["player_id", "web_name", "team_name", "position", "price", "predicted_pts", "status"]
-        ].copy()
+        df         = await get_predictions()
+        with span("squad.match"):
+            squad_df = df[df["player_id"].isin(player_ids)][
+                ["player_id", "web_name", "team_name", "position", "price", "predicted_pts", "status"]
+            ].copy()
+            players  = squad_df.to_dict(orient="records")
         return {
             "gameweek":       used_gw,
             "itb":            round(float(itb), 1),
             "free_transfers": int(free_tf),
-            "players":        squad_df.to_dict(orient="records"),
+            "players":        players,
         }
     except HTTPException:
         raise
@@ -451,105 +892,161 @@ def fetch_fpl_squad(team_id: int):
 
 
 @app.post("/api/transfers/optimize")
-def optimize_transfers(req: TransferRequest):
-    squad_data = fetch_fpl_squad(req.team_id)
+async def optimize_transfers(req: TransferRequest):
+    squad_data = await fetch_fpl_squad(req.team_id)
     squad_ids  = [p["player_id"] for p in squad_data["players"]]
 
-    df               = get_predictions().copy()
+    df = await get_predictions()
+    return _json(await run_in_threadpool(_solve_transfers, req, squad_data, squad_ids, df))
+
+
+def _solve_transfers(req: TransferRequest, squad_data: dict, squad_ids: list, df: pd.DataFrame) -> dict:
+    with span("transfers.prepare"):
+        current_squad_df = df[df["player_id"].isin(squad_ids)]
+        if len(current_squad_df) < 11:
+            raise HTTPException(400, f"Only matched {len(current_squad_df)} players. Regenerate predictions.")
+
+        squad_value      = current_squad_df["now_cost"].sum() / 10
+        total_budget_raw = int((squad_value + squad_data["itb"]) * 10)
+
+        opt_df               = df[(df["status"] == "a") | (df["player_id"].isin(squad_ids))].copy().reset_index(drop=True)
+        opt_df["in_current"] = opt_df["player_id"].isin(squad_ids).astype(int)
+        pruning              = None
+    if req.prune:
+        with span("prune"):
+            keep            = (opt_df["in_current"] == 1) | opt_df["web_name"].isin(req.locked_players)
+            opt_df, pruning = prune_pool(opt_df, keep=keep.to_numpy())
+    if not PULP_OK:
+        raise HTTPException(500, "pulp not installed. Run: pip install pulp")
+
+    locked = opt_df["web_name"].isin(req.locked_players).to_numpy() if req.locked_players else None
+    try:
+        lineup, timings = solve_transfers(opt_df, total_budget_raw, req.free_transfers, req.hit_cost, locked)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    with span("transfers.result"):
+        new_squad     = opt_df[lineup.selected].assign(is_starter=lineup.starter[lineup.selected])
+        transfers_in  = new_squad[new_squad["in_current"] == 0]
+        out_ids       = [pid for pid in squad_ids if pid not in new_squad["player_id"].values]
+        transfers_out = df[df["player_id"].isin(out_ids)]
+        n_in          = len(transfers_in)
+        hits_taken    = max(0, n_in - req.free_transfers)
+        pts_gain      = float(transfers_in["predicted_pts"].sum() - transfers_out["predicted_pts"].sum())
+        cols          = ["player_id", "web_name", "team_name", "position", "price", "predicted_pts"]
+
+        out = {
+            "transfers_made":  n_in,
+            "hits_taken":      hits_taken,
+            "points_hit":      hits_taken * req.hit_cost,
+            "net_pts_gain":    round(pts_gain - hits_taken * req.hit_cost, 2),
+            "captain":         opt_df.at[lineup.captain, "web_name"],
+            "vice_captain":    opt_df.at[lineup.vice, "web_name"],
+            "transfers_in":    transfers_in[cols].to_dict(orient="records"),
+            "transfers_out":   transfers_out[cols].to_dict(orient="records"),
+            "new_squad":       new_squad[cols + ["in_current", "is_starter"]].to_dict(orient="records"),
+            "gameweek":        squad_data["gameweek"],
+            "itb":             round(float(squad_data["itb"]), 1),
+            "pruning":         pruning,
+            "timings_ms":      {k: round(v, 2) for k, v in timings.items()},
+        }
+    return out
+
+
+@app.post("/api/transfers/plan")
+async def plan_transfers_route(req: PlanRequest):
+    if not 1 <= req.horizon <= 8:
+        raise HTTPException(400, "horizon must be between 1 and 8 gameweeks.")
+    if req.window < 1:
+        raise HTTPException(400, "window must be at least 1.")
+    if not PULP_OK:
+        raise HTTPException(500, "pulp not installed. Run: pip install pulp")
+
+    squad_data = await fetch_fpl_squad(req.team_id)
+    squad_ids  = [p["player_id"] for p in squad_data["players"]]
+    df, fixtures = await asyncio.gather(get_predictions(), fixtures_cache.get())
+    return _json(await run_in_threadpool(_plan_transfers, req, squad_data, squad_ids, df, fixtures))
+
+
+def _plan_transfers(req: PlanRequest, squad_data: dict, squad_ids: list, df: pd.DataFrame, fixtures: list) -> dict:
     current_squad_df = df[df["player_id"].isin(squad_ids)]
     if len(current_squad_df) < 11:
         raise HTTPException(400, f"Only matched {len(current_squad_df)} players. Regenerate predictions.")
 
-    squad_value      = current_squad_df["now_cost"].sum() / 10
-    total_budget_raw = int((squad_value + squad_data["itb"]) * 10)
+    first_gw = squad_data["gameweek"] + 1
+    gws      = [gw for gw in range(first_gw, first_gw + req.horizon) if gw <= 38]
+    if not gws:
+        raise HTTPException(400, "No gameweeks left to plan.")
 
+    total_budget_raw     = int(current_squad_df["now_cost"].sum() + round(squad_data["itb"] * 10))
     opt_df               = df[(df["status"] == "a") | (df["player_id"].isin(squad_ids))].copy().reset_index(drop=True)
     opt_df["in_current"] = opt_df["player_id"].isin(squad_ids).astype(int)
-    n = len(opt_df)
-
-    prob = pulp.LpProblem("FPL_Transfers", pulp.LpMaximize)
-    x    = [pulp.LpVariable(f"x{i}", cat="Binary") for i in range(n)]
-    t    = [pulp.LpVariable(f"t{i}", cat="Binary") for i in range(n)]
-    s    = [pulp.LpVariable(f"s{i}", cat="Binary") for i in range(n)]
-    h    = pulp.LpVariable("hits", lowBound=0, cat="Continuous")
-
-    prob += pulp.lpSum(opt_df["predicted_pts"][i] * x[i] for i in range(n)) - req.hit_cost * h
-    prob += pulp.lpSum(x) == 15
-    prob += pulp.lpSum(opt_df["now_cost"][i] * x[i] for i in range(n)) <= total_budget_raw
-
-    for pos, mn, mx in [("GK",2,2),("DEF",5,5),("MID",5,5),("FWD",3,3)]:
-        idx = opt_df[opt_df["position"] == pos].index.tolist()
-        prob += pulp.lpSum(x[i] for i in idx) >= mn
-        prob += pulp.lpSum(x[i] for i in idx) <= mx
-
-    for club in opt_df["team"].unique():
-        idx = opt_df[opt_df["team"] == club].index.tolist()
-        prob += pulp.lpSum(x[i] for i in idx) <= 3
-
-    cheap_gk = opt_df[(opt_df["now_cost"] <= 40) & (opt_df["position"] == "GK")].index.tolist()
-    if cheap_gk:
-        prob += pulp.lpSum(x[i] for i in cheap_gk) >= 1
-
-    if req.locked_players:
-        locked_idx = opt_df[opt_df["web_name"].isin(req.locked_players)].index.tolist()
-        for i in locked_idx:
-            prob += x[i] == 1
-            prob += s[i] == 0
-            prob += t[i] == 0
-
-    for i in range(n):
-        ic = opt_df["in_current"][i]
-        prob += t[i] >= x[i] - ic
-        prob += t[i] <= x[i]
-        prob += t[i] <= 1 - ic
-        prob += s[i] >= ic - x[i]
-        prob += s[i] <= ic
-        prob += s[i] <= 1 - x[i]
-
-    prob += pulp.lpSum(t) == pulp.lpSum(s)
-    prob += h >= pulp.lpSum(t) - req.free_transfers
-    prob.solve(pulp.PULP_CBC_CMD(msg=0))
-
-    new_squad     = opt_df[[x[i].value() == 1 for i in range(n)]].copy()
-    transfers_in  = new_squad[new_squad["in_current"] == 0]
-    out_ids       = [pid for pid in squad_ids if pid not in new_squad["player_id"].values]
-    transfers_out = df[df["player_id"].isin(out_ids)]
-    n_in          = len(transfers_in)
-    hits_taken    = max(0, n_in - req.free_transfers)
-    pts_gain      = float(transfers_in["predicted_pts"].sum() - transfers_out["predicted_pts"].sum())
-    cols          = ["player_id", "web_name", "team_name", "position", "price", "predicted_pts"]
-
-    new_sorted        = new_squad.sort_values("predicted_pts", ascending=False)
-    captain_name      = new_sorted.iloc[0]["web_name"]
-    vice_captain_name = new_sorted.iloc[1]["web_name"]
+    pts                  = per_gw_points(opt_df, fixtures, gws)
+    locked               = opt_df["web_name"].isin(req.locked_players).to_numpy() if req.locked_players else None
+    free_tf              = req.free_transfers if req.free_transfers is not None else squad_data["free_transfers"]
+
+    t0 = time.perf_counter()
+    try:
+        plan = plan_transfers(opt_df, pts, total_budget_raw, free_tf, req.hit_cost,
+                              req.window, MAX_FREE_TRANSFERS, req.decay, locked)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    solve_ms = (time.perf_counter() - t0) * 1000
+
+    cols     = ["player_id", "web_name", "team_name", "position", "price"]
+    position = opt_df["position"].to_numpy()
+    prev     = opt_df["in_current"].to_numpy() == 1
+    steps    = []
+    for g, gw in enumerate(gws):
+        squad     = plan["squads"][g]
+        gw_pts    = pts[:, g]
+        lineup    = pick_lineup(position, gw_pts, squad)        # that gameweek's XI and armband
+        ins       = opt_df[squad & ~prev].assign(predicted_pts=gw_pts[squad & ~prev].round(2))
+        outs      = opt_df[prev & ~squad].assign(predicted_pts=gw_pts[prev & ~squad].round(2))
+        steps.append({
+            "gameweek":         gw,
+            "free_transfers":   plan["free_transfers"][g],
+            "transfers_made":   plan["transfers"][g],
+            "hits_taken":       plan["hits"][g],
+            "points_hit":       plan["hits"][g] * req.hit_cost,
+            "predicted_points": round(float(gw_pts[lineup.starter].sum()), 2),
+            "captain":          opt_df["web_name"].iloc[lineup.captain],
+            "vice_captain":     opt_df["web_name"].iloc[lineup.vice],
+            "starters":         opt_df.loc[lineup.starter, "web_name"].tolist(),
+            "transfers_in":     ins[cols + ["predicted_pts"]].to_dict(orient="records"),
+            "transfers_out":    outs[cols + ["predicted_pts"]].to_dict(orient="records"),
+            "bank":             round((total_budget_raw - opt_df.loc[squad, "now_cost"].sum()) / 10, 1),
+        })
+        prev = squad
 
+    total_hits = sum(plan["hits"])
     return {
-        "transfers_made":  n_in,
-        "hits_taken":      hits_taken,
-        "points_hit":      hits_taken * req.hit_cost,
-        "net_pts_gain":    round(pts_gain - hits_taken * req.hit_cost, 2),
-        "captain":         captain_name,
-        "vice_captain":    vice_captain_name,
-        "transfers_in":    transfers_in[cols].to_dict(orient="records"),
-        "transfers_out":   transfers_out[cols].to_dict(orient="records"),
-        "new_squad":       new_squad[cols + ["in_current"]].to_dict(orient="records"),
-        "gameweek":        squad_data["gameweek"],
-        "itb":             round(float(squad_data["itb"]), 1),
+        "gameweeks":        gws,
+        "window":           min(req.window, len(gws)),
+        "plan":             steps,
+        "total_transfers":  sum(plan["transfers"]),
+        "total_hits":       total_hits,
+        "predicted_points": round(sum(s["predicted_points"] for s in steps) - total_hits * req.hit_cost, 2),
+        "candidates":       plan["candidates"],
+        "timings_ms":       {"solve": round(solve_ms, 2), "windows": [round(t, 2) for t in plan["steps"]]},
     }
 
 
 # ── FPL News & Fixtures & PL Table ────────────────────────────────────────────
 
 @app.get("/api/fpl/news")
-def fpl_news(limit: int = 10):
+async def fpl_news(request: Request, limit: int = 10):
     """Build a news feed from FPL player injury/news strings."""
-    BASE_URL = "https://fantasy.premierleague.com/api"
     try:
-        r        = requests.get(f"{BASE_URL}/bootstrap-static/", timeout=10).json()
-        elements = pd.DataFrame(r["elements"])
+        r, bver = await bootstrap.get_versioned()
     except Exception as e:
         raise HTTPException(500, f"Could not fetch FPL news: {e}")
+    return responses.respond(request, "news", bver, {"limit": limit},
+                             lambda: _news_payload(r, limit))
 
+
+def _news_payload(r: dict, limit: int) -> list:
+    elements = pd.DataFrame(r["elements"])
     news_df = elements.loc[elements["news"].fillna("").str.len() > 0,
         ["id", "web_name", "news", "news_added", "status"]].copy()
     if news_df.empty:
@@ -582,35 +1079,47 @@ def fpl_news(limit: int = 10):
 
 
 @app.get("/api/fpl/fixtures")
-def fpl_fixtures(event: Optional[int] = None):
+async def fpl_fixtures(request: Request, event: Optional[int] = None):
     """Return fixtures for the current (or given) gameweek."""
-    BASE_URL = "https://fantasy.premierleague.com/api"
     try:
-        boot  = requests.get(f"{BASE_URL}/bootstrap-static/", timeout=10).json()
-        teams = pd.DataFrame(boot["teams"])
-        evts  = pd.DataFrame(boot["events"])
+        boot, bver = await bootstrap.get_versioned()
     except Exception as e:
         raise HTTPException(500, f"Could not fetch bootstrap data: {e}")
-
-    gw = event
-    if gw is None:
-        cur = evts[evts["is_current"] == True]
-        gw  = int(cur["id"].iloc[0]) if len(cur) else int(evts[evts["finished"]==True]["id"].max())
-
     try:
-        fixtures = requests.get(f"{BASE_URL}/fixtures/?event={gw}", timeout=10).json()
+        # the shared, revalidated copy of all fixtures rather than a per-GW fetch
+        fixtures, fver = await fixtures_cache.get_versioned()
     except Exception as e:
         raise HTTPException(500, f"Could not fetch fixtures: {e}")
+    return responses.respond(request, "fixtures", f"b{bver}.f{fver}",
+                             {"event": event}, lambda: _fixtures_payload(boot, fixtures, event))
 
-    name_map  = teams.set_index("id")["name"].to_dict()
-    short_map = teams.set_index("id")["short_name"].to_dict()
-    COLOR_MAP = {
-        "ARS":"#EF0107","AVL":"#670E36","BOU":"#DA291C","BRE":"#E30613",
-        "BHA":"#0057B8","CHE":"#034694","CRY":"#1B458F","EVE":"#003399",
-        "FUL":"#000000","LIV":"#C8102E","MCI":"#6CABDD","MUN":"#DA291C",
-        "NEW":"#241F20","NFO":"#DD0000","SOU":"#D71920","TOT":"#132257",
-        "WHU":"#7A263A","WOL":"#FDB913",
-    }
+
+def _fixtures_payload(boot: dict, all_fixtures: list, event: Optional[int]) -> list:
+    gw = event if event is not None else _current_event(boot)
+    return _fixture_items(boot, [fx for fx in all_fixtures if fx.get("event") == gw])
+
+
+def _current_event(boot: dict) -> Optional[int]:
+    """The current gameweek, else the last finished one."""
+    events = boot["events"]
+    cur    = [e["id"] for e in events if e.get("is_current")]
+    done   = [e["id"] for e in events if e.get("finished")]
+    return int(cur[0]) if cur else (int(max(done)) if done else None)
+
+
+TEAM_COLORS = {
+    "ARS":"#EF0107","AVL":"#670E36","BOU":"#DA291C","BRE":"#E30613",
+    "BHA":"#0057B8","CHE":"#034694","CRY":"#1B458F","EVE":"#003399",
+    "FUL":"#000000","LIV":"#C8102E","MCI":"#6CABDD","MUN":"#DA291C",
+    "NEW":"#241F20","NFO":"#DD0000","SOU":"#D71920","TOT":"#132257",
+    "WHU":"#7A263A","WOL":"#FDB913",
+}
+
+
+def _fixture_items(boot: dict, fixtures: list) -> list:
+    """Score-strip rows for /api/fpl/fixtures and the live stream."""
+    name_map  = {t["id"]: t["name"]       for t in boot["teams"]}
+    short_map = {t["id"]: t["short_name"] for t in boot["teams"]}
 
     items = []
     for fx in fixtures:
@@ -621,96 +1130,60 @@ def fpl_fixtures(event: Optional[int] = None):
         finished = bool(fx.get("finished"))
         live     = started and not finished
         upcoming = not started
-        min_lbl  = "FT" if finished else ""
+        min_lbl  = "FT" if finished else f"{fx['minutes']}'" if live and fx.get("minutes") else ""
         if upcoming and fx.get("kickoff_time"):
-            try: min_lbl = pd.to_datetime(fx["kickoff_time"]).strftime("%H:%M")
-            except: min_lbl = ""
+            try: min_lbl = datetime.fromisoformat(fx["kickoff_time"]).strftime("%H:%M")
+            except ValueError: min_lbl = ""
         items.append({
             "id": fx["id"], "h": name_map.get(hid, hs), "hs": hs,
-            "hc": COLOR_MAP.get(hs, "#111827"), "hg": fx.get("team_h_score"),
-            "a":  name_map.get(aid, as_),        "as_": as_,
-            "ac": COLOR_MAP.get(as_, "#111827"), "ag": fx.get("team_a_score"),
+            "hc": TEAM_COLORS.get(hs, "#111827"), "hg": fx.get("team_h_score"),
+            "a":  name_map.get(aid, as_),          "as_": as_,
+            "ac": TEAM_COLORS.get(as_, "#111827"), "ag": fx.get("team_a_score"),
             "min": min_lbl, "live": live, "upcoming": upcoming,
         })
     return items
 
 
-@app.get("/api/pl/table")
-def pl_table():
+@app.get("/api/fpl/fixtures/stream")
+async def fpl_fixtures_stream(request: Request):
     """
-    Build the real Premier League table by computing W/D/L/GD/Pts
-    from every finished FPL fixture. This is the only reliable way —
-    the FPL teams endpoint win/draw/loss fields are not real league stats.
+    Server-sent events for the current gameweek: a `snapshot` of its fixtures,
+    then an `update` with only the fixtures whose score, minute or status moved.
     """
-    BASE_URL = "https://fantasy.premierleague.com/api"
-    try:
-        boot     = requests.get(f"{BASE_URL}/bootstrap-static/", timeout=10).json()
-        fixtures = requests.get(f"{BASE_URL}/fixtures/",         timeout=10).json()
-        teams_df = pd.DataFrame(boot["teams"])
-    except Exception as e:
-        raise HTTPException(500, f"Could not fetch FPL data: {e}")
+    last = request.headers.get("last-event-id")
+    return StreamingResponse(
+        live_fixtures.stream(int(last) if last and last.isdigit() else None),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    # id → display name mapping
-    name_map = {
-        "Arsenal":       "Arsenal",       "Aston Villa":  "Aston Villa",
-        "Bournemouth":   "Bournemouth",   "Brentford":    "Brentford",
-        "Brighton":      "Brighton",      "Chelsea":      "Chelsea",
-        "Crystal Palace":"Crystal Palace","Everton":      "Everton",
-        "Fulham":        "Fulham",        "Ipswich":      "Ipswich",
-        "Leicester":     "Leicester",     "Liverpool":    "Liverpool",
-        "Man City":      "Man City",      "Man Utd":      "Man United",
-        "Newcastle":     "Newcastle",     "Nott'm Forest":"Nottm Forest",
-        "Southampton":   "Southampton",   "Spurs":        "Tottenham",
-        "West Ham":      "West Ham",      "Wolves":       "Wolves",
-    }
-    id_to_name = {
-        int(row["id"]): name_map.get(str(row["name"]), str(row["name"]))
-        for _, row in teams_df.iterrows()
-    }
 
-    # Initialise table
-    table = {
-        tid: {"name": id_to_name.get(tid, str(tid)),
-              "played": 0, "win": 0, "draw": 0, "loss": 0,
-              "gf": 0, "ga": 0, "gd": 0, "points": 0}
-        for tid in id_to_name
-    }
+async def _poll_fixtures() -> list:
+    fixtures_cache.invalidate()         # conditional GET: a 304 while nothing has moved
+    return await fixtures_cache.get()
 
-    # Process every finished fixture
-    for fx in fixtures:
-        if not fx.get("finished"):
-            continue
-        h_id = fx.get("team_h")
-        a_id = fx.get("team_a")
-        hg   = fx.get("team_h_score")
-        ag   = fx.get("team_a_score")
-        if h_id not in table or a_id not in table:
-            continue
-        if hg is None or ag is None:
-            continue
-        hg, ag = int(hg), int(ag)
-
-        for tid, gf, ga in [(h_id, hg, ag), (a_id, ag, hg)]:
-            t = table[tid]
-            t["played"] += 1
-            t["gf"]     += gf
-            t["ga"]     += ga
-            t["gd"]     += gf - ga
-            if gf > ga:
-                t["win"]    += 1
-                t["points"] += 3
-            elif gf == ga:
-                t["draw"]   += 1
-                t["points"] += 1
-            else:
-                t["loss"]   += 1
 
-    # Sort: pts desc, gd desc, gf desc
-    ranked = sorted(
-        table.values(),
-        key=lambda x: (-x["points"], -x["gd"], -x["gf"])
-    )
-    for i, row in enumerate(ranked):
-        row["position"] = i + 1
+async def _render_live(fixtures: list) -> tuple:
+    boot = await get_bootstrap()
+    gw   = _current_event(boot)
+    return gw, _fixture_items(boot, [fx for fx in fixtures if fx.get("event") == gw])
+
 
-    return ranked
\ No newline at end of file
+@app.get("/api/pl/table")
+async def pl_table(request: Request, gw: Optional[int] = None):
+    """
+    The real Premier League table, computed from finished FPL fixtures (the
+    FPL teams endpoint win/draw/loss fields are not real league stats).
+    With `gw`, the table as it stood after that gameweek.
+    """
+    if gw is not None and gw < 1:
+        raise HTTPException(400, "gw must be a gameweek number (1 or later)")
+    try:
+        (boot, bver), (fixtures, fver) = await asyncio.gather(
+            bootstrap.get_versioned(), fixtures_cache.get_versioned(),
+        )
+    except Exception as e:
+        raise HTTPException(500, f"Could not fetch FPL data: {e}")
+    # applies only fixtures that finished or changed since the last sync
+    standings.sync(boot["teams"], fixtures, (bver, fver))
+    return responses.respond(request, "table", standings.version, {"gw": gw}, lambda: standings.table(gw))
\ No newline at end of file
@@ -0,0 +1,264 @@
+"""
+Request metrics, timing spans and per-request profiles.
+
+Slow /api/transfers/optimize calls could not be pinned on the upstream
+calls, the pandas work, the PuLP model build, the CBC solve or JSON
+encoding. This module measures each of them:
+
+  - span(name) times a block. Every span feeds a latency histogram
+    (fpl_span_seconds{span=...}), and its `.ms` is what the routes report in
+    their timings_ms. Spans cover upstream fetches, cache refreshes,
+    response-cache hits and builds, ILP build/solve/parse and serialisation
+  - MetricsMiddleware records every request in
+    fpl_http_request_duration_seconds{route, method, status}, labelled by
+    route template, not the raw path
+  - register(collector) adds counters and gauges read at scrape time (cache
+    hits, reloads, subscribers ...), so they cost nothing per request
+  - /metrics renders all of it in the Prometheus text format
+  - ?profile=1 on any route records that request's spans. They come back in
+    a Server-Timing header, and JSON object bodies also get a "profile" key
+
+FPL_METRICS=0 turns histograms and profiles off; spans still time their
+blocks for timings_ms.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Iterable, Optional
+from urllib.parse import parse_qs
+
+METRICS_ENABLED = os.environ.get("FPL_METRICS", "1") != "0"
+BUCKETS         = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# ── Histograms ─────────────────────────────────────────────────────────────────
+class Histogram:
+    """Cumulative-bucket latency histogram, one series per label tuple."""
+
+    def __init__(self, name: str, help: str, labels: tuple, buckets: tuple = BUCKETS):
+        self.name    = name
+        self.help    = help
+        self.labels  = labels
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}      # labels -> [count per bucket..., +Inf, sum]
+        self._lock   = threading.Lock()
+
+    def observe(self, labels: tuple, seconds: float) -> None:
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i]  += 1
+            series[-1] += seconds
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for labels, counts in sorted(series.items()):
+            base  = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, labels))
+            sep   = "," if base else ""
+            total = 0
+            for le, n in zip((*self.buckets, "+Inf"), counts):
+                total += n
+                yield f'{self.name}_bucket{{{base}{sep}le="{le}"}} {total}'
+            yield f"{self.name}_sum{{{base}}} {counts[-1]:.6f}"
+            yield f"{self.name}_count{{{base}}} {total}"
+
+    def snapshot(self) -> dict:
+        """{labels: (count, sum seconds)}, for tests and /api/health."""
+        with self._lock:
+            return {k: (sum(v[:-1]), v[-1]) for k, v in self._series.items()}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUESTS = Histogram("fpl_http_request_duration_seconds", "Request latency by route template.",
+                     ("route", "method", "status"))
+SPANS    = Histogram("fpl_span_seconds", "Time spent in instrumented blocks.", ("span",))
+
+# collector() -> [(name, type, help, {labels} or None, value)]
+_collectors: list[Callable[[], list]] = []
+
+
+def register(collector: Callable[[], list]) -> None:
+    """Add counters/gauges computed at scrape time."""
+    _collectors.append(collector)
+
+
+def render() -> str:
+    lines = [*REQUESTS.render(), *SPANS.render()]
+    seen  = set()
+    for collect in _collectors:
+        try:
+            samples = collect()
+        except Exception:
+            continue                    # a broken collector must not break the scrape
+        for name, kind, help, labels, value in samples:
+            if value is None:
+                continue
+            if name not in seen:
+                seen.add(name)
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            tags = ",".join(f'{k}="{_escape(v)}"' for k, v in (labels or {}).items())
+            lines.append(f"{name}{{{tags}}} {float(value):g}" if tags else f"{name} {float(value):g}")
+    return "\n".join(lines) + "\n"
+
+
+# ── Spans and profiles ─────────────────────────────────────────────────────────
+class Trace:
+    """Spans recorded during one ?profile=1 request."""
+
+    __slots__ = ("t0", "spans")
+
+    def __init__(self):
+        self.t0    = time.perf_counter()
+        self.spans = []                 # (name, start ms, ms, depth)
+
+    def summary(self, total_ms: float) -> dict:
+        by_name: dict[str, float] = {}
+        for name, _, ms, depth in self.spans:
+            by_name[name] = by_name.get(name, 0.0) + ms
+        return {
+            "total_ms": round(total_ms, 3),
+            "spans":    [{"name": n, "start_ms": round(s, 3), "ms": round(ms, 3), "depth": d}
+                         for n, s, ms, d in self.spans],
+            "by_name":  {k: round(v, 3) for k, v in by_name.items()},
+        }
+
+    def server_timing(self, total_ms: float) -> str:
+        parts = [f"{re.sub(r'[^A-Za-z0-9_.-]', '_', n)};dur={ms:.3f}"
+                 for n, ms in self.summary(total_ms)["by_name"].items()]
+        return ", ".join(parts + [f"total;dur={total_ms:.3f}"])
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar("fpl_trace", default=None)
+_depth: ContextVar[int]             = ContextVar("fpl_span_depth", default=0)   # per task, so gathers nest right
+
+
+class span:
+    """Time a block: `with span("ilp.solve") as s: ...; s.ms`."""
+
+    __slots__ = ("name", "t0", "ms", "trace", "depth", "token")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.ms   = 0.0
+
+    def __enter__(self) -> "span":
+        self.trace = _trace.get() if METRICS_ENABLED else None
+        if self.trace is not None:
+            self.depth = _depth.get()
+            self.token = _depth.set(self.depth + 1)
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        t1      = time.perf_counter()
+        self.ms = (t1 - self.t0) * 1000
+        if METRICS_ENABLED:
+            SPANS.observe((self.name,), t1 - self.t0)
+            if self.trace is not None:
+                _depth.reset(self.token)
+                self.trace.spans.append((self.name, (self.t0 - self.trace.t0) * 1000, self.ms, self.depth))
+
+
+def record(name: str, ms: float) -> None:
+    """A span measured elsewhere (a worker process, a solver's own timer)."""
+    if METRICS_ENABLED:
+        SPANS.observe((name,), ms / 1000)
+        trace = _trace.get()
+        if trace is not None:
+            start = (time.perf_counter() - trace.t0) * 1000 - ms
+            trace.spans.append((name, start, ms, _depth.get()))
+
+
+# ── ASGI middleware ────────────────────────────────────────────────────────────
+class MetricsMiddleware:
+    """Request histogram for every call; span breakdown for ?profile=1."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            return await self.app(scope, receive, send)
+
+        t0     = time.perf_counter()
+        status = 500
+        query  = scope.get("query_string", b"")
+        trace  = Trace() if b"profile=" in query and parse_qs(query.decode()).get("profile") == ["1"] else None
+
+        async def send_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            if trace is None:
+                await self.app(scope, receive, send_status)
+            else:
+                token = _trace.set(trace)
+                try:
+                    await self._profiled(scope, receive, send_status, trace, t0)
+                finally:
+                    _trace.reset(token)
+        finally:
+            route = scope.get("route")
+            REQUESTS.observe((getattr(route, "path", "unmatched"), scope["method"], str(status)),
+                             time.perf_counter() - t0)
+
+    async def _profiled(self, scope, receive, send, trace: Trace, t0: float):
+        """Hold back a JSON body to add the profile; stream anything else as is."""
+        start, chunks, passthrough = None, [], False
+
+        async def capture(message):
+            nonlocal start, passthrough
+            if passthrough:
+                return await send(message)
+            if message["type"] == "http.response.start":
+                start   = message
+                headers = dict(message.get("headers", []))
+                if not headers.get(b"content-type", b"").startswith(b"application/json"):
+                    passthrough = True
+                    await send(self._with_timing(start, trace, t0))
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                await self._finish(send, start, b"".join(chunks), trace, t0)
+
+        await self.app(scope, receive, capture)
+
+    async def _finish(self, send, start: dict, body: bytes, trace: Trace, t0: float):
+        total = (time.perf_counter() - t0) * 1000
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            payload = None
+        drop = {b"content-length"}
+        if isinstance(payload, dict):
+            payload["profile"] = trace.summary(total)
+            body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+            drop.add(b"etag")                    # the body no longer matches it
+        start = self._with_timing(start, trace, t0, total)
+        start["headers"] = [(k, v) for k, v in start["headers"] if k not in drop] + \
+                           [(b"content-length", str(len(body)).encode())]
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    def _with_timing(start: dict, trace: Trace, t0: float, total: Optional[float] = None) -> dict:
+        total   = (time.perf_counter() - t0) * 1000 if total is None else total
+        headers = list(start.get("headers", [])) + [(b"server-timing", trace.server_timing(total).encode())]
+        return {**start, "headers": headers}
@@ -0,0 +1,322 @@
+"""
+Local stand-in for the FPL API, built from the CSVs bundled in Data/data/.
+
+Serves the endpoints the backend calls (bootstrap-static, fixtures, entry,
+picks, element-summary) with ETag / 304 support, so the backend can be
+exercised without touching fantasy.premierleague.com:
+
+    python mock_fpl.py --port 8001
+    FPL_API_BASE=http://127.0.0.1:8001 uvicorn main:app --port 8000
+
+serve_in_thread() starts the same server inside the current process for
+scripts that need one.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pandas as pd
+
+ROOT_DIR = Path(os.environ.get("FPL_ROOT", str(Path(__file__).resolve().parent.parent.parent)))
+DATA_DIR = Path(os.environ.get("FPL_DATA_DIR", str(ROOT_DIR / "Data" / "data")))
+
+TEAMS = [
+    ("Arsenal", "ARS"), ("Aston Villa", "AVL"), ("Burnley", "BUR"), ("Bournemouth", "BOU"),
+    ("Brentford", "BRE"), ("Brighton", "BHA"), ("Chelsea", "CHE"), ("Crystal Palace", "CRY"),
+    ("Everton", "EVE"), ("Fulham", "FUL"), ("Leeds", "LEE"), ("Liverpool", "LIV"),
+    ("Man City", "MCI"), ("Man Utd", "MUN"), ("Newcastle", "NEW"), ("Nott'm Forest", "NFO"),
+    ("Sunderland", "SUN"), ("Spurs", "TOT"), ("West Ham", "WHU"), ("Wolves", "WOL"),
+]
+N_EVENTS = 38
+
+
+# ── Payload construction ───────────────────────────────────────────────────────
+def _played_fixtures(history: pd.DataFrame) -> list[dict]:
+    """
+    Rebuild finished fixtures from per-player history rows. opponent_team is
+    always right even for players who have since changed club, so the home
+    side is read off the away rows and vice versa.
+    """
+    rows = history.dropna(subset=["team_h_score", "team_a_score"])
+    home = rows[~rows["was_home"]].groupby("fixture")["opponent_team"].agg(lambda s: s.mode().iloc[0])
+    away = rows[rows["was_home"]].groupby("fixture")["opponent_team"].agg(lambda s: s.mode().iloc[0])
+    meta = rows.drop_duplicates("fixture").set_index("fixture")
+    out  = []
+    for fid in home.index.intersection(away.index):
+        r = meta.loc[fid]
+        out.append({
+            "id":            int(fid),
+            "event":         int(r["round"]),
+            "team_h":        int(home[fid]),
+            "team_a":        int(away[fid]),
+            "team_h_score":  int(r["team_h_score"]),
+            "team_a_score":  int(r["team_a_score"]),
+            "kickoff_time":  r["kickoff_time"],
+            "started":       True,
+            "finished":      True,
+            "minutes":       90,
+            "team_h_difficulty": 3,
+            "team_a_difficulty": 3,
+        })
+    return out
+
+
+def _future_fixtures(first_event: int, first_id: int) -> list[dict]:
+    """Round-robin schedule (circle method) for the rounds not yet played."""
+    ids  = list(range(1, len(TEAMS) + 1))
+    out  = []
+    fid  = first_id
+    for gw in range(first_event, N_EVENTS + 1):
+        k    = gw % (len(ids) - 1)
+        rot  = [ids[0]] + ids[1:][k:] + ids[1:][:k]
+        half = len(rot) // 2
+        for h, a in zip(rot[:half], reversed(rot[half:])):
+            if gw % 2:
+                h, a = a, h
+            out.append({
+                "id":            fid,
+                "event":         gw,
+                "team_h":        h,
+                "team_a":        a,
+                "team_h_score":  None,
+                "team_a_score":  None,
+                "kickoff_time":  f"2026-{1 + (gw - 1) % 12:02d}-15T15:00:00Z",
+                "started":       False,
+                "finished":      False,
+                "minutes":       0,
+                "team_h_difficulty": 2 + (a % 4),
+                "team_a_difficulty": 2 + (h % 4),
+            })
+            fid += 1
+    return out
+
+
+def build_payloads(data_dir: Path = DATA_DIR) -> dict:
+    preds   = pd.read_csv(data_dir / "player_predictions.csv")
+    history = pd.read_csv(data_dir / "fpl_gameweek_history.csv")
+    current = int(history["round"].max())
+    totals  = history.groupby("player_id")[["total_points", "minutes", "expected_goal_involvements"]].sum()
+
+    elements = []
+    for r in preds.itertuples():
+        tot = totals.loc[r.player_id] if r.player_id in totals.index else None
+        elements.append({
+            "id":                         int(r.player_id),
+            "web_name":                   r.web_name,
+            "element_type":               int(r.element_type),
+            "team":                       int(r.team),
+            "now_cost":                   int(r.now_cost),
+            "status":                     "a",
+            "news":                       "",
+            "news_added":                 None,
+            "points_per_game":            f"{r.avg_pts_last5:.1f}",
+            "total_points":               int(tot["total_points"]) if tot is not None else 0,
+            "minutes":                    int(tot["minutes"]) if tot is not None else 0,
+            "expected_goal_involvements": f"{tot['expected_goal_involvements'] if tot is not None else 0:.2f}",
+        })
+
+    teams = [
+        {"id": i, "name": name, "short_name": short, "strength": 3}
+        for i, (name, short) in enumerate(TEAMS, start=1)
+    ]
+    events = [
+        {"id": gw, "is_current": gw == current, "is_next": gw == current + 1, "finished": gw <= current}
+        for gw in range(1, N_EVENTS + 1)
+    ]
+
+    played   = _played_fixtures(history)
+    fixtures = played + _future_fixtures(current + 1, max(f["id"] for f in played) + 1)
+
+    squad = pd.read_csv(data_dir / "transfer_squad.csv")["player_id"].tolist()
+    picks = [{"element": int(pid), "position": i + 1} for i, pid in enumerate(squad)]
+
+    summaries = {
+        int(pid): grp.drop(columns=["player_id"]).to_dict(orient="records")
+        for pid, grp in history.groupby("player_id")
+    }
+
+    return {
+        "bootstrap": {"elements": elements, "teams": teams, "events": events},
+        "fixtures":  fixtures,
+        "current":   current,
+        "picks":     picks,
+        "summaries": summaries,
+    }
+
+
+# ── HTTP server ────────────────────────────────────────────────────────────────
+def revise_history(server: ThreadingHTTPServer, player_id: int, points_delta: int = 1) -> None:
+    """
+    Simulate an FPL stats correction on a running stub: bump the player's last
+    history row and season total and flag the row `modified`.
+    """
+    handler  = server.RequestHandlerClass
+    payloads = handler.payloads
+    rows     = payloads["summaries"][player_id]
+    rows[-1]["total_points"] += points_delta
+    rows[-1]["modified"]      = True
+    for el in payloads["bootstrap"]["elements"]:
+        if el["id"] == player_id:
+            el["total_points"] += points_delta
+    handler._encoded.clear()
+
+
+def add_round(server: ThreadingHTTPServer, player_id: int, minutes: int = 0) -> int:
+    """
+    Finish the next gameweek on a running stub and give one player a row for
+    it (0 minutes and 0 points by default); bootstrap totals stay unchanged
+    for a benched player. Returns the gameweek.
+    """
+    handler  = server.RequestHandlerClass
+    payloads = handler.payloads
+    events   = payloads["bootstrap"]["events"]
+    gw       = max(e["id"] for e in events if e["finished"]) + 1
+    for e in events:
+        e["finished"], e["is_current"], e["is_next"] = e["id"] <= gw, e["id"] == gw, e["id"] == gw + 1
+    rows = payloads["summaries"][player_id]
+    row  = {**rows[-1], "round": gw, "fixture": max(f["id"] for f in payloads["fixtures"]) + 1,
+            "minutes": minutes, "total_points": 0, "modified": False}
+    rows.append(row)
+    handler._encoded.clear()
+    return gw
+
+
+def set_status(server: ThreadingHTTPServer, player_id: int, status: str, news: str = "") -> None:
+    """Change a player's availability on a running stub (injury, suspension, ...)."""
+    handler = server.RequestHandlerClass
+    for el in handler.payloads["bootstrap"]["elements"]:
+        if el["id"] == player_id:
+            el["status"] = status
+            el["news"]   = news
+    handler._encoded.clear()
+
+
+def set_fixture(server: ThreadingHTTPServer, fixture_id: int, **fields) -> None:
+    """Update a fixture on a running stub (kick-off, goals, minutes, full time)."""
+    handler = server.RequestHandlerClass
+    for fx in handler.payloads["fixtures"]:
+        if fx["id"] == fixture_id:
+            fx.update(fields)
+    handler._encoded.clear()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version        = "HTTP/1.1"   # keep-alive, like the real API
+    disable_nagle_algorithm = True         # headers and body go out as separate writes
+    payloads: dict  = {}
+    _encoded: dict  = {}
+    latency:  float = 0.0                  # seconds added to every response
+    hits:     dict  = {}                   # path -> requests served
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, key: str, obj) -> None:
+        body, etag = self._encoded.get(key) or (None, None)
+        if body is None:
+            body = json.dumps(obj).encode()
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            self._encoded[key] = (body, etag)
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        p    = self.payloads
+        path = self.path.split("?", 1)[0].rstrip("/")
+        qs   = self.path.split("?", 1)[1] if "?" in self.path else ""
+        self.hits[path] = self.hits.get(path, 0) + 1
+
+        if path == "/bootstrap-static":
+            return self._json(path, p["bootstrap"])
+        if path == "/fixtures":
+            m = re.search(r"event=(\d+)", qs)
+            if m:
+                gw = int(m.group(1))
+                return self._json(f"{path}?{gw}", [f for f in p["fixtures"] if f["event"] == gw])
+            return self._json(path, p["fixtures"])
+        m = re.fullmatch(r"/entry/(\d+)", path)
+        if m:
+            return self._json(path, {
+                "id":                           int(m.group(1)),
+                "current_event":                p["current"],
+                "last_deadline_bank":           5,
+                "last_deadline_free_transfers": 1,
+            })
+        m = re.fullmatch(r"/entry/(\d+)/event/(\d+)/picks", path)
+        if m:
+            if int(m.group(2)) > p["current"]:
+                return self._json("/not-found", {"detail": "Not found."})
+            return self._json("/picks", {"picks": p["picks"]})
+        m = re.fullmatch(r"/element-summary/(\d+)", path)
+        if m:
+            return self._json(path, {"history": p["summaries"].get(int(m.group(1)), [])})
+
+        self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 1024     # the stdlib default of 5 stalls bursts of connects
+
+    def handle_error(self, request, client_address):
+        pass                      # clients hanging up mid-response (cancelled fetches)
+
+
+def make_server(
+    host:     str   = "127.0.0.1",
+    port:     int   = 0,
+    data_dir: Path  = DATA_DIR,
+    latency:  float = 0.0,
+) -> ThreadingHTTPServer:
+    handler = type("Handler", (_Handler,), {
+        "payloads": build_payloads(data_dir),
+        "_encoded": {},
+        "latency":  latency,
+        "hits":     {},
+    })
+    server  = _Server((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve_in_thread(
+    host:    str   = "127.0.0.1",
+    port:    int   = 0,
+    latency: float = 0.0,
+) -> tuple[ThreadingHTTPServer, str]:
+    """Start the stub on a background thread; returns (server, base_url)."""
+    server = make_server(host, port, latency=latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Local FPL API stub")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8001)
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every response")
+    args = ap.parse_args()
+
+    srv = make_server(args.host, args.port, latency=args.latency_ms / 1000)
+    print(f"Mock FPL API at http://{args.host}:{args.port}")
+    srv.serve_forever()
@@ -0,0 +1,140 @@
+"""
+In-memory query index for /api/players.
+
+get_players() used to mask the whole predictions frame by position, price and
+status, sort it by predicted points and take head(limit) on every request.
+PlayerIndex does that work once per prediction snapshot (Snapshot.derive):
+
+  - rows are sorted once by predicted points (ties by player id) and their
+    output dicts built up front
+  - every position x availability bucket holds the ranks of its players in
+    that order, with price, team, minutes and xGI in parallel arrays, so a
+    query is one vectorised scan over a bucket of at most a few hundred
+    players and the first `limit` matches are already in points order
+  - pages continue from a cursor: the (points, player id) of the last row
+    served. It is found again by binary search, and stays valid when a new
+    snapshot reorders the players
+"""
+from __future__ import annotations
+
+import base64
+from typing import NamedTuple, Optional
+
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+POSITIONS = ("GK", "DEF", "MID", "FWD")
+
+# Always return avg_pts_last3 and avg_xgi_last3 (may be approximated)
+OUTPUT_COLUMNS = ["player_id", "web_name", "team_name", "position", "price", "predicted_pts",
+                  "status", "avg_pts_last3", "avg_xgi_last3", "avg_minutes_last3"]
+
+
+def encode_cursor(after: tuple) -> str:
+    points, player_id = after
+    return base64.urlsafe_b64encode(f"{points!r}:{player_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """(points, player id) of the last row served; ValueError if malformed."""
+    try:
+        raw         = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        points, pid = raw.split(":")
+        return float(points), int(pid)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"invalid cursor {cursor!r}") from e
+
+
+class _Bucket(NamedTuple):
+    ranks:   object      # positions in the sorted order, ascending
+    price:   object
+    team:    object
+    minutes: object
+    xgi:     object
+
+
+class PlayerIndex:
+    """Pre-sorted, bucketed view of one predictions frame. Shared: read only."""
+
+    def __init__(self, df: pd.DataFrame):
+        order = np.lexsort((df["player_id"].to_numpy(), -df["predicted_pts"].to_numpy()))
+        df    = df.iloc[order]
+        cols  = [c for c in OUTPUT_COLUMNS if c in df.columns]
+
+        self.rows    = df[cols].fillna(0).to_dict(orient="records")
+        self._points = df["predicted_pts"].to_numpy(dtype=float)
+        self._ids    = df["player_id"].to_numpy(dtype=np.int64)
+        self._neg    = -self._points                          # ascending, for searchsorted
+        self._teams  = {}                                     # lower-cased id / name -> team id
+        for tid, name in zip(df["team"].tolist(), df.get("team_name", df["team"]).tolist()):
+            self._teams[str(tid)] = self._teams[str(name).lower()] = int(tid)
+
+        price     = df["price"].to_numpy(dtype=float)
+        team      = df["team"].to_numpy(dtype=np.int64)
+        minutes   = self._column(df, "avg_minutes_last3")
+        xgi       = self._column(df, "avg_xgi_last3")
+        position  = df["position"].to_numpy(dtype=object)
+        available = (df["status"] == "a").to_numpy()
+
+        self._buckets: dict[tuple, _Bucket] = {}
+        for pos in (None, *POSITIONS):
+            in_pos = np.ones(len(df), dtype=bool) if pos is None else position == pos
+            for only_available in (False, True):
+                ranks = np.flatnonzero(in_pos & available if only_available else in_pos)
+                self._buckets[(pos, only_available)] = _Bucket(
+                    ranks, price[ranks], team[ranks], minutes[ranks], xgi[ranks])
+
+    @staticmethod
+    def _column(df: pd.DataFrame, col: str):
+        if col not in df.columns:
+            return np.full(len(df), np.nan)
+        return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+
+    def team_id(self, team: str) -> Optional[int]:
+        """Team id from an id or a club name (any case); None if unknown."""
+        return self._teams.get(str(team).strip().lower())
+
+    def query(
+        self,
+        position:       Optional[str]   = None,
+        max_price:      float           = 15.0,
+        only_available: bool            = True,
+        limit:          int             = 50,
+        team:           Optional[int]   = None,
+        min_minutes:    Optional[float] = None,
+        min_xgi:        Optional[float] = None,
+        after:          Optional[tuple] = None,
+    ) -> tuple[list[dict], Optional[tuple]]:
+        """
+        Matching rows in points order, at most `limit`, starting after the
+        cursor key `after`. Returns (rows, key of the last row or None when
+        there are no more).
+        """
+        bucket = self._buckets.get((position, only_available))
+        if bucket is None or limit <= 0:
+            return [], None
+        start = 0 if after is None else int(np.searchsorted(bucket.ranks, self._rank_after(after)))
+
+        mask = bucket.price[start:] <= max_price
+        if team is not None:
+            mask &= bucket.team[start:] == team
+        if min_minutes is not None:
+            mask &= bucket.minutes[start:] >= min_minutes
+        if min_xgi is not None:
+            mask &= bucket.xgi[start:] >= min_xgi
+        hits  = np.flatnonzero(mask)
+        ranks = bucket.ranks[start + hits[:limit]].tolist()
+        rows  = [self.rows[r] for r in ranks]
+        if len(hits) <= limit:
+            return rows, None
+        last = ranks[-1]
+        return rows, (float(self._points[last]), int(self._ids[last]))
+
+    def _rank_after(self, after: tuple) -> int:
+        """Rank of the first row that sorts after (points, player id)."""
+        points, player_id = after
+        lo = int(np.searchsorted(self._neg, -points, side="left"))
+        hi = int(np.searchsorted(self._neg, -points, side="right"))
+        return lo + int(np.searchsorted(self._ids[lo:hi], player_id, side="right"))
@@ -0,0 +1,189 @@
+"""
+Versioned, hot-reloadable snapshot of the player predictions.
+
+get_predictions() used to load player_predictions.csv into a module global
+once per process, so new notebook output or a status change needed a restart,
+and every route copied the whole frame before touching it. Instead:
+
+  - the watched files (predictions CSV/Arrow, model pickle) are stat'ed at
+    most every FPL_PREDICTIONS_POLL seconds; a changed (mtime, size)
+    signature or a new bootstrap version (statuses, team names) triggers a
+    reload
+  - a reload builds a complete new Snapshot and swaps it in with a single
+    assignment; requests already holding the old one finish on it, and a
+    failed reload (say, a half-written file) keeps the old one serving
+  - the version is a hash of the snapshot's contents, so touching a file
+    without changing it keeps the version and everything keyed on it
+  - Snapshot.derive() memoises frames computed from the snapshot (the
+    available pool, the pruned pool); they are dropped along with it
+
+Snapshots are shared and must not be modified. A snapshot's frame sits on
+read-only NumPy arrays (read_only()), so an in-place write cannot reach
+other requests. Under pandas 3 (copy-on-write) the write copies the column;
+under 2.x it raises. Filtering always gives a route its own frame, so routes
+need no .copy() of the whole snapshot.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from bootstrap_cache import BootstrapCache
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+PREDICTIONS_POLL = float(os.environ.get("FPL_PREDICTIONS_POLL", "2"))
+
+
+def read_only(frame: pd.DataFrame) -> pd.DataFrame:
+    """frame over read-only copies of its NumPy columns; extension columns are kept as they are."""
+    cols = {}
+    for col in frame.columns:
+        s = frame[col]
+        if isinstance(s.dtype, np.dtype):
+            values = s.to_numpy(copy=True)
+            values.flags.writeable = False
+            cols[col] = values
+        else:
+            cols[col] = s.array
+    return pd.DataFrame(cols, index=frame.index, copy=False)
+
+
+def frame_version(df: pd.DataFrame) -> str:
+    """Content hash of a frame (values and column names)."""
+    h = hashlib.sha1(",".join(map(str, df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()[:12]
+
+
+def file_signature(paths: list[Path]) -> tuple:
+    sig = []
+    for p in paths:
+        try:
+            st = os.stat(p)
+        except OSError:
+            continue
+        sig.append((str(p), st.st_mtime_ns, st.st_size))
+    return tuple(sig)
+
+
+class Snapshot:
+    """One immutable version of the predictions frame."""
+
+    def __init__(self, frame: pd.DataFrame, source: str, signature: tuple, bootstrap_version: int,
+                 derived: Optional[dict] = None):
+        self.frame             = read_only(frame)
+        self.version           = frame_version(frame)
+        self.source            = source
+        self.signature         = signature
+        self.bootstrap_version = bootstrap_version
+        self.loaded_at         = time.time()
+        self._derived          = {} if derived is None else derived
+        self._lock             = threading.Lock()
+
+    def derive(self, key, fn: Callable[[pd.DataFrame], object]):
+        """fn(frame), computed once per snapshot and key."""
+        with self._lock:
+            if key in self._derived:
+                return self._derived[key]
+        value = fn(self.frame)
+        with self._lock:
+            return self._derived.setdefault(key, value)
+
+    def info(self) -> dict:
+        return {
+            "version":           self.version,
+            "source":            self.source,
+            "rows":              len(self.frame),
+            "loaded_at":         self.loaded_at,
+            "bootstrap_version": self.bootstrap_version,
+            "files":             [{"path": p, "mtime_ns": m, "size": s} for p, m, s in self.signature],
+        }
+
+
+class PredictionStore:
+    """Holds the current Snapshot and reloads it when its inputs change."""
+
+    def __init__(
+        self,
+        loader:    Callable[[], Awaitable[tuple[pd.DataFrame, str]]],
+        paths:     Callable[[], list[Path]],
+        bootstrap: Optional[BootstrapCache] = None,
+        poll:      float = PREDICTIONS_POLL,
+    ):
+        self.loader    = loader
+        self.paths     = paths
+        self.bootstrap = bootstrap
+        self.poll      = poll
+
+        self._snapshot: Optional[Snapshot] = None
+        self._checked  = float("-inf")
+        self._lock:    Optional[asyncio.Lock] = None
+
+        self.reloads = 0   # snapshots built, including the first
+        self.errors  = 0   # reloads that failed while an older snapshot kept serving
+
+    def current(self) -> Optional[Snapshot]:
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        """Re-check the inputs on the next get(), ignoring the poll interval."""
+        self._checked = float("-inf")
+
+    async def get(self) -> Snapshot:
+        snap = self._snapshot
+        now  = time.monotonic()
+        if snap is not None and now - self._checked < self.poll:
+            return snap
+        self._checked = now
+
+        if self.bootstrap is not None and snap is not None:
+            try:
+                await self.bootstrap.get()     # may start a background revalidation
+            except Exception:
+                pass
+        if snap is not None and not self._stale(snap):
+            return snap
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:                 # single-flight reload
+            snap = self._snapshot
+            if snap is not None and not self._stale(snap):
+                return snap
+            signature = file_signature(self.paths())
+            try:
+                frame, source = await self.loader()
+            except Exception:
+                if snap is None:
+                    raise
+                self.errors += 1
+                return snap
+            bver = self.bootstrap.version if self.bootstrap is not None else 0
+            new  = Snapshot(frame, source, signature, bver)
+            if snap is not None and new.version == snap.version:
+                new._derived = snap._derived   # same contents: keep the derived pools
+            self._snapshot = new
+            self.reloads  += 1
+            return new
+
+    def _stale(self, snap: Snapshot) -> bool:
+        if file_signature(self.paths()) != snap.signature:
+            return True
+        return self.bootstrap is not None and self.bootstrap.version != snap.bootstrap_version
+
+    def stats(self) -> dict:
+        snap = self._snapshot
+        return {
+            **(snap.info() if snap is not None else {"version": None}),
+            "reloads":      self.reloads,
+            "errors":       self.errors,
+            "poll_seconds": self.poll,
+        }
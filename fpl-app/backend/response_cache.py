@@ -0,0 +1,179 @@
+"""
+Serialized-response cache for the read-heavy GET routes.
+
+/api/players, /api/model/insights, /api/fpl/fixtures, /api/fpl/news and
+/api/pl/table used to rebuild their payload (pandas filtering, sorting,
+to_dict, JSON encoding) on every hit, although their inputs change a few
+times a day. Instead each route names the version of the data it reads
+(prediction snapshot, model, bootstrap, fixtures) and its normalised query
+parameters; the cache keeps the encoded JSON bytes for that key:
+
+  - a hit returns the stored bytes without touching pandas or the encoder
+  - every response carries a strong ETag (a hash of the bytes) and
+    Cache-Control: no-cache, so clients revalidate and a matching
+    If-None-Match is answered 304 with no body, hit or miss
+  - entries are evicted least-recently-used beyond FPL_RESPONSE_CACHE_ENTRIES
+    entries or FPL_RESPONSE_CACHE_MB of bodies; when a route's version
+    changes, its entries for older versions are dropped at once
+  - hits, misses, 304s and evictions are counted (see /api/health)
+
+FPL_RESPONSE_CACHE=0 turns caching off (ETags and 304s still work).
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from metrics import record, span
+
+RESPONSE_CACHE_ENABLED = os.environ.get("FPL_RESPONSE_CACHE", "1") != "0"
+RESPONSE_CACHE_ENTRIES = int(os.environ.get("FPL_RESPONSE_CACHE_ENTRIES", "512"))
+RESPONSE_CACHE_BYTES   = int(float(os.environ.get("FPL_RESPONSE_CACHE_MB", "64")) * 2**20)
+
+
+class _Cached(NamedTuple):
+    body:    bytes
+    etag:    str
+    headers: tuple = ()     # extra (name, value) pairs stored with the body
+
+
+class Page(NamedTuple):
+    """A payload plus response headers to cache with it (e.g. a next-page cursor)."""
+    payload: object
+    headers: dict
+
+
+def encode(payload) -> bytes:
+    """JSON bytes exactly as FastAPI's default JSONResponse would send them."""
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False, allow_nan=False,
+                      indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def normalize(params: dict) -> str:
+    """Canonical form of the query parameters: sorted, defaults included."""
+    return json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 asks for GET)."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+class ResponseCache:
+    """LRU of encoded responses keyed on (route, data version, params)."""
+
+    def __init__(
+        self,
+        max_entries: int  = RESPONSE_CACHE_ENTRIES,
+        max_bytes:   int  = RESPONSE_CACHE_BYTES,
+        enabled:     bool = RESPONSE_CACHE_ENABLED,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes   = max_bytes
+        self.enabled     = enabled
+
+        self._entries: "OrderedDict[tuple, _Cached]" = OrderedDict()
+        self._latest:  dict[str, str] = {}     # route -> newest version seen
+        self._bytes    = 0
+        self._lock     = threading.Lock()      # sync routes run in the thread pool
+
+        self.hits         = 0
+        self.misses       = 0
+        self.not_modified = 0
+        self.evictions    = 0
+
+    def respond(
+        self,
+        request: Request,
+        route:   str,
+        version: str,
+        params:  dict,
+        build:   Callable[[], object],
+    ) -> Response:
+        """
+        The cached response for the key, building and storing it on a miss.
+        `build` returns the payload, or a Page to cache headers along with it.
+        """
+        t0     = time.perf_counter()
+        key    = (route, str(version), normalize(params))
+        cached = self._get(key)
+        record(f"cache.{'miss' if cached is None else 'hit'} {route}", (time.perf_counter() - t0) * 1000)
+        if cached is None:
+            with span(f"build {route}"):
+                built = build()
+            with span("serialize"):
+                extra  = tuple(built.headers.items()) if isinstance(built, Page) else ()
+                body   = encode(built.payload if isinstance(built, Page) else built)
+                cached = _Cached(body, '"' + hashlib.sha1(body).hexdigest()[:20] + '"', extra)
+            self._put(key, cached)
+
+        headers = {"ETag": cached.etag, "Cache-Control": "no-cache", **dict(cached.headers)}
+        if etag_matches(request.headers.get("if-none-match"), cached.etag):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(cached.body, media_type="application/json", headers=headers)
+
+    def _get(self, key: tuple) -> Optional[_Cached]:
+        with self._lock:
+            cached = self._entries.get(key) if self.enabled else None
+            if cached is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached
+
+    def _put(self, key: tuple, cached: _Cached) -> None:
+        size = len(cached.body)
+        if not self.enabled or size > self.max_bytes:
+            return
+        route, version, _ = key
+        with self._lock:
+            if self._latest.get(route) != version:
+                # a new version of the route's data: its older entries are dead
+                for old in [k for k in self._entries if k[0] == route and k[1] != version]:
+                    self._drop(old)
+                self._latest[route] = version
+            if key in self._entries:
+                self._drop(key, evicted=False)
+            self._entries[key] = cached
+            self._bytes       += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: tuple, evicted: bool = True) -> None:
+        self._bytes -= len(self._entries.pop(key).body)
+        self.evictions += evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._latest.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled":      self.enabled,
+                "entries":      len(self._entries),
+                "bytes":        self._bytes,
+                "max_entries":  self.max_entries,
+                "max_bytes":    self.max_bytes,
+                "hits":         self.hits,
+                "misses":       self.misses,
+                "hit_rate":     round(self.hits / lookups, 3) if lookups else None,
+                "not_modified": self.not_modified,
+                "evictions":    self.evictions,
+            }
@@ -0,0 +1,260 @@
+"""
+Monte Carlo squad evaluation for /api/squad/simulate.
+
+predicted_pts is one number per player, so a steady 5-pointer and a
+haul-or-blank 5-pointer look the same to the optimisers. This turns the
+model's predictions into joint scenarios:
+
+  - ResidualPool holds the model's error (total_points - prediction) on
+    every past (player, round) of fpl_gameweek_history.csv in which the
+    player played. It is built from the training rows (backtest.model_frame)
+    once per model, history and fixtures version
+  - a player plays with their play rate over the last RECENT_ROUNDS rounds,
+    capped by FPL's chance_of_playing_next_round when it is set. A
+    season-long rate would still count an injury that is long over
+  - sample() draws one past round per (scenario, club). Every player of the
+    club who played that round takes its residual, so teammates move
+    together (a clean sheet, a thrashing). The others get one of their own
+    played rows at random, or one of their position's if they have fewer
+    than MIN_SAMPLES. A player who plays scores prediction / play rate plus
+    the residual, centred on its pool. The prediction already averages over
+    missed games, so each player's mean stays the model's
+  - evaluate() scores a squad over every scenario at once. Bench players
+    come on in bench order under the formation rule. The captain scores
+    double, or the vice-captain if the captain did not play. It also gives
+    the squad total with each starter as captain
+
+All of it is (scenarios x players) array work. The residuals are in-sample
+for the served model, so the spread is a little narrower than it would be
+out of sample. A double gameweek's prediction gets one residual draw.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from backtest import model_frame
+from features import SOURCES, add_rolling_features
+from inference import FEATURES
+from lazy import lazy_import
+from prediction_store import file_signature
+from storage import HISTORY_CSV, HISTORY_DATASET, read_history
+
+np = lazy_import("numpy")
+
+N_SCENARIOS   = int(os.environ.get("FPL_SIM_SCENARIOS", "10000"))
+MAX_SCENARIOS = 200_000
+MIN_SAMPLES   = 5          # played rows a player needs before their residuals are drawn alone
+RECENT_ROUNDS = int(os.environ.get("FPL_SIM_RECENT_ROUNDS", "6"))     # rounds behind the play rate
+MIN_POINTS    = -3.0       # floor for a player's points (a red card and an own goal)
+MIN_RATE      = 0.25       # play rate floor when scaling a prediction up to "if he plays"
+PERCENTILES   = (5, 10, 25, 50, 75, 90, 95)
+POSITIONS     = ("GK", "DEF", "MID", "FWD")
+FORMATION_MIN = {"GK": 1, "DEF": 3, "MID": 2, "FWD": 1}    # FPL's rule for the XI after autosubs
+XI            = 11
+
+
+# ── Residuals ──────────────────────────────────────────────────────────────────
+class ResidualPool:
+    """Model residuals per (player, round) played, flat per-player and per-position pools, and play rates."""
+
+    def __init__(self, frame, predicted):
+        ids     = frame["player_id"].to_numpy(dtype=np.int64)
+        rnd     = frame["round"].to_numpy(dtype=np.int64)
+        self.ids    = np.unique(ids)
+        self.rounds = np.unique(rnd)
+        if not len(self.rounds):
+            raise ValueError("No gameweek history to draw residuals from.")
+        p, r  = np.searchsorted(self.ids, ids), np.searchsorted(self.rounds, rnd)
+        shape = (len(self.ids), len(self.rounds))
+
+        # a double gameweek's rows add up, like its prediction
+        self.residual = np.zeros(shape, dtype=np.float32)
+        minutes       = np.zeros(shape)
+        rows          = np.zeros(shape, dtype=np.int64)
+        np.add.at(self.residual, (p, r), frame["total_points"].to_numpy(dtype=float) - predicted)
+        np.add.at(minutes, (p, r), frame["minutes"].to_numpy(dtype=float))
+        np.add.at(rows, (p, r), 1)
+        self.played = minutes > 0
+
+        recent         = rows[:, -RECENT_ROUNDS:] > 0
+        seen           = recent.sum(axis=1)
+        self.play_rate = np.where(seen > 0, (self.played[:, -RECENT_ROUNDS:] & recent).sum(axis=1)
+                                  / np.maximum(seen, 1), 0.0)
+
+        # flat pools of played cells: every player's own, then every position's
+        pos            = np.full(len(self.ids), -1)
+        pos[p]         = frame["position"].map({k: i for i, k in enumerate(POSITIONS)}).fillna(-1).to_numpy()
+        cells          = np.flatnonzero(self.played.ravel())                # grouped by player
+        by_pos         = cells[np.argsort(pos[cells // shape[1]], kind="stable")]
+        by_pos         = by_pos[pos[by_pos // shape[1]] >= 0]
+        self._res      = self.residual.ravel()[np.concatenate([cells, by_pos])]
+        own            = self.played.sum(axis=1)
+        self._own_size = own
+        self._own_off  = np.cumsum(own) - own
+        self._own_mean = np.bincount(cells // shape[1], weights=self.residual.ravel()[cells],
+                                     minlength=len(self.ids)) / np.maximum(own, 1)
+        pos_size       = np.bincount(pos[by_pos // shape[1]], minlength=len(POSITIONS))
+        self._pos_size = pos_size
+        self._pos_off  = len(cells) + np.cumsum(pos_size) - pos_size
+        self._pos_mean = np.bincount(pos[by_pos // shape[1]], weights=self.residual.ravel()[by_pos],
+                                     minlength=len(POSITIONS)) / np.maximum(pos_size, 1)
+        self._pos_rate = np.array([self.play_rate[pos == i].mean() if (pos == i).any() else 0.0
+                                   for i in range(len(POSITIONS))])
+
+    def _rows(self, player_ids):
+        """Each player's row in the arrays, -1 for players without history."""
+        at = np.minimum(np.searchsorted(self.ids, player_ids), len(self.ids) - 1)
+        return np.where(self.ids[at] == player_ids, at, -1)
+
+    def _pools(self, rows, pos) -> tuple:
+        """(offset, size, mean residual) of the pool each player draws from."""
+        safe = np.maximum(rows, 0)
+        own  = (rows >= 0) & (self._own_size[safe] >= MIN_SAMPLES)
+        size = np.where(own, self._own_size[safe], self._pos_size[pos])
+        if (size == 0).any():
+            raise ValueError("No history rows for a player's position.")
+        return (np.where(own, self._own_off[safe], self._pos_off[pos]), size,
+                np.where(own, self._own_mean[safe], self._pos_mean[pos]))
+
+    def availability(self, player_ids, positions, chance=None):
+        """Probability each player plays: recent play rate, capped by chance_of_playing (0-100, NaN: unset)."""
+        rows = self._rows(np.asarray(player_ids, dtype=np.int64))
+        pos  = np.array([POSITIONS.index(p) for p in positions])
+        rate = np.where(rows >= 0, self.play_rate[np.maximum(rows, 0)], self._pos_rate[pos])
+        if chance is not None:
+            chance = np.array([np.nan if c is None else c for c in chance], dtype=float) / 100
+            rate   = np.where(np.isnan(chance), rate, np.minimum(rate, chance))
+        return rate
+
+    def sample(self, predicted, player_ids, teams, positions, fixtures, n: int, rng, chance=None) -> tuple:
+        """(points, played), both (n, players): one joint scenario per row."""
+        player_ids  = np.asarray(player_ids, dtype=np.int64)
+        rows        = self._rows(player_ids)
+        safe        = np.maximum(rows, 0)
+        pos         = np.array([POSITIONS.index(p) for p in positions])
+        clubs, club = np.unique(teams, return_inverse=True)
+        block       = rng.integers(0, len(self.rounds), size=(n, len(clubs)))[:, club]
+        hit         = self.played[safe, block] & (rows >= 0)
+
+        off, size, mean = self._pools(rows, pos)
+        pick     = off + np.minimum((rng.random((n, len(rows))) * size).astype(np.int64), size - 1)
+        residual = np.where(hit, self.residual[safe, block], self._res[pick]) - mean.astype(np.float32)
+        rate     = self.availability(player_ids, positions, chance) * (np.asarray(fixtures) > 0)
+        played   = rng.random((n, len(rows))) < rate
+        if_plays = (np.asarray(predicted) / np.maximum(rate, MIN_RATE)).astype(np.float32)
+        points   = np.where(played, np.maximum(if_plays + residual, MIN_POINTS), 0)
+        return points.astype(np.float32), played
+
+
+# ── Squad ──────────────────────────────────────────────────────────────────────
+def evaluate(points, played, positions, captain: int, vice: int) -> dict:
+    """
+    Squad points in every scenario. Columns 0..10 of points/played are the
+    XI, the rest the bench in autosub order. captain and vice are column
+    indices in the XI.
+
+    Returns {"total", "subbed", "captaincy"}:
+      total      (n,)       points after autosubs and the armband
+      subbed     (n, 15)    bench players who came on
+      captaincy  (n, 11)    total with each starter as captain (vice unchanged)
+    """
+    n, m    = points.shape
+    pos     = np.array([POSITIONS.index(p) for p in positions])
+    minimum = np.array([FORMATION_MIN[p] for p in POSITIONS])
+    counts  = np.tile(np.bincount(pos[:XI], minlength=len(POSITIONS)), (n, 1))
+    out     = ~played[:, :XI]                               # starters still to be replaced
+    subbed  = np.zeros((n, m), dtype=bool)
+    for b in range(XI, m):
+        same = (pos[:XI] == 0) == (pos[b] == 0)             # keepers only swap with keepers
+        keep = (pos[:XI] == pos[b]) | (counts[:, pos[:XI]] > minimum[pos[:XI]])
+        ok   = out & same & keep & played[:, [b]]
+        s    = np.flatnonzero(ok.any(axis=1))
+        j    = ok[s].argmax(axis=1)                         # first starter in XI order
+        out[s, j]          = False
+        counts[s, pos[j]] -= 1
+        counts[s, pos[b]] += 1
+        subbed[s, b]       = True
+
+    base      = points[:, :XI].sum(axis=1) + (points * subbed).sum(axis=1)
+    armband   = lambda c, v: np.where(played[:, c], points[:, c], np.where(played[:, v], points[:, v], 0))
+    captaincy = np.column_stack([armband(c, captain if c == vice else vice) for c in range(XI)])
+    return {"total": base + armband(captain, vice), "subbed": subbed, "captaincy": base[:, None] + captaincy}
+
+
+def percentiles(values, axis: int = 0) -> dict:
+    qs = np.percentile(values, PERCENTILES, axis=axis)
+    return {f"p{q}": np.round(v, 2).tolist() for q, v in zip(PERCENTILES, qs)}
+
+
+def simulate(pool: ResidualPool, predicted, player_ids, teams, positions, fixtures,
+             captain: int, vice: int, n: int = N_SCENARIOS, seed: Optional[int] = None,
+             chance=None) -> dict:
+    """
+    Sample n scenarios for a 15-man squad (XI first, then the bench in order)
+    and summarise them. Squads simulated with the same seed see the same club
+    rounds, so they compare on common scenarios.
+    """
+    seed = int(np.random.default_rng().integers(2**31)) if seed is None else seed
+    rng  = np.random.default_rng(seed)
+    t0   = time.perf_counter()
+    points, played = pool.sample(predicted, player_ids, np.asarray(teams), positions, fixtures, n, rng, chance)
+    t1   = time.perf_counter()
+    res  = evaluate(points, played, positions, captain, vice)
+    t2   = time.perf_counter()
+
+    total = res["total"]
+    out   = {
+        "scenarios":      n,
+        "seed":           seed,
+        "mean":           round(float(total.mean()), 2),
+        "std":            round(float(total.std()), 2),
+        "percentiles":    percentiles(total),
+        "captain_played": round(float(played[:, captain].mean()), 3),
+        "vice_used":      round(float((~played[:, captain] & played[:, vice]).mean()), 3),
+        "autosubs":       {"mean": round(float(res["subbed"].sum(axis=1).mean()), 2),
+                           "any":  round(float(res["subbed"].any(axis=1).mean()), 3)},
+        "players": {
+            "mean":        np.round(points.mean(axis=0), 2).tolist(),
+            "played":      np.round(played.mean(axis=0), 3).tolist(),
+            "subbed_in":   np.round(res["subbed"].mean(axis=0), 3).tolist(),
+            **percentiles(points),
+        },
+        "captaincy": {"mean": np.round(res["captaincy"].mean(axis=0), 2).tolist(),
+                      **percentiles(res["captaincy"])},
+    }
+    out["timings_ms"] = {
+        "sample":    round((t1 - t0) * 1000, 2),
+        "evaluate":  round((t2 - t1) * 1000, 2),
+        "summarise": round((time.perf_counter() - t2) * 1000, 2),
+    }
+    return out
+
+
+# ── Cache ──────────────────────────────────────────────────────────────────────
+class Simulator:
+    """The ResidualPool for the current model, history and fixtures; rebuilt when any changes."""
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+        self._key: Optional[tuple] = None
+        self._pool: Optional[ResidualPool] = None
+        self._lock   = threading.Lock()
+        self.builds  = 0
+
+    def pool(self, model, model_ver: str, elements: list, fixtures: list, data_ver: str) -> ResidualPool:
+        sig = file_signature([self.data_dir / HISTORY_CSV, self.data_dir / HISTORY_DATASET])
+        key = (model_ver, sig, data_ver)
+        with self._lock:
+            if key != self._key:
+                cols  = ["player_id", "round", "fixture", "was_home", "value", "team_h_score", *SOURCES]
+                hist  = read_history(self.data_dir, columns=list(dict.fromkeys(cols)))
+                frame = model_frame(add_rolling_features(hist), fixtures, elements).dropna(subset=FEATURES)
+                frame = frame[frame["team_h_score"].notna()]        # not kicked off yet: no result to learn from
+                self._pool = ResidualPool(frame, model.predict(frame[FEATURES].to_numpy(dtype=float)))
+                self._key  = key
+                self.builds += 1
+            return self._pool
@@ -0,0 +1,256 @@
+"""
+Prebuilt, reusable squad ILP for /api/squad/optimize.
+
+Building the PuLP problem (≈800 binaries plus position, club and budget
+rows) used to dominate request latency. A SquadModel is built once per player
+pool and cached under the pool's version hash; each request only swaps in the
+objective coefficients and the budget right-hand side, then solves with CBC
+warm-started from the previous incumbent.
+
+The starting XI is picked in-process (pick_starting_xi) instead of by a
+second CBC run: with a fixed 2/5/5/3 squad the formation bounds reduce to
+"best GK, 3 DEF, 3 MID, 1 FWD, then the best 3 remaining outfielders".
+
+That two-phase answer picks the squad on the sum of all 15 and only then the
+XI and the armband, so a squad is never bought for its captain. A lineup
+model (lineup=True, add_lineup) also carries starter s, captain c and vice v
+binaries and maximises
+
+    Σ pts · ((1 - BENCH_WEIGHT)·s + BENCH_WEIGHT·x + c + VICE_WEIGHT·v)
+
+in the same solve: the XI counts in full, the captain twice, a bench player
+at BENCH_WEIGHT (autosubs) and the vice at VICE_WEIGHT (the captain not
+playing). The armband can only go to a starter.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from lazy import available, lazy_import
+from metrics import span
+
+np      = lazy_import("numpy")
+pd      = lazy_import("pandas")
+pulp    = lazy_import("pulp")
+PULP_OK = available("pulp")
+
+SQUAD_QUOTAS = {"GK": 2, "DEF": 5, "MID": 5, "FWD": 3}
+XI_MINIMUMS  = {"GK": 1, "DEF": 3, "MID": 3, "FWD": 1}
+MAX_PER_CLUB = 3
+CHEAP_GK_MAX = 40
+MODEL_CACHE_SIZE = 4
+BENCH_WEIGHT = float(os.environ.get("FPL_BENCH_WEIGHT", "0.1"))   # a bench point, relative to a starter's
+VICE_WEIGHT  = float(os.environ.get("FPL_VICE_WEIGHT",  "0.1"))   # the vice's armband, relative to the captain's
+
+_POOL_COLUMNS = ["player_id", "position", "team", "now_cost"]
+
+
+def pool_version(df: pd.DataFrame) -> str:
+    """Hash of the columns that shape the model (everything but the objective)."""
+    h = pd.util.hash_pandas_object(df[_POOL_COLUMNS], index=False).values
+    return hashlib.sha1(h.tobytes()).hexdigest()[:16]
+
+
+def pick_starting_xi(position: np.ndarray, pts: np.ndarray) -> np.ndarray:
+    """Boolean mask of the best valid XI within a 15-man squad."""
+    order   = np.argsort(-pts, kind="stable")
+    starter = np.zeros(len(pts), dtype=bool)
+    for pos, mn in XI_MINIMUMS.items():
+        starter[[i for i in order if position[i] == pos][:mn]] = True
+    rest = [i for i in order if not starter[i] and position[i] != "GK"]
+    starter[rest[:11 - int(starter.sum())]] = True
+    return starter
+
+
+class Lineup(NamedTuple):
+    """A squad with its XI and armband, as masks and rows of the candidate pool."""
+    selected: np.ndarray
+    starter:  np.ndarray
+    captain:  int
+    vice:     int
+
+
+def pick_lineup(position: np.ndarray, pts: np.ndarray, selected: np.ndarray) -> Lineup:
+    """The two-phase lineup for a chosen squad: best XI, then its top two as captain and vice."""
+    idx     = np.flatnonzero(selected)
+    starter = np.zeros(len(pts), dtype=bool)
+    starter[idx[pick_starting_xi(position[idx], pts[idx])]] = True
+    first   = np.flatnonzero(starter)[np.argsort(-pts[starter], kind="stable")]
+    return Lineup(np.asarray(selected, dtype=bool), starter, int(first[0]), int(first[1]))
+
+
+def lineup_value(pts: np.ndarray, lineup: Lineup) -> float:
+    """The lineup objective (module docstring) of a lineup."""
+    value  = (1 - BENCH_WEIGHT) * pts[lineup.starter].sum() + BENCH_WEIGHT * pts[lineup.selected].sum()
+    return float(value + pts[lineup.captain] + VICE_WEIGHT * pts[lineup.vice])
+
+
+def add_lineup(prob, x: list, position: np.ndarray, tag: str = "") -> tuple[list, list, list]:
+    """
+    Starter, captain and vice binaries over squad binaries x, with their XI
+    and armband rows. tag suffixes every name, for several lineups in one model.
+    """
+    n = len(x)
+    s = [pulp.LpVariable(f"s{i}{tag}", cat="Binary") for i in range(n)]
+    c = [pulp.LpVariable(f"c{i}{tag}", cat="Binary") for i in range(n)]
+    v = [pulp.LpVariable(f"v{i}{tag}", cat="Binary") for i in range(n)]
+
+    prob += pulp.LpAffineExpression([(t, 1) for t in s]) == 11, f"xi_size{tag}"
+    prob += pulp.LpAffineExpression([(t, 1) for t in c]) == 1, f"captain{tag}"
+    prob += pulp.LpAffineExpression([(t, 1) for t in v]) == 1, f"vice{tag}"
+    for pos, mn in XI_MINIMUMS.items():
+        row = pulp.LpAffineExpression([(s[i], 1) for i in np.flatnonzero(position == pos)])
+        prob += (row == mn if pos == "GK" else row >= mn), f"xi_{pos}{tag}"
+    for i in range(n):
+        prob += s[i] - x[i] <= 0, f"start_{i}{tag}"
+        prob += c[i] + v[i] - s[i] <= 0, f"armband_{i}{tag}"
+    return s, c, v
+
+
+def lineup_objective(x: list, s: list, c: list, v: list, pts: np.ndarray) -> pulp.LpAffineExpression:
+    """lineup_value() as an expression over the model's binaries."""
+    return pulp.LpAffineExpression(
+        list(zip(s, (1 - BENCH_WEIGHT) * pts)) + list(zip(x, BENCH_WEIGHT * pts))
+        + list(zip(c, pts)) + list(zip(v, VICE_WEIGHT * pts))
+    )
+
+
+def read_lineup(x: list, s: list, c: list, v: list) -> Lineup:
+    """Lineup from solved binaries."""
+    on = lambda vs: np.array([(t.value() or 0) > 0.5 for t in vs])
+    return Lineup(on(x), on(s), int(np.argmax(on(c))), int(np.argmax(on(v))))
+
+
+def set_start(x: list, s: list, c: list, v: list, lineup: Lineup) -> None:
+    """Initial values for a CBC warm start."""
+    for vs, mask in ((x, lineup.selected), (s, lineup.starter)):
+        for t, val in zip(vs, mask):
+            t.setInitialValue(int(val))
+    for vs, row in ((c, lineup.captain), (v, lineup.vice)):
+        for i, t in enumerate(vs):
+            t.setInitialValue(int(i == row))
+
+
+class SquadModel:
+    """
+    Phase-1 squad ILP over a fixed player pool; with lineup=True, squad, XI
+    and armband in one model (solve_lineup).
+    """
+
+    def __init__(self, df: pd.DataFrame, max_per_club: int = MAX_PER_CLUB, version: Optional[str] = None,
+                 lineup: bool = False):
+        if not PULP_OK:
+            raise RuntimeError("pulp not installed. Run: pip install pulp")
+
+        t0 = time.perf_counter()
+        self.version = version or pool_version(df)
+        position     = df["position"].to_numpy()
+        team         = df["team"].to_numpy()
+        cost         = df["now_cost"].to_numpy(dtype=float)
+        n            = len(df)
+
+        prob = pulp.LpProblem("FPL_Squad", pulp.LpMaximize)
+        x    = [pulp.LpVariable(f"x{i}", cat="Binary") for i in range(n)]
+
+        prob += pulp.LpAffineExpression([(v, 1) for v in x]) == 15, "squad_size"
+        prob += pulp.LpAffineExpression(list(zip(x, cost))) <= 0, "budget"
+
+        for pos, quota in SQUAD_QUOTAS.items():
+            idx = np.flatnonzero(position == pos)
+            prob += pulp.LpAffineExpression([(x[i], 1) for i in idx]) == quota, f"pos_{pos}"
+
+        for club in np.unique(team):
+            idx = np.flatnonzero(team == club)
+            prob += pulp.LpAffineExpression([(x[i], 1) for i in idx]) <= max_per_club, f"club_{club}"
+
+        cheap_gk = np.flatnonzero((cost <= CHEAP_GK_MAX) & (position == "GK"))
+        if len(cheap_gk):
+            prob += pulp.LpAffineExpression([(x[i], 1) for i in cheap_gk]) >= 1, "cheap_gk"
+
+        self.s, self.c, self.v = add_lineup(prob, x, position) if lineup else (None, None, None)
+        self.prob      = prob
+        self.x         = x
+        self.incumbent = None
+        self.last      = None        # last Lineup, warm-starts solve_lineup
+        self.lock      = threading.Lock()
+        self.build_ms  = (time.perf_counter() - t0) * 1000
+
+    def solve(self, pts: np.ndarray, budget_raw: int) -> tuple[np.ndarray, dict]:
+        """Returns (selected mask, {"solve": ms, "parse": ms})."""
+        with self.lock:
+            with span("ilp.squad.solve") as solve:
+                self.prob.setObjective(pulp.LpAffineExpression(list(zip(self.x, pts))))
+                self.prob.constraints["budget"].constant = -budget_raw
+
+                warm = self.incumbent is not None
+                if warm:
+                    for v, val in zip(self.x, self.incumbent):
+                        v.setInitialValue(int(val))
+                self.prob.solve(pulp.PULP_CBC_CMD(msg=0, warmStart=warm))
+
+            if pulp.LpStatus[self.prob.status] != "Optimal":
+                raise ValueError(f"No feasible squad for budget {budget_raw / 10:.1f}m")
+            with span("ilp.squad.parse") as parse:
+                selected       = np.array([(v.value() or 0) > 0.5 for v in self.x])
+                self.incumbent = selected
+
+        return selected, {"solve": solve.ms, "parse": parse.ms}
+
+    def solve_lineup(self, pts: np.ndarray, budget_raw: int, start: Optional[Lineup] = None) -> tuple[Lineup, dict]:
+        """
+        Returns (Lineup, {"solve": ms, "parse": ms}). `start` (e.g. the
+        two-phase answer) warm-starts CBC, else the previous lineup does.
+        """
+        if self.s is None:
+            raise RuntimeError("SquadModel built without lineup=True")
+        with self.lock:
+            with span("ilp.squad.solve") as solve:
+                self.prob.setObjective(lineup_objective(self.x, self.s, self.c, self.v, pts))
+                self.prob.constraints["budget"].constant = -budget_raw
+
+                start = start or self.last
+                if start is not None:
+                    set_start(self.x, self.s, self.c, self.v, start)
+                self.prob.solve(pulp.PULP_CBC_CMD(msg=0, warmStart=start is not None))
+
+            if pulp.LpStatus[self.prob.status] != "Optimal":
+                raise ValueError(f"No feasible squad for budget {budget_raw / 10:.1f}m")
+            with span("ilp.squad.parse") as parse:
+                lineup         = read_lineup(self.x, self.s, self.c, self.v)
+                self.incumbent = lineup.selected
+                self.last      = lineup
+
+        return lineup, {"solve": solve.ms, "parse": parse.ms}
+
+
+_models: "OrderedDict[str, SquadModel]" = OrderedDict()
+_models_lock = threading.Lock()
+
+
+def get_squad_model(
+    df: pd.DataFrame, max_per_club: int = MAX_PER_CLUB, version: Optional[str] = None, lineup: bool = False,
+) -> tuple[SquadModel, bool]:
+    """
+    Cached SquadModel for this pool; returns (model, was_cached). `version`
+    names the pool (e.g. the prediction snapshot it came from) and saves
+    hashing it on every request.
+    """
+    key = f"{version or pool_version(df)}:{max_per_club}:{'lineup' if lineup else 'squad'}"
+    with _models_lock:
+        model = _models.get(key)
+        if model is not None:
+            _models.move_to_end(key)
+            return model, True
+
+    with span("ilp.squad.build"):
+        model = SquadModel(df, max_per_club, version, lineup)
+    with _models_lock:
+        _models[key] = model
+        while len(_models) > MODEL_CACHE_SIZE:
+            _models.popitem(last=False)
+    return model, False
@@ -0,0 +1,285 @@
+"""
+Native branch-and-bound solver for the 15-man squad problem.
+
+Same model as the phase-1 ILP in squad_model.py: exactly 2 GK / 5 DEF /
+5 MID / 3 FWD, at most 3 per club, total cost within budget, and at least one
+GK costing ≤ £4.0m. Because that structure is fixed, an in-process search
+beats spawning CBC:
+
+  1. Dominance pruning — a player is dropped when enough same-position
+     players that are no more expensive and score at least as much come from
+     distinct clubs that one of them can always be swapped in (pruning.py).
+  2. Lagrangian / LP bound — relaxing the budget (multiplier λ) and the club
+     caps (μ per club) leaves one "pick the top-k by p - λ·c - μ[club]"
+     problem per position. Any λ, μ ≥ 0 give a valid upper bound; they are
+     tuned once at the root, where the best choice matches the LP relaxation.
+  3. Exact budget bound — per-position DP tables of "best k players within
+     cost b", which also capture integrality of the budget.
+  4. Depth-first search over candidates sorted by reduced score, so the
+     remaining-position Lagrangian bound at any node is a suffix-sum lookup.
+
+The result is provably optimal; bench/bench_squad_solver.py cross-checks it
+against PuLP/CBC on randomized pools.
+"""
+from __future__ import annotations
+
+from lazy import lazy_import
+from pruning import dominated_mask
+
+np = lazy_import("numpy")
+
+SQUAD_QUOTAS = {"GK": 2, "DEF": 5, "MID": 5, "FWD": 3}
+MAX_PER_CLUB = 3
+CHEAP_GK_MAX = 40
+SQUAD_SIZE   = sum(SQUAD_QUOTAS.values())
+MAX_NODES    = 25_000
+EPS          = 1e-9
+
+
+class InfeasibleSquad(ValueError):
+    pass
+
+
+class SearchLimit(RuntimeError):
+    pass
+
+
+# ── Bounds ─────────────────────────────────────────────────────────────────────
+def _dual_value(lam, mu, pts, cost, club, blocks, needs, budget, cap):
+    """Lagrangian dual with the budget (λ) and club caps (μ) relaxed."""
+    red   = pts - lam * cost - mu[club]
+    total = lam * budget + cap * mu.sum()
+    picks = []
+    for idx, need in zip(blocks, needs):
+        top    = idx[np.argsort(-red[idx], kind="stable")[:need]]
+        total += red[top].sum()
+        picks.append(top)
+    return total, np.concatenate(picks)
+
+
+def _dual_multipliers(pts, cost, club, blocks, needs, budget, cap, n_clubs, iters: int = 80):
+    """
+    (λ, μ) approximately minimising the dual. λ alone is found by ternary
+    search; club multipliers are then added by subgradient steps, which only
+    move when some club is over-subscribed in the relaxed solution. Any
+    λ, μ ≥ 0 gives a valid bound, so an approximate minimum is fine.
+    """
+    mu = np.zeros(n_clubs)
+    hi = float(np.max(pts / np.maximum(cost, 1))) * 2 + EPS
+    lo = 0.0
+    f  = lambda l: _dual_value(l, mu, pts, cost, club, blocks, needs, budget, cap)[0]
+    for _ in range(40):
+        m1, m2 = lo + (hi - lo) / 3, hi - (hi - lo) / 3
+        if f(m1) <= f(m2):
+            hi = m2
+        else:
+            lo = m1
+    lam = (lo + hi) / 2
+
+    best_val, best_lam, best_mu = f(lam), lam, mu.copy()
+    scale = float(np.mean(cost)) ** 2
+    for t in range(iters):
+        val, picks = _dual_value(lam, mu, pts, cost, club, blocks, needs, budget, cap)
+        if val < best_val:
+            best_val, best_lam, best_mu = val, lam, mu.copy()
+        g_mu  = cap - np.bincount(club[picks], minlength=n_clubs)
+        g_lam = budget - cost[picks].sum()
+        if not (g_mu < 0).any() and g_lam >= 0:
+            break
+        step = 1.0 / (1 + t / 4)
+        mu   = np.maximum(0.0, mu - step * g_mu)
+        lam  = max(0.0, lam - step * g_lam / scale)
+    return best_lam, best_mu
+
+
+def _suffix_tables(p: np.ndarray, c: np.ndarray, quota: int, budget: int) -> np.ndarray:
+    """
+    D[i, k, b] = best score picking k of the candidates i.. with total cost ≤ b
+    (club caps ignored). Exact for the budget, so tighter than the LP bound.
+    """
+    n = len(p)
+    D = np.full((n + 1, quota + 1, budget + 1), -np.inf)
+    D[n, 0, :] = 0.0
+    for i in range(n - 1, -1, -1):
+        D[i] = D[i + 1]
+        ci   = int(c[i])
+        if ci > budget:
+            continue
+        for k in range(1, quota + 1):
+            np.maximum(D[i, k, ci:], D[i + 1, k - 1, :budget + 1 - ci] + p[i], out=D[i, k, ci:])
+    return D
+
+
+def _max_plus(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    out[r] = max over x ≤ r of a[x] + b[r - x]. Both inputs are
+    non-decreasing step functions, so only the x where a steps up matter.
+    """
+    out   = np.full(len(a), -np.inf)
+    steps = np.flatnonzero(np.isfinite(a) & (a > np.concatenate([[-np.inf], a[:-1]])))
+    for x in steps:
+        np.maximum(out[x:], a[x] + b[:len(a) - x], out=out[x:])
+    return out
+
+
+def _split_max(a: np.ndarray, b: np.ndarray, r: int) -> float:
+    """max over x ≤ r of a[x] + b[r - x], for a single r."""
+    return float(np.max(a[:r + 1] + b[r::-1]))
+
+
+# ── Search ─────────────────────────────────────────────────────────────────────
+def solve_squad(
+    pts:          np.ndarray,
+    cost:         np.ndarray,
+    position:     np.ndarray,
+    team:         np.ndarray,
+    budget:       int,
+    max_per_club: int  = MAX_PER_CLUB,
+    cheap_gk_max: int  = CHEAP_GK_MAX,
+    prune:        bool = True,
+    max_nodes:    int  = MAX_NODES,
+) -> tuple[np.ndarray, dict]:
+    """
+    Optimal squad as a boolean mask over the input rows, plus search stats.
+    Costs and budget are in tenths of a million (now_cost units).
+    Raises InfeasibleSquad when no squad satisfies the constraints (a
+    negative budget included), and
+    SearchLimit if proving optimality would take more than max_nodes nodes
+    (callers fall back to CBC).
+
+    Goalkeeper pairs are enumerated up front (there are few once dominated
+    keepers are gone, and it makes the cheap-GK rule exact); the outfield is
+    searched block by block (DEF, MID, FWD) with two bounds at every node:
+    the Lagrangian bound (budget and club caps relaxed) in O(1) via suffix
+    sums, then the exact budget-knapsack bound from the suffix tables.
+    """
+    pts      = np.asarray(pts,  dtype=float)
+    cost     = np.asarray(cost, dtype=int)
+    position = np.asarray(position)
+    team     = np.asarray(team)
+    budget   = int(budget)
+    if budget < 0:
+        raise InfeasibleSquad(f"No squad fits a budget of {budget / 10:.1f}m.")
+
+    alive = ~dominated_mask(pts, cost, position, team, SQUAD_QUOTAS, max_per_club) if prune \
+        else np.ones(len(pts), dtype=bool)
+    clubs = np.unique(team, return_inverse=True)[1]
+    stats = {"nodes": 0, "candidates": int(alive.sum()), "pruned": int((~alive).sum())}
+
+    outfield = ["DEF", "MID", "FWD"]
+    needs    = [SQUAD_QUOTAS[pos] for pos in outfield]
+    blocks   = [np.flatnonzero(alive & (position == pos)) for pos in outfield]
+    gks      = np.flatnonzero(alive & (position == "GK"))
+    if len(gks) < 2 or any(len(b) < q for b, q in zip(blocks, needs)):
+        raise InfeasibleSquad("Not enough players in some position to build a squad of 15.")
+    # no squad costs more than the dearest players of each quota; the suffix
+    # tables are sized by the budget, so a huge one would only waste memory
+    budget = min(budget, sum(int(np.sort(cost[alive & (position == pos)])[-q:].sum())
+                             for pos, q in SQUAD_QUOTAS.items()))
+
+    # Order each block by reduced score p - λc - μ[club] so the Lagrangian
+    # bound over "the rest of this block" is a difference of suffix sums.
+    n_clubs  = int(clubs.max()) + 1
+    lam, mu  = _dual_multipliers(pts, cost, clubs, blocks, needs,
+                                 budget - 2 * int(cost[gks].min()), max_per_club, n_clubs)
+    red_all  = pts - lam * cost - mu[clubs]
+    blocks   = [b[np.argsort(-red_all[b], kind="stable")] for b in blocks]
+    stats["lambda"] = lam
+
+    bp, bc, bclub, suffix_red, top_red, D = [], [], [], [], [], []
+    for b, q in zip(blocks, needs):
+        red = red_all[b]
+        bp.append(pts[b].tolist())
+        bc.append(cost[b].tolist())
+        bclub.append(clubs[b].tolist())
+        suffix_red.append(np.concatenate([np.cumsum(red[::-1])[::-1], [0.0]]).tolist())
+        top_red.append(float(red[:q].sum()))
+        D.append(_suffix_tables(pts[b], cost[b], q, budget))
+
+    # after[j][r]: best score filling every block after j within budget r
+    after = [None] * len(blocks)
+    after[-1] = np.zeros(budget + 1)
+    for j in range(len(blocks) - 2, -1, -1):
+        after[j] = _max_plus(D[j + 1][0, needs[j + 1]], after[j + 1])
+    later_red = [sum(top_red[j + 1:]) for j in range(len(blocks))]
+
+    mu_l       = mu.tolist()
+    club_count = [0] * n_clubs
+    chosen     = []
+    best       = {"score": -np.inf, "squad": None}
+
+    def dfs(j: int, i: int, k: int, r: int, score: float, slack: float) -> None:
+        # slack = Σ μ_c · (club places still free); part of the dual bound
+        stats["nodes"] += 1
+        if stats["nodes"] > max_nodes:
+            raise SearchLimit(f"squad search exceeded {max_nodes} nodes")
+        if k == 0:
+            if j == len(blocks) - 1:
+                if score > best["score"] + EPS:
+                    best["score"] = score
+                    best["squad"] = list(chosen)
+                return
+            j, i, k = j + 1, 0, needs[j + 1]
+        n_b = len(bp[j])
+        if n_b - i < k:
+            return
+        # Lagrangian bound: the top-k reduced scores left in this block are at
+        # most the best k of its suffix, which the block ordering makes a sum.
+        sr  = suffix_red[j]
+        lag = score + lam * r + slack + later_red[j] + sr[i] - sr[i + k]
+        if lag <= best["score"] + EPS:
+            return
+        if score + _split_max(D[j][i, k], after[j], r) <= best["score"] + EPS:
+            return
+
+        club = bclub[j][i]
+        if club_count[club] < max_per_club and bc[j][i] <= r:
+            club_count[club] += 1
+            chosen.append(blocks[j][i])
+            dfs(j, i + 1, k - 1, r - bc[j][i], score + bp[j][i], slack - mu_l[club])
+            chosen.pop()
+            club_count[club] -= 1
+        dfs(j, i + 1, k, r, score, slack)
+
+    # ── Goalkeeper pairs ──────────────────────────────────────────────────────
+    cheap_rule = cheap_gk_max is not None and bool(((position == "GK") & (cost <= cheap_gk_max)).any())
+    full_slack = max_per_club * float(mu.sum())
+    pairs = []
+    for a in range(len(gks)):
+        for b in range(a + 1, len(gks)):
+            g1, g2 = gks[a], gks[b]
+            if cheap_rule and cost[g1] > cheap_gk_max and cost[g2] > cheap_gk_max:
+                continue
+            if clubs[g1] == clubs[g2] and max_per_club < 2:
+                continue
+            r = budget - int(cost[g1]) - int(cost[g2])
+            if r < 0:
+                continue
+            gk_pts = float(pts[g1] + pts[g2])
+            slack  = full_slack - mu[clubs[g1]] - mu[clubs[g2]]
+            ub     = gk_pts + min(
+                _split_max(D[0][0, needs[0]], after[0], r),
+                lam * r + slack + sum(top_red),
+            )
+            if np.isfinite(ub):
+                pairs.append((ub, g1, g2, r, gk_pts, slack))
+    pairs.sort(key=lambda t: -t[0])
+    stats["gk_pairs"] = len(pairs)
+
+    for ub, g1, g2, r, gk_pts, slack in pairs:
+        if ub <= best["score"] + EPS:
+            break
+        club_count[clubs[g1]] += 1
+        club_count[clubs[g2]] += 1
+        chosen[:] = [g1, g2]
+        dfs(0, 0, needs[0], r, gk_pts, slack)
+        club_count[clubs[g1]] -= 1
+        club_count[clubs[g2]] -= 1
+
+    if best["squad"] is None:
+        raise InfeasibleSquad(f"No feasible squad for budget {budget / 10:.1f}m")
+
+    mask = np.zeros(len(pts), dtype=bool)
+    mask[best["squad"]] = True
+    stats["objective"] = best["score"]
+    return mask, stats
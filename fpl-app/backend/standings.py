@@ -0,0 +1,182 @@
+"""
+Incremental Premier League table for /api/pl/table.
+
+pl_table() used to walk every finished fixture in a Python loop on each
+request. Standings keeps the aggregates instead and only touches what
+changed:
+
+  - per gameweek, a (team x stat) block of deltas: played, won, drawn, lost,
+    goals for, goals against. Fixtures without a gameweek (postponed, not
+    yet rescheduled) go in slot 0, which only the full table counts
+  - applied fixtures are remembered by id with their (event, teams, score);
+    sync() compares each fixture against that and applies only the
+    differences: a newly finished match is added, a corrected score or a
+    moved gameweek is backed out and re-added, an un-finished one is removed
+  - sync() returns at once when the fixtures cache version is unchanged, so
+    the 380-fixture scan runs only when upstream data actually changed
+  - table(gw) ranks the cumulative sum of slots 1..gw (all slots for the
+    full table) and caches the ranked rows until the next change, so repeat
+    queries, as-of-gameweek ones included, are a dictionary lookup
+
+Ordering is points, goal difference, goals scored, then the bootstrap team
+order, as before.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Optional
+
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# FPL short names → the names the frontend shows
+DISPLAY_NAMES = {
+    "Arsenal":       "Arsenal",       "Aston Villa":  "Aston Villa",
+    "Bournemouth":   "Bournemouth",   "Brentford":    "Brentford",
+    "Brighton":      "Brighton",      "Chelsea":      "Chelsea",
+    "Crystal Palace":"Crystal Palace","Everton":      "Everton",
+    "Fulham":        "Fulham",        "Ipswich":      "Ipswich",
+    "Leicester":     "Leicester",     "Liverpool":    "Liverpool",
+    "Man City":      "Man City",      "Man Utd":      "Man United",
+    "Newcastle":     "Newcastle",     "Nott'm Forest":"Nottm Forest",
+    "Southampton":   "Southampton",   "Spurs":        "Tottenham",
+    "West Ham":      "West Ham",      "Wolves":       "Wolves",
+}
+PLAYED, WIN, DRAW, LOSS, GF, GA = range(6)
+MAX_EVENTS = 38
+
+
+class Standings:
+    """Running league aggregates per gameweek, updated from the fixture list."""
+
+    def __init__(self):
+        self._lock     = threading.Lock()
+        self._teams:   Optional[tuple] = None    # arrays are allocated on the first sync
+        self._source   = None                    # (teams, fixtures) version last synced
+        self._results: dict[int, tuple] = {}
+        self._tables:  dict = {}
+        self.version   = 0                       # bumped whenever a result changes
+        self.applied   = 0                       # fixture results applied or backed out
+        self.syncs     = 0                       # syncs that had to scan the fixtures
+
+    def _reset(self, teams: list) -> None:
+        self._teams   = tuple((int(t["id"]), DISPLAY_NAMES.get(str(t["name"]), str(t["name"]))) for t in teams)
+        self._index   = {tid: i for i, (tid, _) in enumerate(self._teams)}
+        self._slots   = np.zeros((MAX_EVENTS + 1, len(self._teams), 6), dtype=np.int64)
+        self._results: dict[int, tuple] = {}     # fixture id -> (slot, h, a, hg, ag)
+        self._tables:  dict = {}                 # gw (None = full) -> ranked rows
+
+    # ── Updates ────────────────────────────────────────────────────────────────
+    def sync(self, teams: list, fixtures: list, source_version=None) -> bool:
+        """Bring the table up to date with `fixtures`; True if any result changed."""
+        with self._lock:
+            if source_version is not None and source_version == self._source:
+                return False
+            team_key = tuple((int(t["id"]), DISPLAY_NAMES.get(str(t["name"]), str(t["name"]))) for t in teams)
+            changed  = team_key != self._teams
+            if changed:
+                self._reset(teams)               # new season or renamed clubs: start over
+
+            seen = set()
+            for fx in fixtures:
+                result = self._result(fx)
+                if result is None:
+                    continue
+                fid = fx["id"]
+                seen.add(fid)
+                old = self._results.get(fid)
+                if old == result:
+                    continue
+                if old is not None:
+                    self._apply(old, -1)
+                self._apply(result, +1)
+                self._results[fid] = result
+                changed = True
+            for fid in [f for f in self._results if f not in seen]:   # no longer finished / gone
+                self._apply(self._results.pop(fid), -1)
+                changed = True
+
+            self._source = source_version
+            self.syncs  += 1
+            if changed:
+                self._tables.clear()
+                self.version += 1
+            return changed
+
+    def _result(self, fx: dict) -> Optional[tuple]:
+        if not fx.get("finished"):
+            return None
+        h, a   = fx.get("team_h"), fx.get("team_a")
+        hg, ag = fx.get("team_h_score"), fx.get("team_a_score")
+        if h not in self._index or a not in self._index or hg is None or ag is None:
+            return None
+        event = fx.get("event") or 0
+        if event >= len(self._slots):            # longer than a 38-GW season
+            extra       = np.zeros((event + 1 - len(self._slots), *self._slots.shape[1:]), dtype=np.int64)
+            self._slots = np.concatenate([self._slots, extra])
+        return (event, self._index[h], self._index[a], int(hg), int(ag))
+
+    def _apply(self, result: tuple, sign: int) -> None:
+        slot, h, a, hg, ag = result
+        block = self._slots[slot]
+        for team, gf, ga in ((h, hg, ag), (a, ag, hg)):
+            row = block[team]
+            row[PLAYED] += sign
+            row[GF]     += sign * gf
+            row[GA]     += sign * ga
+            row[WIN if gf > ga else DRAW if gf == ga else LOSS] += sign
+        self.applied += 1
+
+    # ── Queries ────────────────────────────────────────────────────────────────
+    def table(self, gw: Optional[int] = None) -> list[dict]:
+        """
+        Ranked table after gameweek `gw` (every finished fixture if None).
+        The rows are cached and shared: do not modify them.
+        """
+        rows = self._tables.get(gw)
+        if rows is not None:
+            return rows
+        if self._teams is None:
+            return []
+        with self._lock:
+            rows = self._tables.get(gw)
+            if rows is None:
+                totals = self._slots.sum(axis=0) if gw is None else self._slots[1:gw + 1].sum(axis=0)
+                rows   = self._rank(totals)
+                self._tables[gw] = rows
+            return rows
+
+    def _rank(self, totals) -> list[dict]:
+        points = 3 * totals[:, WIN] + totals[:, DRAW]
+        gd     = totals[:, GF] - totals[:, GA]
+        # lexsort: last key is primary; ties keep the bootstrap team order
+        order  = np.lexsort((np.arange(len(totals)), -totals[:, GF], -gd, -points))
+        rows   = []
+        for pos, i in enumerate(order.tolist(), start=1):
+            t = totals[i].tolist()
+            rows.append({
+                "name":     self._teams[i][1],
+                "played":   t[PLAYED], "win": t[WIN], "draw": t[DRAW], "loss": t[LOSS],
+                "gf":       t[GF],     "ga":  t[GA],  "gd":   t[GF] - t[GA],
+                "points":   int(points[i]),
+                "position": pos,
+            })
+        return rows
+
+    def last_gameweek(self) -> int:
+        """Highest gameweek with a finished fixture (0 before the season starts)."""
+        if self._teams is None:
+            return 0
+        slots = np.flatnonzero(self._slots[1:, :, PLAYED].any(axis=1))
+        return int(slots[-1]) + 1 if len(slots) else 0
+
+    def stats(self) -> dict:
+        return {
+            "version":        self.version,
+            "fixtures":       len(self._results),
+            "last_gameweek":  self.last_gameweek(),
+            "applied":        self.applied,
+            "syncs":          self.syncs,
+            "cached_tables":  len(self._tables),
+        }
@@ -0,0 +1,245 @@
+"""
+Columnar storage for gameweek history and predictions, with CSV fallback.
+
+Parsing CSV text on every load dominates startup as history grows across
+seasons. Writers here keep the CSVs (other tools and older notebooks still
+read them) and add:
+
+  - history/     Parquet dataset, one directory per season
+                 (history/season=2025-26/...), rows sorted by round inside
+                 each file so a round filter skips row groups by their
+                 min/max statistics. A file per round looks tidier but every
+                 file costs ~2 ms to open across 42 columns, which made a
+                 ten-season load slower than the CSV it replaces.
+  - player_predictions.arrow   uncompressed Arrow IPC file, memory-mapped on
+                 load so column reads are page-ins rather than parsing
+
+Integer stats are stored with explicit narrow dtypes (int8/int16/int32);
+decimal stats stay float64 so values round-trip exactly. Readers take a
+`columns` list and only materialise those. The columnar copy is used only
+when pyarrow is installed and it is at least as new as the CSV; otherwise
+they fall back to the CSV (read with usecols).
+
+    python storage.py               # convert the CSVs in Data/data
+    python storage.py --export-csv  # rewrite the CSVs from the columnar files
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+
+from lazy import available, lazy_import
+
+np       = lazy_import("numpy")
+pd       = lazy_import("pandas")
+pa       = lazy_import("pyarrow")
+ds       = lazy_import("pyarrow.dataset")
+pq       = lazy_import("pyarrow.parquet")
+ARROW_OK = available("pyarrow")
+
+ROOT_DIR = Path(os.environ.get("FPL_ROOT", str(Path(__file__).resolve().parent.parent.parent)))
+DATA_DIR = Path(os.environ.get("FPL_DATA_DIR", str(ROOT_DIR / "Data" / "data")))
+
+HISTORY_CSV      = "fpl_gameweek_history.csv"
+HISTORY_DATASET  = "history"
+PREDICTIONS_CSV  = "player_predictions.csv"
+PREDICTIONS_IPC  = "player_predictions.arrow"
+ROW_GROUP_ROWS   = 8_192      # ~3 gameweeks per row group
+
+_I8, _I16, _I32, _F32 = "int8", "int16", "int32", "float32"
+
+HISTORY_DTYPES = {
+    "element": _I32, "fixture": _I32, "opponent_team": _I8, "total_points": _I16,
+    "was_home": "bool", "team_h_score": _F32, "team_a_score": _F32, "round": _I8,
+    "modified": "bool", "minutes": _I16, "goals_scored": _I8, "assists": _I8,
+    "clean_sheets": _I8, "goals_conceded": _I8, "own_goals": _I8, "penalties_saved": _I8,
+    "penalties_missed": _I8, "yellow_cards": _I8, "red_cards": _I8, "saves": _I8,
+    "bonus": _I8, "bps": _I16, "clearances_blocks_interceptions": _I16, "recoveries": _I16,
+    "tackles": _I16, "defensive_contribution": _I16, "starts": _I8, "value": _I16,
+    "transfers_balance": _I32, "selected": _I32, "transfers_in": _I32, "transfers_out": _I32,
+    "player_id": _I32,
+}
+PREDICTION_DTYPES = {
+    "player_id": _I32, "id": _I32, "element_type": _I8, "now_cost": _I16,
+    "team": _I8, "is_home": _I8, "value": _I16,
+}
+
+
+# ── Helpers ────────────────────────────────────────────────────────────────────
+def _compact(df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+    """Downcast the known columns where the data fits; anything else is left as is."""
+    out = df.copy()
+    for col, dtype in dtypes.items():
+        if col not in out.columns:
+            continue
+        s = out[col]
+        if dtype == "bool":
+            if s.isna().any():
+                continue
+            out[col] = s.astype(bool)
+        elif dtype.startswith("int"):
+            if not pd.api.types.is_numeric_dtype(s) or s.isna().any():
+                continue
+            info = np.iinfo(dtype)
+            if len(s) and (s.min() < info.min or s.max() > info.max or (s % 1 != 0).any()):
+                continue
+            out[col] = s.astype(dtype)
+        elif pd.api.types.is_numeric_dtype(s):
+            out[col] = s.astype(dtype)
+    return out
+
+
+def season_of(kickoff: pd.Series) -> pd.Series:
+    """'2025-26' style season label; seasons roll over in July."""
+    ts   = pd.to_datetime(kickoff, utc=True, errors="coerce")
+    year = ts.dt.year - (ts.dt.month < 7)
+    year = year.fillna(pd.Timestamp.now().year).astype(int)
+    return year.astype(str) + "-" + ((year + 1) % 100).map("{:02d}".format)
+
+
+def _fresh(columnar: Path, csv: Path) -> bool:
+    """Use the columnar copy only if it exists and is not older than the CSV."""
+    if not (ARROW_OK and columnar.exists()):
+        return False
+    return not csv.exists() or columnar.stat().st_mtime >= csv.stat().st_mtime
+
+
+def _read_csv(path: Path, columns: Optional[list]) -> pd.DataFrame:
+    if columns is None:
+        return pd.read_csv(path)
+    wanted = set(columns)
+    df     = pd.read_csv(path, usecols=lambda c: c in wanted)
+    return df[[c for c in columns if c in df.columns]]
+
+
+# ── History ────────────────────────────────────────────────────────────────────
+@functools.lru_cache(maxsize=None)
+def _seasons():
+    """Season-only hive partitioning (history/season=2025-26/...)."""
+    return ds.partitioning(pa.schema([("season", pa.string())]), flavor="hive")
+
+
+def write_history(df: pd.DataFrame, data_dir: Path = DATA_DIR, csv: bool = True) -> None:
+    """
+    Write the history as a season-partitioned Parquet dataset, rows sorted
+    by round within each season (and the CSV).
+    """
+    data_dir = Path(data_dir)
+    if csv:
+        df.to_csv(data_dir / HISTORY_CSV, index=False)
+    if not ARROW_OK:
+        return
+
+    out           = _compact(df, HISTORY_DTYPES)
+    out["season"] = season_of(out["kickoff_time"]) if "kickoff_time" in out else "unknown"
+    out           = out.sort_values(["season", "round", "player_id"], kind="stable")
+    table         = pa.Table.from_pandas(out, preserve_index=False)
+    table         = table.replace_schema_metadata({"columns": ",".join(df.columns)})
+
+    target = data_dir / HISTORY_DATASET
+    tmp    = data_dir / (HISTORY_DATASET + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    ds.write_dataset(
+        table, tmp, format="parquet", partitioning=_seasons(), use_threads=False,
+        min_rows_per_group=ROW_GROUP_ROWS, max_rows_per_group=ROW_GROUP_ROWS,
+    )
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+
+
+def read_history(
+    data_dir: Path = DATA_DIR,
+    columns:  Optional[list] = None,
+    rounds:   Optional[tuple[int, int]] = None,
+    season:   Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Gameweek history, optionally only some columns, an inclusive round range
+    and one season. Other seasons' files are never opened and row groups
+    outside the round range are skipped.
+    """
+    data_dir = Path(data_dir)
+    target   = data_dir / HISTORY_DATASET
+    if not _fresh(target, data_dir / HISTORY_CSV):
+        df = _read_csv(data_dir / HISTORY_CSV, None if columns is None else list(dict.fromkeys([*columns, "round", "kickoff_time"])))
+        if rounds is not None:
+            df = df[df["round"].between(*rounds)]
+        if season is not None:
+            df = df[season_of(df["kickoff_time"]) == season]
+        return df[columns].reset_index(drop=True) if columns is not None else df.reset_index(drop=True)
+
+    filters = []
+    if rounds is not None:
+        filters += [("round", ">=", rounds[0]), ("round", "<=", rounds[1])]
+    if season is not None:
+        filters.append(("season", "==", season))
+    table = pq.read_table(target, columns=columns, filters=filters or None,
+                          partitioning=_seasons(), memory_map=True)
+
+    order = (table.schema.metadata or {}).get(b"columns")
+    names = order.decode().split(",") if order else table.column_names
+    if columns is None:
+        table = table.select([c for c in names if c in table.column_names])
+    # hand the Arrow buffers back as columns are converted, then return the
+    # pool's cached blocks so RSS tracks the (smaller) frame
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+    pa.default_memory_pool().release_unused()
+    # stored in round order for the statistics; hand back the CSV's row order
+    if "player_id" in df.columns and "round" in df.columns:
+        df = df.sort_values(["player_id", "round"], kind="stable").reset_index(drop=True)
+    return df
+
+
+# ── Predictions ────────────────────────────────────────────────────────────────
+def write_predictions(df: pd.DataFrame, data_dir: Path = DATA_DIR, csv: bool = True) -> None:
+    data_dir = Path(data_dir)
+    if csv:
+        df.to_csv(data_dir / PREDICTIONS_CSV, index=False)
+    if not ARROW_OK:
+        return
+    table = pa.Table.from_pandas(_compact(df, PREDICTION_DTYPES), preserve_index=False)
+    tmp   = data_dir / (PREDICTIONS_IPC + ".tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, data_dir / PREDICTIONS_IPC)
+
+
+def read_predictions(data_dir: Path = DATA_DIR, columns: Optional[list] = None) -> pd.DataFrame:
+    data_dir = Path(data_dir)
+    path     = data_dir / PREDICTIONS_IPC
+    if not _fresh(path, data_dir / PREDICTIONS_CSV):
+        return _read_csv(data_dir / PREDICTIONS_CSV, columns)
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select([c for c in columns if c in table.column_names])
+        return table.to_pandas()
+
+
+def predictions_path(data_dir: Path = DATA_DIR) -> Path:
+    """Whichever predictions file read_predictions() would load."""
+    data_dir = Path(data_dir)
+    ipc      = data_dir / PREDICTIONS_IPC
+    return ipc if _fresh(ipc, data_dir / PREDICTIONS_CSV) else data_dir / PREDICTIONS_CSV
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Convert between CSV and columnar storage")
+    ap.add_argument("--data-dir",   type=Path, default=DATA_DIR)
+    ap.add_argument("--export-csv", action="store_true", help="write CSVs from the columnar files")
+    args = ap.parse_args()
+    if not ARROW_OK:
+        raise SystemExit("pyarrow not installed. Run: pip install pyarrow")
+
+    if args.export_csv:
+        read_history(args.data_dir).to_csv(args.data_dir / HISTORY_CSV, index=False)
+        read_predictions(args.data_dir).to_csv(args.data_dir / PREDICTIONS_CSV, index=False)
+    else:
+        write_history(pd.read_csv(args.data_dir / HISTORY_CSV), args.data_dir, csv=False)
+        write_predictions(pd.read_csv(args.data_dir / PREDICTIONS_CSV), args.data_dir, csv=False)
+    print(f"done: {args.data_dir}")
@@ -0,0 +1,209 @@
+"""
+Parallel, pruned hyperparameter search for the LightGBM points model.
+
+The notebook's tuning cell ran study.optimize(objective, n_trials=50) in one
+process. Every trial fitted LGBMRegressor(n_estimators=300..1000) to the
+last tree and binned the same train split again. tune() instead:
+
+  - bins the train split once into an lgb.Dataset binary under
+    MODELS_DIR/tuning, keyed by a hash of the rows. Every trial of every
+    worker loads that file instead of re-binning
+  - trains with lgb.train against the held-out split and stops a trial once
+    its MAE has not improved for EARLY_STOPPING rounds. MAX_ROUNDS is only
+    a cap, so n_estimators is no longer searched: it is the best trial's
+    stopping round
+  - reports the MAE every PRUNE_EVERY rounds, so the MedianPruner can drop
+    a trial that is behind the median of earlier trials at the same round
+  - runs WORKERS spawned processes on one study in a shared Optuna journal
+    file. Each process sees the others' trials, for TPE and for pruning
+
+The search space is the notebook's, and trials are scored on the same
+held-out split, so best MAEs compare directly. The returned params are in
+LGBMRegressor terms, and fit_best() gives the notebook a model that joblib
+and export_model() handle as before. Needs lightgbm and optuna
+(requirements-train.txt); the backend never imports this module.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Optional
+
+from lazy import lazy_import
+from tree_model import MODELS_DIR
+
+np     = lazy_import("numpy")
+lgb    = lazy_import("lightgbm")
+optuna = lazy_import("optuna")
+
+TUNING_DIR     = Path(os.environ.get("FPL_TUNING_DIR", str(MODELS_DIR / "tuning")))
+N_TRIALS       = int(os.environ.get("FPL_TUNING_TRIALS", "50"))
+WORKERS        = int(os.environ.get("FPL_TUNING_WORKERS", str(os.cpu_count() or 1)))
+MAX_ROUNDS     = 1000       # the notebook's n_estimators upper bound
+EARLY_STOPPING = 50         # rounds without a better held-out MAE
+PRUNE_EVERY    = 25         # rounds between pruner reports
+STARTUP_TRIALS = 5          # trials the pruner lets finish before comparing
+SEED           = 42
+
+# feature_pre_filter would drop features using the first trial's
+# min_data_in_leaf, and LightGBM refuses a lower one on the same Dataset.
+DATASET_PARAMS = {"feature_pre_filter": False, "verbose": -1}
+
+
+def suggest(trial) -> dict:
+    """The notebook's search space, minus n_estimators (early stopping picks it)."""
+    return {
+        "learning_rate":     trial.suggest_float("learning_rate", 0.01, 0.1),
+        "num_leaves":        trial.suggest_int("num_leaves", 31, 150),
+        "min_child_samples": trial.suggest_int("min_child_samples", 10, 50),
+        "subsample":         trial.suggest_float("subsample", 0.6, 1.0),
+        "colsample_bytree":  trial.suggest_float("colsample_bytree", 0.6, 1.0),
+    }
+
+
+def booster_params(params: dict, threads: int = 0) -> dict:
+    """
+    LGBMRegressor params as lgb.train params. The sklearn defaults they rely
+    on (subsample_freq=0, min_child_weight=1e-3, ...) are the native ones too,
+    so n rounds of lgb.train and LGBMRegressor(n_estimators=n) grow the same trees.
+    """
+    return {
+        "objective":        "regression",
+        "metric":           "l1",
+        "learning_rate":    params["learning_rate"],
+        "num_leaves":       params["num_leaves"],
+        "min_data_in_leaf": params["min_child_samples"],
+        "bagging_fraction": params["subsample"],
+        "feature_fraction": params["colsample_bytree"],
+        "seed":             SEED,
+        "num_threads":      threads,
+        "verbose":          -1,
+    }
+
+
+# ── Dataset cache ──────────────────────────────────────────────────────────────
+def cache_dataset(X, y, cache_dir: Path = TUNING_DIR) -> Path:
+    """Bin (X, y) once and save the lgb.Dataset binary; reused while the rows are unchanged."""
+    X   = np.ascontiguousarray(X, dtype=np.float64)
+    y   = np.ascontiguousarray(y, dtype=np.float64)
+    key = hashlib.sha1()
+    for part in (X.tobytes(), y.tobytes(), repr(X.shape).encode(),
+                 repr(sorted(DATASET_PARAMS.items())).encode(), lgb.__version__.encode()):
+        key.update(part)
+    path = cache_dir / f"train-{key.hexdigest()[:16]}.bin"
+    if not path.exists():
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        lgb.Dataset(X, y, params=DATASET_PARAMS).save_binary(str(tmp))
+        os.replace(tmp, path)
+    return path
+
+
+# ── Trials ─────────────────────────────────────────────────────────────────────
+def train_booster(params: dict, train, valid, threads: int = 0, rounds: int = MAX_ROUNDS,
+                  callbacks: Optional[list] = None):
+    """lgb.train on a (cached) Dataset, early-stopped on the held-out MAE."""
+    return lgb.train(
+        booster_params(params, threads), train, num_boost_round=rounds,
+        valid_sets=[valid], valid_names=["valid"],
+        callbacks=[lgb.early_stopping(EARLY_STOPPING, verbose=False), *(callbacks or [])],
+    )
+
+
+def _pruning(trial):
+    """Report the held-out MAE to Optuna every PRUNE_EVERY rounds; stop the trial if told to."""
+    def callback(env) -> None:
+        step = env.iteration + 1
+        if step % PRUNE_EVERY:
+            return
+        mae = next(value for _, metric, value, _ in env.evaluation_result_list if metric == "l1")
+        trial.report(mae, step)
+        if trial.should_prune():
+            raise optuna.TrialPruned(f"pruned at round {step}")
+    return callback
+
+
+def _storage(journal: Path):
+    try:
+        from optuna.storages.journal import JournalFileBackend              # optuna >= 4.0
+    except ImportError:
+        from optuna.storages import JournalFileStorage as JournalFileBackend
+    return optuna.storages.JournalStorage(JournalFileBackend(str(journal)))
+
+
+def _pruner():
+    return optuna.pruners.MedianPruner(n_startup_trials=STARTUP_TRIALS, n_warmup_steps=2 * PRUNE_EVERY)
+
+
+def run_worker(study_name: str, journal: Path, dataset: Path, valid: tuple,
+               n_trials: int, seed: int, threads: int) -> None:
+    """Worker entry point: run n_trials of the shared study against the cached Dataset."""
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    train     = lgb.Dataset(str(dataset), params=DATASET_PARAMS)    # loaded once for all trials
+    valid_set = lgb.Dataset(valid[0], valid[1], params=DATASET_PARAMS, reference=train)
+    study     = optuna.load_study(study_name=study_name, storage=_storage(journal),
+                                  sampler=optuna.samplers.TPESampler(seed=seed), pruner=_pruner())
+
+    def objective(trial) -> float:
+        booster = train_booster(suggest(trial), train, valid_set, threads, callbacks=[_pruning(trial)])
+        trial.set_user_attr("best_iteration", booster.best_iteration)
+        return booster.best_score["valid"]["l1"]
+
+    study.optimize(objective, n_trials=n_trials)
+
+
+# ── Search ─────────────────────────────────────────────────────────────────────
+def tune(X_train, y_train, X_valid, y_valid, n_trials: int = N_TRIALS, workers: int = WORKERS,
+         study_name: Optional[str] = None, cache_dir: Path = TUNING_DIR) -> dict:
+    """
+    Run the search and return {best_mae, params, trials, complete, pruned,
+    workers, wall_s, study, journal}. params is ready for
+    LGBMRegressor(**params). Passing an existing study_name adds n_trials to
+    that study instead of starting a new one.
+    """
+    t0      = time.perf_counter()
+    dataset = cache_dataset(X_train, y_train, cache_dir)
+    valid   = (np.asarray(X_valid, dtype=np.float64), np.asarray(y_valid, dtype=np.float64))
+    workers = max(1, min(workers, n_trials))
+    threads = max(1, (os.cpu_count() or 1) // workers)      # no oversubscription
+    name    = study_name or f"fpl-{time.strftime('%Y%m%d-%H%M%S')}"
+    journal = cache_dir / "optuna.journal"
+
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    optuna.create_study(study_name=name, storage=_storage(journal), direction="minimize",
+                        pruner=_pruner(), load_if_exists=True)
+    shares = [n_trials // workers + (i < n_trials % workers) for i in range(workers)]
+    if workers == 1:
+        run_worker(name, journal, dataset, valid, n_trials, SEED, threads)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            futures = [pool.submit(run_worker, name, journal, dataset, valid, share, SEED + i, threads)
+                       for i, share in enumerate(shares)]
+            for f in futures:
+                f.result()
+
+    study  = optuna.load_study(study_name=name, storage=_storage(journal))
+    best   = study.best_trial
+    states = Counter(t.state.name for t in study.trials)
+    return {
+        "best_mae": best.value,
+        "params":   {**best.params, "n_estimators": best.user_attrs["best_iteration"],
+                     "random_state": SEED, "verbose": -1},
+        "trials":   len(study.trials),
+        "complete": states["COMPLETE"],
+        "pruned":   states["PRUNED"],
+        "workers":  workers,
+        "wall_s":   time.perf_counter() - t0,
+        "study":    name,
+        "journal":  str(journal),
+    }
+
+
+def fit_best(params: dict, X_train, y_train):
+    """The selected model as an LGBMRegressor, for joblib and export_model()."""
+    return lgb.LGBMRegressor(**params).fit(X_train, y_train)
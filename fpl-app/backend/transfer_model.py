@@ -0,0 +1,114 @@
+"""
+Compact transfer ILP for /api/transfers/optimize.
+
+The original model carried three binaries per player (x selected, t bought,
+s sold) tied together by six linking rows each. With the current squad fixed,
+t and s are already determined by x: a non-owned player is bought exactly
+when selected, an owned one sold exactly when dropped. So the model keeps
+only x and one continuous hits variable:
+
+    transfers_in = Σ x[j]  over non-owned j
+    hits        ≥ transfers_in - free_transfers
+
+and everything else (size, budget, positions, clubs, cheap GK, locks) is one
+affine row each. Owned and non-owned players are kept as separate index sets
+so the transfer count never needs a per-player row.
+
+The objective is squad_model's lineup objective less the hits, so starters,
+captain and vice come out of the same solve. A transfer that only improves
+the bench is worth BENCH_WEIGHT of its points, and the armband can never go
+to a bench player.
+"""
+from __future__ import annotations
+
+from lazy import available, lazy_import
+from metrics import span
+from squad_model import (
+    CHEAP_GK_MAX, MAX_PER_CLUB, SQUAD_QUOTAS, Lineup, add_lineup, lineup_objective, read_lineup,
+)
+
+np      = lazy_import("numpy")
+pd      = lazy_import("pandas")
+pulp    = lazy_import("pulp")
+PULP_OK = available("pulp")
+
+SQUAD_SIZE = sum(SQUAD_QUOTAS.values())
+
+
+def build_transfer_model(
+    opt_df:         pd.DataFrame,
+    budget_raw:     int,
+    free_transfers: int,
+    hit_cost:       float,
+    locked:         np.ndarray = None,
+    lineup:         bool = True,
+):
+    """
+    PuLP problem over opt_df (needs predicted_pts, now_cost, position, team,
+    in_current). Returns (prob, x, hits, (s, c, v)); lineup=False keeps the
+    plain sum of the 15 as the objective and returns None for (s, c, v).
+    """
+    if not PULP_OK:
+        raise RuntimeError("pulp not installed. Run: pip install pulp")
+
+    pts      = opt_df["predicted_pts"].to_numpy(dtype=float)
+    cost     = opt_df["now_cost"].to_numpy(dtype=float)
+    position = opt_df["position"].to_numpy()
+    team     = opt_df["team"].to_numpy()
+    owned    = opt_df["in_current"].to_numpy() == 1
+    pool     = np.flatnonzero(~owned)
+    n        = len(opt_df)
+
+    prob = pulp.LpProblem("FPL_Transfers", pulp.LpMaximize)
+    x    = [pulp.LpVariable(f"x{i}", cat="Binary") for i in range(n)]
+    hits = pulp.LpVariable("hits", lowBound=0, cat="Continuous")
+
+    transfers_in = pulp.LpAffineExpression([(x[i], 1) for i in pool])
+
+    prob += pulp.LpAffineExpression([(v, 1) for v in x]) == SQUAD_SIZE, "squad_size"
+    prob += pulp.LpAffineExpression(list(zip(x, cost))) <= budget_raw, "budget"
+    prob += hits >= transfers_in - free_transfers, "hits"
+
+    for pos, quota in SQUAD_QUOTAS.items():
+        idx = np.flatnonzero(position == pos)
+        prob += pulp.LpAffineExpression([(x[i], 1) for i in idx]) == quota, f"pos_{pos}"
+
+    for club in np.unique(team):
+        idx = np.flatnonzero(team == club)
+        prob += pulp.LpAffineExpression([(x[i], 1) for i in idx]) <= MAX_PER_CLUB, f"club_{club}"
+
+    cheap_gk = np.flatnonzero((cost <= CHEAP_GK_MAX) & (position == "GK"))
+    if len(cheap_gk):
+        prob += pulp.LpAffineExpression([(x[i], 1) for i in cheap_gk]) >= 1, "cheap_gk"
+
+    if locked is not None:
+        for i in np.flatnonzero(locked):
+            x[i].lowBound = 1
+
+    if not lineup:
+        prob += pulp.LpAffineExpression(list(zip(x, pts))) - hit_cost * hits
+        return prob, x, hits, None
+
+    s, c, v = add_lineup(prob, x, position)
+    prob   += lineup_objective(x, s, c, v, pts) - hit_cost * hits
+    return prob, x, hits, (s, c, v)
+
+
+def solve_transfers(
+    opt_df:         pd.DataFrame,
+    budget_raw:     int,
+    free_transfers: int,
+    hit_cost:       float,
+    locked:         np.ndarray = None,
+) -> tuple[Lineup, dict]:
+    """Returns (Lineup over opt_df's rows, {"build": ms, "solve": ms, "parse": ms})."""
+    with span("ilp.transfers.build") as build:
+        prob, x, _, (s, c, v) = build_transfer_model(opt_df, budget_raw, free_transfers, hit_cost, locked)
+    with span("ilp.transfers.solve") as solve:
+        prob.solve(pulp.PULP_CBC_CMD(msg=0))
+
+    if pulp.LpStatus[prob.status] != "Optimal":
+        raise ValueError(f"No feasible transfer plan within {budget_raw / 10:.1f}m")
+    with span("ilp.transfers.parse") as parse:
+        lineup = read_lineup(x, s, c, v)
+    return lineup, {"build": build.ms, "solve": solve.ms, "parse": parse.ms}
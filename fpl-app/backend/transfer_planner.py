@@ -0,0 +1,218 @@
+"""
+Multi-gameweek transfer planner for /api/transfers/plan.
+
+Plans transfers over a horizon of 1–8 gameweeks with per-GW predicted
+points, banked free transfers and hits. One gameweek g of the model has, for
+every candidate player i:
+
+    x[i,g]   binary    i is in the squad for GW g
+    in[i,g]  ≥ x[i,g] - x[i,g-1]   (bought before GW g)
+
+and per GW
+
+    T[g]     = Σ in[i,g]                       transfers made
+    hits[g]  integer, 0 ≤ hits ≤ T             paid transfers
+    T - hits ≤ ft[g]                           free ones come from the bank
+    ft[g+1] ≤ ft[g] - (T - hits) + 1,  ≤ max_free_transfers
+
+plus the usual squad rules (2/5/5/3, budget, 3 per club, cheap GK, locks).
+Each GW is scored like /api/squad/optimize's lineup solver: starter,
+captain and vice binaries from squad_model.add_lineup() and the objective
+Σ_g decay^g · lineup_objective(), so the plan maximises what the XI and
+armband will score, not the sum of all 15.
+
+The armband makes the LP bound loose, and proving each window optimal can
+take tens of seconds, so CBC stops within PLAN_GAP (0.5%) of the bound.
+
+Solving all H gameweeks jointly grows super-linearly, so the horizon is
+solved with a rolling window: optimise GWs k..k+W-1, commit GW k's
+decisions, move on one GW. Each step is a W-GW model, so the total cost is
+~H × cost(W). window ≥ horizon solves the whole horizon in one model.
+"""
+from __future__ import annotations
+
+import os
+import time
+from typing import Optional
+
+from lazy import available, lazy_import
+from pruning import dominated_mask
+from squad_model import CHEAP_GK_MAX, MAX_PER_CLUB, SQUAD_QUOTAS, add_lineup, lineup_objective
+
+np      = lazy_import("numpy")
+pd      = lazy_import("pandas")
+pulp    = lazy_import("pulp")
+PULP_OK = available("pulp")
+
+SQUAD_SIZE         = sum(SQUAD_QUOTAS.values())
+MAX_FREE_TRANSFERS = 5
+FDR_WEIGHT         = 0.1     # points multiplier per step of fixture difficulty away from 3
+TRANSFER_EPS       = 0.01    # tie-breaker so equal-value swaps are not made for free
+PLAN_GAP           = float(os.environ.get("FPL_PLAN_GAP", "0.005"))   # relative MIP gap per window
+
+
+# ── Per-GW points ──────────────────────────────────────────────────────────────
+def fixture_multipliers(fixtures: list, gws: list[int]) -> dict[int, np.ndarray]:
+    """
+    {team_id: multiplier per gameweek in gws}. Each fixture counts
+    1 + FDR_WEIGHT·(3 - difficulty), so blanks score 0 and doubles about 2.
+    """
+    col = {gw: k for k, gw in enumerate(gws)}
+    out: dict[int, np.ndarray] = {}
+    for fx in fixtures:
+        k = col.get(fx.get("event"))
+        if k is None:
+            continue
+        for side, opp in (("h", "a"), ("a", "h")):
+            team = fx[f"team_{side}"]
+            diff = fx.get(f"team_{side}_difficulty") or 3
+            out.setdefault(team, np.zeros(len(gws)))[k] += 1 + FDR_WEIGHT * (3 - diff)
+    return out
+
+
+def per_gw_points(df: pd.DataFrame, fixtures: list, gws: list[int]) -> np.ndarray:
+    """
+    predicted_pts scaled by each player's fixtures, shape (len(df), len(gws)).
+    A team with no fixture in a GW scores 0 there. Only when no fixture list
+    is available at all (fixtures empty) does every GW count once.
+    """
+    mult = fixture_multipliers(fixtures, gws)
+    miss = np.zeros(len(gws)) if fixtures else np.ones(len(gws))
+    m    = np.vstack([mult.get(t, miss) for t in df["team"].to_numpy()]) if len(df) else np.zeros((0, len(gws)))
+    return df["predicted_pts"].to_numpy(dtype=float)[:, None] * m
+
+
+# ── Model ──────────────────────────────────────────────────────────────────────
+def _window_model(
+    pts:        np.ndarray,     # (n, W)
+    cost:       np.ndarray,
+    position:   np.ndarray,
+    team:       np.ndarray,
+    start:      np.ndarray,     # squad before the window (bool, n)
+    ft0:        int,
+    budget_raw: int,
+    hit_cost:   float,
+    max_ft:     int,
+    decay:      float,
+    locked:     Optional[np.ndarray],
+):
+    n, W = pts.shape
+    prob = pulp.LpProblem("FPL_Plan", pulp.LpMaximize)
+    x    = [[pulp.LpVariable(f"x{i}_{g}", cat="Binary") for i in range(n)] for g in range(W)]
+    buy  = [[pulp.LpVariable(f"in{i}_{g}", lowBound=0, upBound=1) for i in range(n)] for g in range(W)]
+    hits = [pulp.LpVariable(f"hits{g}", lowBound=0, cat="Integer") for g in range(W)]
+    ft   = [pulp.LpVariable(f"ft{g}", lowBound=1, upBound=max_ft, cat="Integer") for g in range(1, W)]
+
+    cheap_gk = np.flatnonzero((cost <= CHEAP_GK_MAX) & (position == "GK"))
+    pos_idx  = {pos: np.flatnonzero(position == pos) for pos in SQUAD_QUOTAS}
+    club_idx = [np.flatnonzero(team == c) for c in np.unique(team)]
+
+    objective = []
+    for g in range(W):
+        xg, bg  = x[g], buy[g]
+        T       = pulp.LpAffineExpression([(v, 1) for v in bg])
+        ft_g    = ft0 if g == 0 else ft[g - 1]
+        w       = decay ** g
+        xi      = add_lineup(prob, xg, position, tag=f"_{g}")
+        objective.append(w * lineup_objective(xg, *xi, pts[:, g]))
+        objective.append(-w * hit_cost * hits[g] - TRANSFER_EPS * T)
+
+        prob += pulp.LpAffineExpression([(v, 1) for v in xg]) == SQUAD_SIZE, f"size_{g}"
+        prob += pulp.LpAffineExpression(list(zip(xg, cost))) <= budget_raw, f"budget_{g}"
+        for pos, quota in SQUAD_QUOTAS.items():
+            prob += pulp.LpAffineExpression([(xg[i], 1) for i in pos_idx[pos]]) == quota, f"pos_{pos}_{g}"
+        for c, idx in enumerate(club_idx):
+            prob += pulp.LpAffineExpression([(xg[i], 1) for i in idx]) <= MAX_PER_CLUB, f"club_{c}_{g}"
+        if len(cheap_gk):
+            prob += pulp.LpAffineExpression([(xg[i], 1) for i in cheap_gk]) >= 1, f"cheap_gk_{g}"
+
+        for i in range(n):
+            prev = int(start[i]) if g == 0 else x[g - 1][i]
+            prob += bg[i] >= xg[i] - prev
+
+        prob += hits[g] <= T, f"hits_le_T_{g}"
+        prob += T - hits[g] <= ft_g, f"free_{g}"
+        if g + 1 < W:
+            prob += ft[g] <= ft_g - (T - hits[g]) + 1, f"bank_{g}"
+
+    if locked is not None:
+        for i in np.flatnonzero(locked):
+            for g in range(W):
+                x[g][i].lowBound = 1
+
+    prob += pulp.lpSum(objective)
+    return prob, x
+
+
+def plan_transfers(
+    opt_df:         pd.DataFrame,
+    pts:            np.ndarray,
+    budget_raw:     int,
+    free_transfers: int,
+    hit_cost:       float = 4,
+    window:         int   = 3,
+    max_ft:         int   = MAX_FREE_TRANSFERS,
+    decay:          float = 1.0,
+    locked:         Optional[np.ndarray] = None,
+) -> dict:
+    """
+    Rolling-horizon plan over opt_df (needs now_cost, position, team,
+    in_current) with per-GW points pts of shape (len(opt_df), H).
+
+    Returns {"squads": [bool mask per GW], "transfers", "hits", "free_transfers"
+    (available before each GW), "candidates", "steps": [solve ms per window]}.
+    Raises ValueError when a window has no feasible plan.
+    """
+    if not PULP_OK:
+        raise RuntimeError("pulp not installed. Run: pip install pulp")
+
+    H        = pts.shape[1]
+    cost     = opt_df["now_cost"].to_numpy(dtype=float)
+    position = opt_df["position"].to_numpy()
+    team     = opt_df["team"].to_numpy()
+    squad    = opt_df["in_current"].to_numpy() == 1
+    keep     = squad | (locked if locked is not None else False)
+
+    # Candidate pool: owned and locked players plus anyone single-GW
+    # dominance keeps in at least one gameweek of the horizon. Exact per GW;
+    # across GWs it is a heuristic, like the rolling window itself.
+    alive = keep.copy()
+    for g in range(H):
+        alive |= ~dominated_mask(pts[:, g], cost, position, team)
+    cand = np.flatnonzero(alive)
+
+    window = max(1, min(window, H))
+    ft     = max(1, min(int(free_transfers), max_ft))
+    out    = {"squads": [], "transfers": [], "hits": [], "free_transfers": [],
+              "candidates": int(len(cand)), "steps": []}
+
+    k = 0
+    while k < H:
+        w     = min(window, H - k)
+        # The last window (or a window covering the whole horizon) is committed in full.
+        last  = k + w == H
+        t0    = time.perf_counter()
+        prob, x = _window_model(
+            pts[cand, k:k + w], cost[cand], position[cand], team[cand], squad[cand],
+            ft, budget_raw, hit_cost, max_ft, decay,
+            None if locked is None else locked[cand],
+        )
+        prob.solve(pulp.PULP_CBC_CMD(msg=0, gapRel=PLAN_GAP))
+        out["steps"].append((time.perf_counter() - t0) * 1000)
+        if pulp.LpStatus[prob.status] != "Optimal":
+            raise ValueError(f"No feasible plan for GW offset {k} within {budget_raw / 10:.1f}m")
+
+        for g in range(w if last else 1):
+            new       = np.zeros(len(opt_df), dtype=bool)
+            new[cand] = [(v.value() or 0) > 0.5 for v in x[g]]
+            made      = int((new & ~squad).sum())
+            free      = min(made, ft)
+            out["squads"].append(new)
+            out["transfers"].append(made)
+            out["hits"].append(made - free)
+            out["free_transfers"].append(ft)
+            squad = new
+            ft    = min(max_ft, ft - free + 1)
+        k += w if last else 1
+
+    return out
@@ -0,0 +1,256 @@
+"""
+The LightGBM model as flat NumPy arrays, scored without lightgbm.
+
+Unpickling fpl_model.pkl imports lightgbm and scikit-learn, which dominates
+a cold start and the process's memory. export_model() flattens the booster's
+trees once into one node table:
+
+    feature, threshold, left, right, default_left, missing_type   per split node
+    leaf_value                                                     per leaf
+
+Children >= 0 index split nodes, children < 0 are ~leaf_index; roots[t] is
+tree t's first node. Leaves are numbered left to right within each tree, so
+a node's left subtree is a leaf range [left_lo, left_hi). The arrays plus a
+little metadata (feature names, importances, the SHA-1 of the pickle they
+came from) go into fpl_model.npz.
+
+TreeModel.predict() scores with QuickScorer-style bitmasks instead of
+walking nodes. A split is false (go right) exactly when its threshold is
+below the feature value, and a false split rules out its left subtree's
+leaves; the exit leaf is the leftmost leaf nothing ruled out. Per feature,
+the sorted distinct thresholds and a prefix-AND of the leaf masks of every
+tree are built once, so a player costs one searchsorted and one row of ANDs
+per feature, then a lowest-set-bit per tree. Models whose splits have
+Zero/NaN missing types fall back to a level-by-level walk of all (player,
+tree) pairs. Players are scored in blocks of BLOCK_ROWS; the masks for
+all ~800 players at once spill out of cache and run three times slower.
+Both follow LightGBM's numerical split rules, so they match booster.predict
+to float rounding. Only numerical splits and identity-link
+objectives are supported; export refuses anything else.
+
+    python tree_model.py           # fpl_model.pkl -> fpl_model.npz (needs lightgbm)
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+
+ROOT_DIR   = Path(os.environ.get("FPL_ROOT", str(Path(__file__).resolve().parent.parent.parent)))
+MODELS_DIR = Path(os.environ.get("FPL_MODELS_DIR", str(ROOT_DIR / "Data" / "models")))
+
+IDENTITY_OBJECTIVES = ("regression", "regression_l1", "huber", "fair", "quantile", "mape")
+MISSING_TYPES       = {"None": 0, "Zero": 1, "NaN": 2}
+ZERO_THRESHOLD      = 1.0000000180025095e-35     # LightGBM's kZeroThreshold, 1e-35f as a double
+BLOCK_ROWS          = 128     # players per bitmask pass; keeps the (rows, trees) masks in cache
+
+
+def file_sha1(path: Path) -> str:
+    with open(path, "rb") as fh:
+        return hashlib.sha1(fh.read()).hexdigest()
+
+
+# ── Export ─────────────────────────────────────────────────────────────────────
+def export_model(model, path: Path, source: Optional[Path] = None) -> Path:
+    """Flatten a fitted LGBMRegressor (or Booster) into an .npz file."""
+    booster   = getattr(model, "booster_", model)
+    best      = getattr(booster, "best_iteration", 0) or -1
+    dump      = booster.dump_model(num_iteration=best)
+    objective = dump["objective"].split()[0]
+    if objective not in IDENTITY_OBJECTIVES or dump["num_tree_per_iteration"] != 1:
+        raise ValueError(f"Only single-output identity objectives can be exported, got '{dump['objective']}'")
+
+    feature, threshold, left, right, default_left, missing = [], [], [], [], [], []
+    tree_of, left_lo, left_hi, leaf_value, roots, leaf_start = [], [], [], [], [], []
+
+    def walk(node: dict, t: int) -> int:
+        if "leaf_index" in node or "leaf_value" in node:
+            if "leaf_coeff" in node:
+                raise ValueError("Linear trees are not supported")
+            leaf_value.append(node["leaf_value"])
+            return ~(len(leaf_value) - 1)
+        if node["decision_type"] != "<=":
+            raise ValueError(f"Unsupported split '{node['decision_type']}' (categorical features?)")
+        i = len(feature)
+        feature.append(node["split_feature"])
+        threshold.append(node["threshold"])
+        default_left.append(node["default_left"])
+        missing.append(MISSING_TYPES[node["missing_type"]])
+        tree_of.append(t)
+        for col in (left, right, left_lo, left_hi):
+            col.append(0)
+        left_lo[i] = len(leaf_value) - leaf_start[t]
+        left[i]    = walk(node["left_child"], t)
+        left_hi[i] = len(leaf_value) - leaf_start[t]
+        right[i]   = walk(node["right_child"], t)
+        return i
+
+    for t, tree in enumerate(dump["tree_info"]):
+        leaf_start.append(len(leaf_value))
+        roots.append(walk(tree["tree_structure"], t))
+
+    meta = {
+        "feature_names":       dump["feature_names"],
+        "feature_importances": [int(v) for v in booster.feature_importance(importance_type="split")],
+        "objective":           dump["objective"],
+        "num_trees":           len(roots),
+        "source_sha1":         file_sha1(source) if source is not None and Path(source).exists() else None,
+    }
+    path = Path(path)
+    tmp  = path.with_suffix(".tmp.npz")
+    np.savez(
+        tmp,
+        feature      = np.asarray(feature, dtype=np.int32),
+        threshold    = np.asarray(threshold, dtype=np.float64),
+        left         = np.asarray(left, dtype=np.int32),
+        right        = np.asarray(right, dtype=np.int32),
+        default_left = np.asarray(default_left, dtype=bool),
+        missing_type = np.asarray(missing, dtype=np.int8),
+        tree         = np.asarray(tree_of, dtype=np.int32),
+        left_lo      = np.asarray(left_lo, dtype=np.int32),
+        left_hi      = np.asarray(left_hi, dtype=np.int32),
+        leaf_value   = np.asarray(leaf_value, dtype=np.float64),
+        roots        = np.asarray(roots, dtype=np.int32),
+        leaf_start   = np.asarray(leaf_start, dtype=np.int32),
+        meta         = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+    )
+    os.replace(tmp, path)
+    return path
+
+
+# ── Evaluation ─────────────────────────────────────────────────────────────────
+_ARRAYS = ("feature", "threshold", "left", "right", "default_left", "missing_type",
+           "tree", "left_lo", "left_hi", "leaf_value", "roots", "leaf_start")
+
+
+class TreeModel:
+    """Exported model with the bits of the LGBMRegressor API the backend uses."""
+
+    def __init__(self, arrays: dict, meta: dict):
+        for name in _ARRAYS:
+            setattr(self, name, arrays[name])
+        self.meta                 = meta
+        self.feature_name_        = meta["feature_names"]
+        self.feature_importances_ = np.asarray(meta["feature_importances"])
+        self.n_features_in_       = len(self.feature_name_)
+        self.source_sha1          = meta.get("source_sha1")
+        # without Zero/NaN missing types every NaN simply becomes 0 up front
+        self._plain  = not self.missing_type.any()
+        self._tables = self._build_tables() if self._plain else None
+
+    @classmethod
+    def load(cls, path: Path) -> "TreeModel":
+        with np.load(path) as z:
+            arrays = {k: z[k] for k in z.files if k != "meta"}
+            meta   = json.loads(z["meta"].tobytes().decode())
+        return cls(arrays, meta)
+
+    def predict(self, X) -> np.ndarray:
+        if hasattr(X, "columns"):
+            X = X[self.feature_name_].to_numpy(dtype=np.float64)
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got shape {X.shape}")
+        if len(X) == 0:
+            return np.zeros(0)
+        # LightGBM's row parser drops |x| <= kZeroThreshold, i.e. reads it as 0
+        X = np.where(np.abs(X) <= ZERO_THRESHOLD, 0.0, X)
+        if self._plain:
+            X = np.where(np.isnan(X), 0.0, X)
+            return np.concatenate([self._predict_masks(X[i:i + BLOCK_ROWS]) for i in range(0, len(X), BLOCK_ROWS)])
+        return self._predict_walk(X)
+
+    # ── Bitmask scoring ────────────────────────────────────────────────────────
+    def _build_tables(self) -> dict:
+        T      = len(self.roots)
+        leaves = np.diff(np.r_[self.leaf_start, len(self.leaf_value)])
+        W      = max(1, int(-(-leaves.max() // 64)))    # 64-bit words per tree
+
+        # mask[node, w]: every bit set except the node's left-subtree leaves
+        full = np.uint64(0xFFFFFFFFFFFFFFFF)
+        mask = np.empty((len(self.feature), W), dtype=np.uint64)
+        for w in range(W):
+            lo    = np.clip(self.left_lo - 64 * w, 0, 64).astype(np.uint64)
+            hi    = np.clip(self.left_hi - 64 * w, 0, 64).astype(np.uint64)
+            width = hi - lo
+            ones  = np.where(width == 64, full, (np.uint64(1) << (width % np.uint64(64))) - np.uint64(1))
+            mask[:, w] = ~(ones << lo)
+
+        thresholds, prefix = [], []
+        for f in range(self.n_features_in_):
+            nodes = np.flatnonzero(self.feature == f)
+            uniq  = np.unique(self.threshold[nodes])
+            table = np.full((len(uniq) + 1, T, W), full, dtype=np.uint64)
+            # row r+1 holds the splits whose threshold is uniq[r]; the running
+            # AND down the rows is then "every split with threshold < x is false"
+            np.bitwise_and.at(table, (np.searchsorted(uniq, self.threshold[nodes]) + 1, self.tree[nodes]), mask[nodes])
+            thresholds.append(uniq)
+            prefix.append(np.bitwise_and.accumulate(table, axis=0))
+
+        values = np.zeros((T, 64 * W))
+        for t in range(T):
+            values[t, :leaves[t]] = self.leaf_value[self.leaf_start[t]:self.leaf_start[t] + leaves[t]]
+        return {"W": W, "thresholds": thresholds, "prefix": prefix, "values": values.ravel()}
+
+    def _predict_masks(self, X: np.ndarray) -> np.ndarray:
+        tb   = self._tables
+        n, T = len(X), len(self.roots)
+        live = None
+        for f, (uniq, prefix) in enumerate(zip(tb["thresholds"], tb["prefix"])):
+            rows = prefix[np.searchsorted(uniq, X[:, f], side="left")]     # (n, T, W)
+            live = rows if live is None else np.bitwise_and(live, rows, out=live)
+
+        if tb["W"] == 1:
+            word, base = live[:, :, 0], 0
+        else:
+            first = np.argmax(live != 0, axis=2)
+            word  = np.take_along_axis(live, first[:, :, None], axis=2)[:, :, 0]
+            base  = 64 * first
+        lowest = word & (~word + np.uint64(1))                # lowest set bit
+        leaf   = base + np.frexp(lowest.astype(np.float64))[1] - 1
+        return tb["values"][np.arange(T) * 64 * tb["W"] + leaf].sum(axis=1)
+
+    # ── Node walk (models with Zero/NaN missing types) ─────────────────────────
+    def _predict_walk(self, X: np.ndarray) -> np.ndarray:
+        n, T = len(X), len(self.roots)
+        flat = X.ravel()
+        nf   = X.shape[1]
+        cur  = np.tile(self.roots, n)                  # (player, tree) pairs, player-major
+        base = np.repeat(np.arange(n) * nf, T)         # row offset into flat X
+        idx  = np.flatnonzero(cur >= 0)
+        while idx.size:
+            node    = cur[idx]
+            fval    = flat[base[idx] + self.feature[node]]
+            mt      = self.missing_type[node]
+            nan     = np.isnan(fval)
+            fval    = np.where(nan & (mt != 2), 0.0, fval)
+            missing = ((mt == 1) & (np.abs(fval) <= ZERO_THRESHOLD)) | ((mt == 2) & nan)
+            go_left = np.where(missing, self.default_left[node], fval <= self.threshold[node])
+            nxt      = np.where(go_left, self.left[node], self.right[node])
+            cur[idx] = nxt
+            idx      = idx[nxt >= 0]
+        return self.leaf_value[~cur].reshape(n, T).sum(axis=1)
+
+
+def load_model(npz: Path, pkl: Optional[Path] = None) -> Optional[TreeModel]:
+    """The exported model, or None if it is missing or was exported from a different pickle."""
+    if not Path(npz).exists():
+        return None
+    model = TreeModel.load(npz)
+    if pkl is not None and Path(pkl).exists() and model.source_sha1 != file_sha1(pkl):
+        return None
+    return model
+
+
+if __name__ == "__main__":
+    import joblib
+
+    pkl = MODELS_DIR / "fpl_model.pkl"
+    out = export_model(joblib.load(pkl), MODELS_DIR / "fpl_model.npz", source=pkl)
+    print(f"exported {out} ({out.stat().st_size / 1e3:.0f} kB)")
@@ -0,0 +1,127 @@
+"""
+Background warm-up and readiness for the API.
+
+Importing main no longer loads pandas, the model or the predictions (see
+lazy.py), so the server binds its port in well under a second. WarmUp then
+runs the slow steps on the event loop after startup, in order:
+
+    imports      pandas, numpy, pyarrow, pulp, aiohttp (in a worker thread)
+    model        get_model()
+    bootstrap    the FPL bootstrap (team names, statuses)
+    predictions  the first prediction snapshot
+
+Each step's duration and error (if any) is recorded. Steps marked optional
+may fail without holding back readiness: an unreachable FPL API or a
+missing model still leaves the prediction routes usable. /api/health stays
+a liveness check that answers immediately; /api/ready is 503 until every
+required step has passed, which is what a load balancer or Render's health
+check should wait on; after a failed run it retries the warm-up at most
+every FPL_WARMUP_RETRY seconds. A request arriving first simply does the
+work itself, as before.
+
+FPL_WARMUP=0 skips the warm-up; /api/ready then reports ready at once.
+"""
+import asyncio
+import importlib
+import inspect
+import os
+import time
+from typing import Callable, NamedTuple, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from lazy import available
+
+WARMUP_ENABLED = os.environ.get("FPL_WARMUP", "1") != "0"
+RETRY_SECONDS  = float(os.environ.get("FPL_WARMUP_RETRY", "30"))
+HEAVY_MODULES  = ["numpy", "pandas", "pyarrow", "pyarrow.dataset", "pyarrow.parquet", "pulp", "aiohttp"]
+
+
+class Step(NamedTuple):
+    name:     str
+    fn:       Callable          # sync functions run in a worker thread
+    required: bool = True
+
+
+def import_heavy_modules() -> list:
+    """Import the lazily bound modules now; returns the ones that are installed."""
+    done = []
+    for name in HEAVY_MODULES:
+        if available(name):
+            importlib.import_module(name)
+            done.append(name)
+    return done
+
+
+class WarmUp:
+    """Runs the warm-up steps in the background and reports readiness."""
+
+    def __init__(self, steps: list[Step], enabled: bool = WARMUP_ENABLED):
+        self.steps    = steps
+        self.enabled  = enabled
+        self.state    = "pending" if enabled else "disabled"
+        self.results: dict[str, dict] = {}
+        self.started:  Optional[float] = None
+        self.finished: Optional[float] = None
+        self._task:    Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        if not self.enabled:
+            return True
+        return all(self.results.get(s.name, {}).get("ok") for s in self.steps if s.required)
+
+    def start(self) -> Optional[asyncio.Task]:
+        """Start the warm-up; after a failed run, start another at most every RETRY_SECONDS."""
+        if not self.enabled:
+            return None
+        if self._task is None or (
+            self._task.done() and not self.ready and time.perf_counter() - self.finished >= RETRY_SECONDS
+        ):
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def run(self) -> None:
+        self.state    = "running"
+        self.started  = time.perf_counter()
+        self.finished = None
+        for step in self.steps:
+            t0 = time.perf_counter()
+            try:
+                if inspect.iscoroutinefunction(step.fn):
+                    await step.fn()
+                else:
+                    await run_in_threadpool(step.fn)
+                ok, error = True, None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:               # HTTPException included: recorded, not raised
+                ok, error = False, getattr(e, "detail", None) or repr(e)
+            self.results[step.name] = {
+                "ok":       ok,
+                "required": step.required,
+                "ms":       round((time.perf_counter() - t0) * 1000, 1),
+                "error":    error,
+            }
+        self.finished = time.perf_counter()
+        self.state    = "ready" if self.ready else "failed"
+
+    def status(self) -> dict:
+        elapsed = None
+        if self.started is not None:
+            elapsed = round(((self.finished or time.perf_counter()) - self.started) * 1000, 1)
+        return {
+            "ready":      self.ready,
+            "state":      self.state,
+            "elapsed_ms": elapsed,
+            "steps":      self.results,
+            "pending":    [s.name for s in self.steps if s.name not in self.results] if self.enabled else [],
+        }
@@ -38,5 +38,12 @@ export const api = {
   optimizeTransfers: (body)   => req("/transfers/optimize", { method: "POST", body: JSON.stringify(body) }),
   getFplNews:        ()       => req("/fpl/news"),
   getFplFixtures:    (event)  => req(`/fpl/fixtures${event ? "?event=" + event : ""}`),
+  // Live scores for the current GW over server-sent events; returns a close function
+  streamFplFixtures: (onSnapshot, onUpdate) => {
+    const es = new EventSource(`${BASE}/fpl/fixtures/stream`);
+    es.addEventListener("snapshot", (e) => onSnapshot(JSON.parse(e.data)));
+    es.addEventListener("update",   (e) => onUpdate(JSON.parse(e.data)));
+    return () => es.close();
+  },
   getPlTable:        ()       => req("/pl/table"),
 };
\ No newline at end of file
@@ -178,6 +178,14 @@ export default function SidebarRight() {
       });
   }, [gw]);
 
+  useEffect(() => {
+    // Scores, minutes and full-time flags pushed as they change (no polling)
+    return api.streamFplFixtures(
+      ({ fixtures }) => { if (fixtures.length) setScores(fixtures); },
+      ({ fixtures }) => setScores((prev) => prev.map((m) => fixtures.find((f) => f.id === m.id) ?? m)),
+    );
+  }, []);
+
   return (
       <aside style={{
       width:300, height:"100vh",